@@ -0,0 +1,581 @@
+#!/usr/bin/env python
+#  -*- coding: utf-8 -*-
+"""This module defines a bounding volume hierarchy (BVH) over mesh faces to perform batched spatial queries.
+
+The hierarchy is an axis aligned bounding box (AABB) tree built with NumPy only. Faces are sorted along a Morton space
+filling curve, grouped into leaves of a fixed number of faces and a complete binary tree is built bottom-up over the
+leaves. The tree is stored in flat arrays (implicit heap layout where the children of node i are nodes 2i+1 and 2i+2)
+so that queries are performed level by level on arrays of (query, node) pairs rather than by recursion in Python.
+"""
+
+import numpy as np
+
+from .tools import morton_codes
+
+__author__ = "Francois Rongere"
+__copyright__ = "Copyright 2014-2015, Ecole Centrale de Nantes"
+__credits__ = "Francois Rongere"
+__licence__ = "CeCILL"
+__maintainer__ = "Francois Rongere"
+__email__ = "Francois.Rongere@ec-nantes.fr"
+__status__ = "Development"
+
+
+# Directions of the rays used for point in mesh tests. They are chosen so as not to be aligned with usual mesh
+# features (axes, diagonals)
+_RAY_DIRECTIONS = np.array([[0.5416752, 0.7240560, 0.4271263],
+                            [-0.6312915, 0.3340261, 0.6999155],
+                            [0.2862177, -0.5539127, 0.7817464]], dtype=float)
+
+
+def _dot(u, v):
+    return np.einsum('ij, ij -> i', u, v)
+
+
+def _closest_points_on_triangles(points, p0, p1, p2):
+    """Computes the closest points on triangles (p0, p1, p2) to points. Every input is a (n x 3) array.
+
+    This is a vectorized version of the algorithm given in Real Time Collision Detection, C. Ericson, 2005.
+    """
+    e1 = p1 - p0
+    e2 = p2 - p0
+
+    vec = points - p0
+    d1 = _dot(e1, vec)
+    d2 = _dot(e2, vec)
+
+    vec = points - p1
+    d3 = _dot(e1, vec)
+    d4 = _dot(e2, vec)
+
+    vec = points - p2
+    d5 = _dot(e1, vec)
+    d6 = _dot(e2, vec)
+
+    vc = d1 * d4 - d3 * d2
+    vb = d5 * d2 - d1 * d6
+    va = d3 * d6 - d5 * d4
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Closest point on edge p0p1
+        v = d1 / (d1 - d3)
+        on_e01 = p0 + v[:, None] * e1
+        # Closest point on edge p0p2
+        w = d2 / (d2 - d6)
+        on_e02 = p0 + w[:, None] * e2
+        # Closest point on edge p1p2
+        w = (d4 - d3) / ((d4 - d3) + (d5 - d6))
+        on_e12 = p1 + w[:, None] * (p2 - p1)
+        # Closest point inside the triangle
+        denom = 1. / (va + vb + vc)
+        inside = p0 + (vb * denom)[:, None] * e1 + (vc * denom)[:, None] * e2
+
+    conditions = [(d1 <= 0.) & (d2 <= 0.),
+                  (d3 >= 0.) & (d4 <= d3),
+                  (vc <= 0.) & (d1 >= 0.) & (d3 <= 0.),
+                  (d6 >= 0.) & (d5 <= d6),
+                  (vb <= 0.) & (d2 >= 0.) & (d6 <= 0.),
+                  (va <= 0.) & (d4 - d3 >= 0.) & (d5 - d6 >= 0.)]
+    choices = [p0, p1, on_e01, p2, on_e02, on_e12]
+
+    return np.select([cond[:, None] for cond in conditions], choices, default=inside)
+
+
+def _rays_triangles_intersections(origins, directions, p0, p1, p2):
+    """Computes the intersection parameters of rays with triangles (Moller-Trumbore algorithm).
+
+    Every input is a (n x 3) array. It returns the (n,) array of ray parameters t such that the intersection point is
+    origins + t * directions. Parameter is np.inf when the ray does not intersect the triangle.
+    """
+    e1 = p1 - p0
+    e2 = p2 - p0
+
+    pvec = np.cross(directions, e2)
+    det = _dot(e1, pvec)
+
+    scale = np.linalg.norm(e1, axis=1) * np.linalg.norm(e2, axis=1) * np.linalg.norm(directions, axis=1)
+    hit = np.fabs(det) > 1e-12 * scale
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inv_det = 1. / det
+        tvec = origins - p0
+        u = _dot(tvec, pvec) * inv_det
+        qvec = np.cross(tvec, e1)
+        v = _dot(directions, qvec) * inv_det
+        t = _dot(e2, qvec) * inv_det
+
+    hit &= (u >= 0.) & (v >= 0.) & (u + v <= 1.) & (t > 0.)
+
+    return np.where(hit, t, np.inf)
+
+
+class FacesBVH(object):
+    """An axis aligned bounding box tree over the faces of a mesh.
+
+    Parameters
+    ----------
+    vertices : array_like
+        (nv x 3) Array of mesh vertices coordinates
+    faces : array_like
+        (nf x 4) Array of mesh faces connectivities, following the meshmagick convention (triangles have their first
+        vertex repeated at the end)
+    leaf_size : int, optional
+        Maximum number of faces stored in a leaf of the tree. Default is 8.
+
+    Note
+    ----
+    The tree keeps a reference on the vertices and faces arrays. It has to be rebuilt as soon as the mesh is modified.
+    """
+    def __init__(self, vertices, faces, leaf_size=8):
+
+        self._vertices = np.asarray(vertices, dtype=float)
+        self._faces = np.asarray(faces, dtype=int)
+
+        assert leaf_size > 0
+        self._leaf_size = int(leaf_size)
+
+        self._build()
+
+    def _build(self):
+        """Builds the tree arrays"""
+
+        nf = self._faces.shape[0]
+        leaf_size = self._leaf_size
+
+        faces_vertices = self._vertices[self._faces]
+        faces_lower = faces_vertices.min(axis=1)
+        faces_upper = faces_vertices.max(axis=1)
+
+        # Ordering faces along a space filling curve so that leaves gather faces that are close to each other
+        order = np.argsort(morton_codes(0.5 * (faces_lower + faces_upper)), kind='mergesort')
+
+        nb_used_leaves = max(1, -(-nf // leaf_size))
+        depth = int(np.ceil(np.log2(nb_used_leaves)))
+        nb_leaves = 2**depth
+        nb_nodes = 2 * nb_leaves - 1
+
+        lower = np.full((nb_nodes, 3), np.inf)
+        upper = np.full((nb_nodes, 3), -np.inf)
+
+        # Leaves boxes
+        if nf > 0:
+            starts = np.arange(0, nf, leaf_size)
+            first_leaf = nb_leaves - 1
+            lower[first_leaf:first_leaf+len(starts)] = np.minimum.reduceat(faces_lower[order], starts, axis=0)
+            upper[first_leaf:first_leaf+len(starts)] = np.maximum.reduceat(faces_upper[order], starts, axis=0)
+
+        # Internal nodes boxes, level by level from the bottom of the tree
+        for level in range(depth-1, -1, -1):
+            nodes = np.arange(2**level - 1, 2**(level+1) - 1)
+            lower[nodes] = np.minimum(lower[2*nodes+1], lower[2*nodes+2])
+            upper[nodes] = np.maximum(upper[2*nodes+1], upper[2*nodes+2])
+
+        self._faces_lower = faces_lower
+        self._faces_upper = faces_upper
+        self._order = order
+        self._depth = depth
+        self._nb_leaves = nb_leaves
+        self._lower = lower
+        self._upper = upper
+        self._valid = np.all(lower <= upper, axis=1)
+
+    @property
+    def nb_faces(self):
+        """Get the number of faces in the tree"""
+        return self._faces.shape[0]
+
+    @property
+    def depth(self):
+        """Get the depth of the tree"""
+        return self._depth
+
+    @property
+    def leaf_size(self):
+        """Get the maximum number of faces in a leaf"""
+        return self._leaf_size
+
+    @property
+    def nodes_bboxes(self):
+        """Get the bounding boxes of the tree nodes.
+
+        Returns
+        -------
+        tuple
+            (lower, upper) arrays of shape (nb_nodes x 3). Nodes that do not contain any face have an infinite lower
+            bound and a minus infinite upper bound.
+        """
+        return self._lower, self._upper
+
+    def _get_candidate_pairs(self, nb_queries, node_test):
+        """Traverses the tree and returns the (query, face) pairs whose leaves passed the node test.
+
+        Parameters
+        ----------
+        nb_queries : int
+            The number of queries
+        node_test : callable
+            Function taking arrays of query indices and node indices and returning a boolean mask of the pairs to
+            keep in the traversal.
+
+        Returns
+        -------
+        queries_ids : ndarray
+        faces_ids : ndarray
+        """
+        queries = np.arange(nb_queries)
+        nodes = np.zeros(nb_queries, dtype=int)
+
+        for level in range(self._depth + 1):
+            keep = self._valid[nodes]
+            keep[keep] = node_test(queries[keep], nodes[keep])
+            queries, nodes = queries[keep], nodes[keep]
+
+            if level < self._depth:
+                queries = np.repeat(queries, 2)
+                nodes = 2 * np.repeat(nodes, 2) + 1
+                nodes[1::2] += 1
+
+        # Expanding leaves into faces
+        leaf_size = self._leaf_size
+        positions = (nodes - (self._nb_leaves - 1))[:, None] * leaf_size + np.arange(leaf_size)
+        in_range = positions < self.nb_faces
+        queries_ids = np.broadcast_to(queries[:, None], positions.shape)[in_range]
+        faces_ids = self._order[positions[in_range]]
+
+        return queries_ids, faces_ids
+
+    def _leaf_faces(self, nodes):
+        """Get the faces of leaves as a padded array (-1 for empty slots)"""
+        positions = (nodes - (self._nb_leaves - 1))[:, None] * self._leaf_size + np.arange(self._leaf_size)
+        in_range = positions < self.nb_faces
+        leaf_faces = np.full(positions.shape, -1, dtype=int)
+        leaf_faces[in_range] = self._order[positions[in_range]]
+        return leaf_faces
+
+    def get_overlapping_faces(self, other=None):
+        """Get the pairs of faces whose bounding boxes overlap.
+
+        The two trees are traversed simultaneously so that only pairs of nodes with overlapping boxes are visited.
+
+        Parameters
+        ----------
+        other : FacesBVH, optional
+            The tree of another mesh. If None (default), pairs of distinct faces of the current tree are searched.
+
+        Returns
+        -------
+        ndarray
+            (n x 2) array of faces ids pairs. The first column refers to the current tree and the second to the other
+            one. When other is None, the first face id of each pair is lower than the second.
+        """
+        self_mode = other is None
+        if self_mode:
+            other = self
+
+        first_leaf_a = self._nb_leaves - 1
+        first_leaf_b = other._nb_leaves - 1
+
+        nodes_a = np.zeros(1, dtype=int)
+        nodes_b = np.zeros(1, dtype=int)
+
+        while True:
+            keep = self._valid[nodes_a] & other._valid[nodes_b]
+            nodes_a, nodes_b = nodes_a[keep], nodes_b[keep]
+            keep = np.all((self._lower[nodes_a] <= other._upper[nodes_b]) &
+                          (other._lower[nodes_b] <= self._upper[nodes_a]), axis=1)
+            nodes_a, nodes_b = nodes_a[keep], nodes_b[keep]
+
+            descend_a = nodes_a < first_leaf_a
+            descend_b = nodes_b < first_leaf_b
+            if not (np.any(descend_a) or np.any(descend_b)):
+                break
+
+            # Every pair is split into 4 or 2 pairs depending on which nodes are not leaves. Leaves are kept as they
+            # are.
+            nb_children_a = np.where(descend_a, 2, 1)
+            nb_children_b = np.where(descend_b, 2, 1)
+            nb_children = nb_children_a * nb_children_b
+            first_a = np.repeat(np.where(descend_a, 2 * nodes_a + 1, nodes_a), nb_children)
+            first_b = np.repeat(np.where(descend_b, 2 * nodes_b + 1, nodes_b), nb_children)
+            rank = np.arange(nb_children.sum()) - np.repeat(np.cumsum(nb_children) - nb_children, nb_children)
+            nb_children_b = np.repeat(nb_children_b, nb_children)
+            nodes_a = first_a + rank // nb_children_b
+            nodes_b = first_b + rank % nb_children_b
+
+            if self_mode:
+                # Both nodes are at the same level, keeping only one of the symmetric pairs
+                keep = nodes_a <= nodes_b
+                nodes_a, nodes_b = nodes_a[keep], nodes_b[keep]
+
+        # Expanding leaves pairs into (face, leaf) pairs, keeping those whose boxes overlap
+        faces_a = self._leaf_faces(nodes_a).ravel()
+        nodes_b = np.repeat(nodes_b, self._leaf_size)
+        same_leaf = np.repeat(nodes_a, self._leaf_size) == nodes_b
+        keep = faces_a >= 0
+        keep[keep] = np.all((self._faces_lower[faces_a[keep]] <= other._upper[nodes_b[keep]]) &
+                            (other._lower[nodes_b[keep]] <= self._faces_upper[faces_a[keep]]), axis=1)
+        faces_a, nodes_b, same_leaf = faces_a[keep], nodes_b[keep], same_leaf[keep]
+
+        # Then into faces pairs
+        faces_b = other._leaf_faces(nodes_b).ravel()
+        faces_a = np.repeat(faces_a, other._leaf_size)
+        keep = faces_b >= 0
+        if self_mode:
+            keep &= np.logical_not(np.repeat(same_leaf, other._leaf_size)) | (faces_a < faces_b)
+        faces_a, faces_b = faces_a[keep], faces_b[keep]
+
+        # Exact test on faces boxes
+        keep = np.all((self._faces_lower[faces_a] <= other._faces_upper[faces_b]) &
+                      (other._faces_lower[faces_b] <= self._faces_upper[faces_a]), axis=1)
+
+        pairs = np.column_stack((faces_a[keep], faces_b[keep]))
+        if self_mode:
+            pairs.sort(axis=1)
+        pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+        return pairs
+
+    def _faces_triangles(self, faces_ids):
+        """Splits faces into triangles.
+
+        Returns
+        -------
+        ids : ndarray
+            Indices in faces_ids of the triangles
+        p0, p1, p2 : ndarray
+            Triangles vertices coordinates
+        """
+        faces = self._faces[faces_ids]
+        quads = np.where(faces[:, 0] != faces[:, 3])[0]
+
+        ids = np.concatenate((np.arange(len(faces_ids)), quads))
+        triangles = np.concatenate((faces[:, (0, 1, 2)], faces[quads][:, (0, 2, 3)]))
+
+        p0, p1, p2 = np.rollaxis(self._vertices[triangles], 1, 0)
+
+        return ids, p0, p1, p2
+
+    def get_faces_near_plane(self, normal, scalar, tol=0.):
+        """Get the faces that intersect a plane.
+
+        A face is considered to intersect the plane if some of its vertices are not farther than tol from the plane
+        on both sides, i.e. it is neither strictly above nor strictly below the plane.
+
+        Parameters
+        ----------
+        normal : array_like
+            The plane's unit normal
+        scalar : float
+            The plane scalar parameter such that the plane equation is <normal, x> = scalar
+        tol : float, optional
+            Absolute tolerance on the distance to the plane. Default is 0.
+
+        Returns
+        -------
+        ndarray
+            Sorted array of the ids of the faces intersecting the plane
+        """
+        normal = np.asarray(normal, dtype=float)
+        abs_normal = np.fabs(normal)
+        scalar = float(scalar)
+        tol = float(tol)
+
+        def node_test(_, nodes):
+            center = 0.5 * (self._lower[nodes] + self._upper[nodes])
+            radius = 0.5 * (self._upper[nodes] - self._lower[nodes])
+            return np.fabs(np.dot(center, normal) - scalar) <= np.dot(radius, abs_normal) + tol
+
+        _, faces_ids = self._get_candidate_pairs(1, node_test)
+
+        # Exact test on candidate faces
+        distances = np.dot(self._vertices[self._faces[faces_ids]], normal) - scalar
+        crossing = (distances.min(axis=1) <= tol) & (distances.max(axis=1) >= -tol)
+
+        return np.sort(faces_ids[crossing])
+
+    def get_closest_points(self, points):
+        """Get the closest points of the mesh surface to a set of points.
+
+        Parameters
+        ----------
+        points : array_like
+            (n x 3) array of query points coordinates
+
+        Returns
+        -------
+        distances : ndarray
+            (n,) array of the unsigned distances of points to the mesh
+        closest_points : ndarray
+            (n x 3) array of the closest points on the mesh surface
+        faces_ids : ndarray
+            (n,) array of the ids of the faces the closest points belong to
+        """
+        points = np.asarray(points, dtype=float).reshape((-1, 3))
+        nq = points.shape[0]
+
+        upper_bound = np.full(nq, np.inf)
+
+        def node_test(queries, nodes):
+            query_points = points[queries]
+            lower = self._lower[nodes]
+            upper = self._upper[nodes]
+
+            # Distance to the box (lower bound of the distance to the faces inside the box)
+            vec = np.maximum(np.maximum(lower - query_points, query_points - upper), 0.)
+            min_dist = np.sqrt(_dot(vec, vec))
+
+            # Distance to the farthest corner (upper bound of the distance to the nearest face inside the box)
+            vec = np.maximum(np.fabs(lower - query_points), np.fabs(upper - query_points))
+            max_dist = np.sqrt(_dot(vec, vec))
+            np.minimum.at(upper_bound, queries, max_dist)
+
+            return min_dist <= upper_bound[queries]
+
+        queries, faces_ids = self._get_candidate_pairs(nq, node_test)
+
+        ids, p0, p1, p2 = self._faces_triangles(faces_ids)
+        queries, faces_ids = queries[ids], faces_ids[ids]
+
+        closest = _closest_points_on_triangles(points[queries], p0, p1, p2)
+        vec = closest - points[queries]
+        distances = np.sqrt(_dot(vec, vec))
+        distances[np.isnan(distances)] = np.inf
+
+        # Keeping the nearest candidate for each query
+        order = np.lexsort((distances, queries))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = queries[order][1:] != queries[order][:-1]
+        best = order[first]
+
+        out_distances = np.full(nq, np.inf)
+        out_points = np.full((nq, 3), np.nan)
+        out_faces = np.full(nq, -1, dtype=int)
+
+        out_distances[queries[best]] = distances[best]
+        out_points[queries[best]] = closest[best]
+        out_faces[queries[best]] = faces_ids[best]
+
+        return out_distances, out_points, out_faces
+
+    def _get_ray_hits(self, origins, directions):
+        """Computes every intersections between rays and faces.
+
+        Returns
+        -------
+        rays_ids : ndarray
+        faces_ids : ndarray
+        params : ndarray
+            The ray parameters of the intersection points
+        """
+        with np.errstate(divide='ignore'):
+            inv_directions = 1. / directions
+
+        def node_test(queries, nodes):
+            origin = origins[queries]
+            inv_dir = inv_directions[queries]
+            with np.errstate(invalid='ignore'):
+                t0 = (self._lower[nodes] - origin) * inv_dir
+                t1 = (self._upper[nodes] - origin) * inv_dir
+            # Rays parallel to a slab with an origin inside the slab give NaN values that must not restrict the range
+            t_near = np.where(np.isnan(t0), -np.inf, np.minimum(t0, t1)).max(axis=1)
+            t_far = np.where(np.isnan(t1), np.inf, np.maximum(t0, t1)).min(axis=1)
+            return (t_near <= t_far) & (t_far >= 0.)
+
+        rays, faces_ids = self._get_candidate_pairs(origins.shape[0], node_test)
+
+        ids, p0, p1, p2 = self._faces_triangles(faces_ids)
+        rays, faces_ids = rays[ids], faces_ids[ids]
+
+        params = _rays_triangles_intersections(origins[rays], directions[rays], p0, p1, p2)
+        hit = np.isfinite(params)
+
+        return rays[hit], faces_ids[hit], params[hit]
+
+    def get_ray_intersections(self, origins, directions):
+        """Get the first intersection of rays with the mesh.
+
+        Parameters
+        ----------
+        origins : array_like
+            (n x 3) array of rays origins
+        directions : array_like
+            (n x 3) array of rays directions. They do not need to be normalized.
+
+        Returns
+        -------
+        params : ndarray
+            (n,) array of the ray parameters t of the first intersection points, given by origins + t * directions.
+            It is np.inf for rays that do not intersect the mesh.
+        points : ndarray
+            (n x 3) array of the first intersection points coordinates (NaN if no intersection)
+        faces_ids : ndarray
+            (n,) array of the ids of the intersected faces (-1 if no intersection)
+        """
+        origins = np.asarray(origins, dtype=float).reshape((-1, 3))
+        directions = np.asarray(directions, dtype=float).reshape((-1, 3))
+        assert origins.shape == directions.shape
+
+        nr = origins.shape[0]
+        rays, faces_ids, params = self._get_ray_hits(origins, directions)
+
+        out_params = np.full(nr, np.inf)
+        out_faces = np.full(nr, -1, dtype=int)
+
+        order = np.lexsort((params, rays))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = rays[order][1:] != rays[order][:-1]
+        best = order[first]
+
+        out_params[rays[best]] = params[best]
+        out_faces[rays[best]] = faces_ids[best]
+
+        with np.errstate(invalid='ignore'):
+            out_points = origins + out_params[:, None] * directions
+        out_points[out_faces < 0] = np.nan
+
+        return out_params, out_points, out_faces
+
+    def are_points_inside(self, points):
+        """Tells whether points are inside the mesh.
+
+        The mesh has to be closed. The test counts the number of crossings of rays cast from the points in three
+        different directions and the result is given by a majority vote so that rays passing exactly through an edge
+        or a vertex are not likely to give wrong results.
+
+        Parameters
+        ----------
+        points : array_like
+            (n x 3) array of points coordinates
+
+        Returns
+        -------
+        ndarray
+            (n,) boolean array
+        """
+        points = np.asarray(points, dtype=float).reshape((-1, 3))
+        nq = points.shape[0]
+
+        votes = np.zeros(nq, dtype=int)
+        for direction in _RAY_DIRECTIONS:
+            rays, _, _ = self._get_ray_hits(points, np.tile(direction, (nq, 1)))
+            votes += np.bincount(rays, minlength=nq) % 2
+
+        return votes >= 2
+
+    def get_signed_distances(self, points):
+        """Get the signed distances of points to a closed mesh.
+
+        Distances are negative inside the mesh and positive outside.
+
+        Parameters
+        ----------
+        points : array_like
+            (n x 3) array of points coordinates
+
+        Returns
+        -------
+        ndarray
+            (n,) array of signed distances
+        """
+        distances = self.get_closest_points(points)[0]
+        return np.where(self.are_points_inside(points), -distances, distances)
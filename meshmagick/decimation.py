@@ -0,0 +1,280 @@
+#!/usr/bin/env python
+#  -*- coding: utf-8 -*-
+"""This module allows to decimate meshes by edge collapses driven by quadric error metrics.
+
+The algorithm is the one described in Surface Simplification Using Quadric Error Metrics, M. Garland and P. Heckbert,
+1997. Mesh boundaries and the waterline (intersection of the mesh with the plane z=0) are preserved so that
+hydrostatic properties of the decimated mesh remain close to those of the original mesh.
+"""
+
+import numpy as np
+import heapq
+
+__author__ = "Francois Rongere"
+__copyright__ = "Copyright 2014-2015, Ecole Centrale de Nantes"
+__credits__ = "Francois Rongere"
+__licence__ = "CeCILL"
+__maintainer__ = "Francois Rongere"
+__email__ = "Francois.Rongere@ec-nantes.fr"
+__status__ = "Development"
+
+
+def _triangulate(faces):
+    """Splits quadrangles of a (nf x 4) faces array and returns a (nt x 3) triangles array"""
+    quads = faces[:, 0] != faces[:, 3]
+    return np.concatenate((faces[:, :3], faces[quads][:, (0, 2, 3)]))
+
+
+def _faces_quadrics(vertices, triangles):
+    """Computes the area weighted fundamental error quadrics of triangles planes"""
+
+    p0, p1, p2 = vertices[triangles[:, 0]], vertices[triangles[:, 1]], vertices[triangles[:, 2]]
+    normals = np.cross(p1 - p0, p2 - p0)
+    double_areas = np.linalg.norm(normals, axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        normals /= double_areas[:, None]
+    normals[double_areas == 0.] = 0.
+
+    planes = np.column_stack((normals, -np.einsum('ij, ij -> i', normals, p0)))
+    return 0.5 * double_areas[:, None, None] * planes[:, :, None] * planes[:, None, :]
+
+
+def _locked_vertices(vertices, triangles, z_tol):
+    """Get the mask of the vertices that must not move: boundary vertices and vertices of the waterline"""
+
+    nv = vertices.shape[0]
+    locked = np.zeros(nv, dtype=bool)
+
+    # Boundary edges are used by only one triangle
+    edges = np.sort(np.concatenate((triangles[:, (0, 1)], triangles[:, (1, 2)], triangles[:, (2, 0)])), axis=1)
+    edges, counts = np.unique(edges, axis=0, return_counts=True)
+    locked[edges[counts == 1].ravel()] = True
+
+    # Vertices lying on the waterline and vertices of the faces crossing it
+    z = vertices[:, 2]
+    locked[np.fabs(z) <= z_tol] = True
+    triangles_z = z[triangles]
+    crossing = (triangles_z.min(axis=1) < -z_tol) & (triangles_z.max(axis=1) > z_tol)
+    locked[triangles[crossing].ravel()] = True
+
+    return locked
+
+
+class _QuadricDecimator(object):
+    """Holds the mesh state during decimation.
+
+    Triangles are stored in a (nt x 3) array with a mask of those that are still alive and every vertex knows the set
+    of alive triangles it belongs to.
+    """
+    def __init__(self, vertices, triangles, z_tol):
+
+        self.vertices = vertices.copy()
+        self.triangles = triangles.copy()
+        self.alive = np.ones(triangles.shape[0], dtype=bool)
+        self.nb_alive = triangles.shape[0]
+
+        self.quadrics = np.zeros((vertices.shape[0], 4, 4), dtype=float)
+        faces_quadrics = _faces_quadrics(vertices, triangles)
+        for i in range(3):
+            np.add.at(self.quadrics, triangles[:, i], faces_quadrics)
+
+        self.locked = _locked_vertices(vertices, triangles, z_tol)
+        self.z_tol = z_tol
+
+        self.vertex_faces = [set() for _ in range(vertices.shape[0])]
+        for face_id, triangle in enumerate(triangles):
+            for vertex_id in triangle:
+                self.vertex_faces[vertex_id].add(face_id)
+
+        # Version of every vertex to invalidate heap entries lazily
+        self.stamps = np.zeros(vertices.shape[0], dtype=int)
+        self.heap = []
+
+    def neighbours(self, vertex_id):
+        neighbours = set(self.triangles[list(self.vertex_faces[vertex_id])].ravel().tolist())
+        neighbours.discard(vertex_id)
+        return neighbours
+
+    def push(self, v1, v2):
+        """Computes the collapse costs of edges (v1, v2) and pushes them into the heap.
+
+        Parameters
+        ----------
+        v1, v2 : ndarray
+            Arrays of the edges vertices ids
+        """
+        v1 = np.asarray(v1, dtype=int)
+        v2 = np.asarray(v2, dtype=int)
+
+        quadrics = self.quadrics[v1] + self.quadrics[v2]
+        p1, p2 = self.vertices[v1], self.vertices[v2]
+        locked1, locked2 = self.locked[v1], self.locked[v2]
+
+        # Candidate positions are the edge vertices, its middle and the optimal position minimizing the quadric error
+        optimum = 0.5 * (p1 + p2)
+        matrices = quadrics[:, :3, :3]
+        regular = np.fabs(np.linalg.det(matrices)) > 1e-8 * np.trace(matrices, axis1=1, axis2=2)**3
+        optimum[regular] = np.linalg.solve(matrices[regular], -quadrics[regular, :3, 3])
+
+        # In case of equal costs (flat regions), the first candidates are preferred as moving vertices onto their
+        # neighbours tends to generate badly shaped triangles
+        candidates = np.stack((optimum, 0.5 * (p1 + p2), p1, p2), axis=1)
+        allowed = np.ones((len(v1), 4), dtype=bool)
+
+        # The optimal vertex must stay on the same side of the waterline than the edge
+        allowed[:, 0] = regular & (optimum[:, 2] * p1[:, 2] > 0.) & (np.fabs(optimum[:, 2]) > self.z_tol)
+
+        # Locked vertices must not move
+        allowed[locked1] = [False, False, True, False]
+        allowed[locked2] = [False, False, False, True]
+        allowed[locked1 & locked2] = False
+
+        vectors = np.concatenate((candidates, np.ones((len(v1), 4, 1))), axis=2)
+        costs = np.einsum('kci, kij, kcj -> kc', vectors, quadrics, vectors)
+        costs[np.logical_not(allowed)] = np.inf
+
+        best = np.argmin(costs, axis=1)
+        best_costs = np.maximum(costs[np.arange(len(v1)), best], 0.)
+        best_positions = candidates[np.arange(len(v1)), best]
+
+        # Edges having the same cost are collapsed from the shortest to the longest one
+        lengths = ((p2 - p1)**2).sum(axis=1)
+
+        for k in np.where(np.isfinite(best_costs))[0]:
+            heapq.heappush(self.heap, (best_costs[k], lengths[k], v1[k], v2[k], self.stamps[v1[k]],
+                                       self.stamps[v2[k]], tuple(best_positions[k])))
+
+    def _is_valid_collapse(self, v1, v2, position):
+        """Checks the link condition and the normals orientations for the collapse of (v1, v2) into position"""
+
+        shared_faces = self.vertex_faces[v1] & self.vertex_faces[v2]
+        if len(shared_faces) != 2:
+            return False
+        if len(self.neighbours(v1) & self.neighbours(v2)) != 2:
+            return False
+
+        faces_ids = list((self.vertex_faces[v1] | self.vertex_faces[v2]) - shared_faces)
+        triangles = self.triangles[faces_ids]
+        old_points = self.vertices[triangles]
+        new_points = old_points.copy()
+        new_points[(triangles == v1) | (triangles == v2)] = position
+
+        old_normals = np.cross(old_points[:, 1] - old_points[:, 0], old_points[:, 2] - old_points[:, 0])
+        new_normals = np.cross(new_points[:, 1] - new_points[:, 0], new_points[:, 2] - new_points[:, 0])
+        old_norms = np.sqrt((old_normals**2).sum(axis=1))
+        new_norms = np.sqrt((new_normals**2).sum(axis=1))
+
+        # Rejecting collapses that make faces degenerated or rotate them too much
+        dots = (old_normals * new_normals).sum(axis=1)
+        return bool(np.all((new_norms > 0.) & (dots > 0.2 * old_norms * new_norms)))
+
+    def collapse(self, v1, v2, position):
+        """Collapses vertex v2 into v1 that is moved to position"""
+
+        shared_faces = self.vertex_faces[v1] & self.vertex_faces[v2]
+        for face_id in shared_faces:
+            self.alive[face_id] = False
+            for vertex_id in self.triangles[face_id]:
+                self.vertex_faces[vertex_id].discard(face_id)
+        self.nb_alive -= len(shared_faces)
+
+        for face_id in self.vertex_faces[v2]:
+            triangle = self.triangles[face_id]
+            triangle[triangle == v2] = v1
+            self.vertex_faces[v1].add(face_id)
+        self.vertex_faces[v2] = set()
+
+        self.vertices[v1] = position
+        self.quadrics[v1] += self.quadrics[v2]
+        self.locked[v1] |= self.locked[v2]
+
+        self.stamps[v1] += 1
+        self.stamps[v2] += 1
+
+        neighbours = np.fromiter(self.neighbours(v1), dtype=int)
+        self.push(np.full(len(neighbours), v1), neighbours)
+
+    def run(self, target_faces, max_error):
+
+        edges = np.sort(np.concatenate((self.triangles[:, (0, 1)], self.triangles[:, (1, 2)],
+                                        self.triangles[:, (2, 0)])), axis=1)
+        edges = np.unique(edges, axis=0)
+        self.push(edges[:, 0], edges[:, 1])
+
+        while self.heap and self.nb_alive > target_faces:
+            cost, _, v1, v2, stamp1, stamp2, position = heapq.heappop(self.heap)
+
+            if cost > max_error:
+                break
+            if stamp1 != self.stamps[v1] or stamp2 != self.stamps[v2]:
+                # Outdated entry
+                continue
+
+            position = np.asarray(position)
+            if not self._is_valid_collapse(v1, v2, position):
+                continue
+
+            # Keeping the locked vertex if any
+            if self.locked[v2]:
+                v1, v2 = v2, v1
+            self.collapse(v1, v2, position)
+
+    def get_mesh_arrays(self):
+        """Get the decimated mesh as vertices and faces arrays, removing unused vertices"""
+
+        triangles = self.triangles[self.alive]
+        used = np.unique(triangles)
+        new_id = np.zeros(self.vertices.shape[0], dtype=int)
+        new_id[used] = np.arange(len(used))
+
+        triangles = new_id[triangles]
+        faces = np.column_stack((triangles, triangles[:, 0]))
+
+        return self.vertices[used], faces
+
+
+def decimate(vertices, faces, target_faces=None, max_error=None, z_tol=1e-6):
+    """Decimates a mesh by successive edge collapses ordered by the quadric error metric.
+
+    Quadrangles are split into triangles before decimation so that the decimated mesh is only made of triangles.
+
+    Parameters
+    ----------
+    vertices : ndarray
+        (nv x 3) array of vertices coordinates
+    faces : ndarray
+        (nf x 4) array of faces connectivities
+    target_faces : int, optional
+        Number of triangles to reach. Decimation stops as soon as the number of triangles is not greater than
+        target_faces.
+    max_error : float, optional
+        Maximum quadric error (that is homogeneous to a squared distance) allowed for a collapse.
+    z_tol : float, optional
+        Absolute tolerance to consider a vertex lies on the waterline. Default is 1e-6.
+
+    Returns
+    -------
+    vertices : ndarray
+        Decimated mesh vertices
+    faces : ndarray
+        Decimated mesh faces
+
+    Note
+    ----
+    At least one of target_faces or max_error has to be given. Boundary vertices and vertices of the faces that cross
+    the plane z=0 are never moved. Collapses that would flip faces or make the mesh non-manifold are rejected.
+    """
+    if target_faces is None and max_error is None:
+        raise ValueError('At least one of target_faces or max_error has to be given')
+
+    if target_faces is None:
+        target_faces = 0
+    if max_error is None:
+        max_error = np.inf
+
+    decimator = _QuadricDecimator(np.asarray(vertices, dtype=float), _triangulate(np.asarray(faces, dtype=int)),
+                                  z_tol)
+    decimator.run(int(target_faces), float(max_error))
+
+    return decimator.get_mesh_arrays()
@@ -3,9 +3,15 @@
 """This module allows to perform hydrostatics computations on meshes"""
 
 import numpy as np
+import os
 import math
+import copy
+import time
+import hashlib
 
-from .mesh_clipper import MeshClipper
+from .mesh import Mesh, _rodrigues
+from .mesh_clipper import MeshClipper, clip_triangles
+from .tools import polygons_moments
 
 __author__ = "Francois Rongere"
 __copyright__ = "Copyright 2014-2015, Ecole Centrale de Nantes"
@@ -100,10 +106,175 @@ class Force(object):
         mx, my = moment[:2]
         return np.array([fz, mx, my], dtype=np.float)
 
+    @property
+    def hs_jacobian(self):
+        """Returns the derivatives of the hydrostatics force vector with respect to the body motions.
+
+        Motions are a vertical translation and rotations around the Ox and Oy axes of the reference frame.
+
+        Returns
+        -------
+        ndarray
+            The (3x3) matrix whose columns are the derivatives of hs_force with respect to dz, thetax and thetay
+        """
+        jacobian = np.zeros((3, 3), dtype=np.float)
+        jacobian[:, 0] = [0., -self.value[1], self.value[0]]
+
+        for column, axis in ((1, np.array([1., 0., 0.])), (2, np.array([0., 1., 0.]))):
+            dpoint = np.cross(axis, self.point)
+            if self.mode == 'relative':
+                dvalue = np.cross(axis, self.value)
+            else:
+                dvalue = np.zeros(3, dtype=np.float)
+            dmoment = np.cross(dpoint, self.value) + np.cross(self.point, dvalue)
+            jacobian[:, column] = [dvalue[2], dmoment[0], dmoment[1]]
+
+        return jacobian
+
     def reset(self):  # TODO: a appeler depuis le reset de Hydrostatics
         raise NotImplementedError
 
 
+class EquilibriumCache(object):
+    """On disk cache of hydrostatic equilibrium computations.
+
+    Results are stored in a directory, one file per computation, named after a hash of every input of the computation:
+    mesh vertices and faces in their current position, mass, gravity center, water density, gravity, additional
+    forces, solver parameters and meshmagick version. A computation that has already been done is replaced by moving
+    the mesh at the stored position. When only inputs other than the mesh changed, the last position found for the
+    mesh is used as an initial condition.
+
+    Parameters
+    ----------
+    directory : str
+        The cache directory. It is created if it does not exist.
+    """
+    def __init__(self, directory):
+        self.directory = os.path.abspath(directory)
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+    @staticmethod
+    def get_mesh_key(hydrostatics, operation):
+        """Returns the key of the last computation done on a mesh in its current position.
+
+        Parameters
+        ----------
+        hydrostatics : Hydrostatics
+            The hydrostatics solver
+        operation : str
+            The name of the computation
+
+        Returns
+        -------
+        str
+        """
+        from . import __version__
+
+        sha = hashlib.sha1()
+        sha.update(('%s %s' % (__version__, operation)).encode())
+        sha.update(np.ascontiguousarray(hydrostatics.mesh.vertices, dtype=np.float64).tobytes())
+        sha.update(np.ascontiguousarray(hydrostatics.mesh.faces, dtype=np.int64).tobytes())
+        return sha.hexdigest()
+
+    @staticmethod
+    def get_key(hydrostatics, operation, **parameters):
+        """Returns the key of a computation.
+
+        Parameters
+        ----------
+        hydrostatics : Hydrostatics
+            The hydrostatics solver
+        operation : str
+            The name of the computation
+        parameters : dict
+            The parameters of the computation
+
+        Returns
+        -------
+        str
+        """
+        sha = hashlib.sha1()
+        sha.update(EquilibriumCache.get_mesh_key(hydrostatics, operation).encode())
+
+        data = [hydrostatics.mass, hydrostatics.rho_water, hydrostatics.gravity]
+        data.extend(hydrostatics.gravity_center)
+        for force in hydrostatics.additional_forces:
+            data.extend(force.point)
+            data.extend(force.value)
+            data.append(force.mode == 'relative')
+        sha.update(np.asarray(data, dtype=np.float64).tobytes())
+
+        sha.update(repr(sorted(hydrostatics._solver_parameters.items())).encode())
+        sha.update(repr(sorted(parameters.items())).encode())
+        return sha.hexdigest()
+
+    def _get_filename(self, key):
+        return os.path.join(self.directory, '%s.npz' % key)
+
+    def load(self, key):
+        """Loads a cached computation.
+
+        Parameters
+        ----------
+        key : str
+            The key of the computation
+
+        Returns
+        -------
+        dict or None
+            The computation data with keys rotation, translation, code and hs_data. None if the computation is not in
+            the cache.
+        """
+        filename = self._get_filename(key)
+        if not os.path.isfile(filename):
+            return None
+
+        with np.load(filename) as data:
+            entry = {'rotation': data['rotation'], 'translation': data['translation'], 'code': int(data['code']),
+                     'hs_data': dict()}
+            for name in data.files:
+                if name.startswith('hs_'):
+                    value = data[name]
+                    entry['hs_data'][name[3:]] = value.item() if value.ndim == 0 else value
+        return entry
+
+    def store(self, keys, rotation, translation, code, hs_data):
+        """Stores a computation.
+
+        Parameters
+        ----------
+        keys : list of str
+            The keys under which the computation is stored
+        rotation : ndarray
+            The (3x3) rotation matrix moving the mesh from its initial position to the computed one
+        translation : ndarray
+            The translation moving the mesh from its initial position to the computed one, after rotation
+        code : int
+            The code returned by the computation
+        hs_data : dict
+            The hydrostatic data of the mesh in the computed position. Entries that are not numbers or arrays are
+            discarded.
+        """
+        data = {'rotation': rotation, 'translation': translation, 'code': code}
+        for name, value in hs_data.items():
+            if isinstance(value, (float, int, np.ndarray, np.number)):
+                data['hs_' + name] = value
+
+        for key in keys:
+            # Writing in a temporary file first so that concurrent jobs never read a partial file
+            filename = self._get_filename(key)
+            temporary_filename = '%s.%u.tmp.npz' % (filename[:-4], os.getpid())
+            np.savez(temporary_filename, **data)
+            os.replace(temporary_filename, filename)
+
+    def clear(self):
+        """Removes every computation from the cache"""
+        for filename in os.listdir(self.directory):
+            if filename.endswith('.npz'):
+                os.remove(os.path.join(self.directory, filename))
+
+
 class Hydrostatics(object):
     # TODO: refactor this docstring
     """Class to perform hydrostatic computations on meshes.
@@ -120,6 +291,8 @@ class Hydrostatics(object):
         The density of water (in kg/m**3). Default is that of salt water (1023 kg//m**3)
     grav : float, optional
         The acceleration of gravity. Default is 9.81 m/s**2.
+    cache : EquilibriumCache, optional
+        A cache of equilibrium computations consulted by equilibrate and set_displacement. Default is None.
     
     
     Warnings
@@ -136,7 +309,7 @@ class Hydrostatics(object):
     """
 
     def __init__(self, working_mesh, cog=[0., 0., 0.], mass=None, rho_water=1023, grav=9.81,
-                 verbose=False, animate=False):
+                 verbose=False, animate=False, cache=None):
 
         self.backup = dict()
 
@@ -158,7 +331,9 @@ class Hydrostatics(object):
                                    'max_nb_restart': 10,
                                    'theta_relax': 2,
                                    'z_relax': 0.1,
-                                   'stop_at_unstable': False}
+                                   'stop_at_unstable': False,
+                                   'seed': 0}
+        self._solver_history = []
 
         # TODO: ajouter le calcul du tirant d'eau et d'air
         self.hs_data = dict()
@@ -176,9 +351,12 @@ class Hydrostatics(object):
         self.animate = animate
 
         self._rotation = np.eye(3, dtype=np.float)
+        self._translation = np.zeros(3, dtype=np.float)
 
         self.additional_forces = []
 
+        self.cache = cache
+
     @property
     def verbose(self):
         """Get the verbosity"""
@@ -334,6 +512,10 @@ class Hydrostatics(object):
     @property
     def hydrostatic_mesh(self):
         """Get the underwater part of the mesh"""
+        if 'clipper' not in self.hs_data:
+            # Hydrostatic data have been retrieved from a cache
+            self.hs_data['clipper'] = MeshClipper(self.mesh, assert_closed_boundaries=True, verbose=False,
+                                                  integrals_only=True)
         return self.hs_data['clipper'].clipped_mesh
 
     def reset(self):
@@ -347,6 +529,60 @@ class Hydrostatics(object):
         self._update_hydrostatic_properties()
 
         self._rotation = np.eye(3, dtype=np.float)
+        self._translation = np.zeros(3, dtype=np.float)
+
+    @property
+    def rotation(self):
+        """Get the rotation matrix of the mesh with respect to its initial position
+
+        Returns
+        -------
+        ndarray
+            The (3x3) rotation matrix R such that current vertices are given by R.x0 + t where x0 are the initial
+            vertices and t the translation.
+        """
+        return self._rotation
+
+    @property
+    def translation(self):
+        """Get the translation of the mesh with respect to its initial position
+
+        Returns
+        -------
+        ndarray
+            The translation vector t such that current vertices are given by R.x0 + t where x0 are the initial vertices
+            and R the rotation matrix.
+        """
+        return self._translation
+
+    def _transform(self, rot_matrix, translation, update=True):
+        """Moves the mesh, the gravity center and the additional forces by a rotation followed by a translation.
+
+        Parameters
+        ----------
+        rot_matrix : ndarray
+            The (3x3) rotation matrix
+        translation : array_like
+            The translation vector
+        update : bool, optional
+            Whether the hydrostatic properties are updated. Default is True.
+        """
+        translation = np.asarray(translation, dtype=np.float)
+
+        self.mesh.vertices = np.dot(self.mesh.vertices, rot_matrix.T) + translation
+        self._gravity_center = np.dot(rot_matrix, self._gravity_center) + translation
+
+        for force in self.additional_forces:
+            force.update(rot=rot_matrix)
+            force.update(dz=translation[2])
+            force.update_xy(translation[0], translation[1])
+
+        self._rotation = np.dot(rot_matrix, self._rotation)
+        self._translation = np.dot(rot_matrix, self._translation) + translation
+
+        self._reinit_clipper()
+        if update:
+            self._update_hydrostatic_properties()
 
     def is_stable_in_roll(self):
         """Returns whether the mesh is stable in roll (GMx positive)
@@ -515,7 +751,8 @@ class Hydrostatics(object):
 
     @property
     def max_restart(self):
-        """The maximum number of random restart for hydrostatic equilibrium computations"""
+        """The maximum number of attempts for hydrostatic equilibrium computations, the first one included, so that
+        at most max_restart - 1 restarts are performed"""
         return self._solver_parameters['max_nb_restart']
 
     @max_restart.setter
@@ -539,6 +776,36 @@ class Hydrostatics(object):
         self._solver_parameters['stop_at_unstable'] = False
         return
 
+    @property
+    def seed(self):
+        """The seed of the random orientations used by restarts of hydrostatic equilibrium computations"""
+        return self._solver_parameters['seed']
+
+    @seed.setter
+    def seed(self, value):
+        """Set the seed of the random orientations used by restarts of hydrostatic equilibrium computations"""
+        self._solver_parameters['seed'] = int(value)
+
+    @property
+    def solver_history(self):
+        """The history of the last hydrostatic equilibrium computations.
+
+        There is one record per evaluation of the hydrostatic properties, given as a dict with the following keys:
+
+        * restart : the restart number
+        * iteration : the iteration number since the last restart
+        * residual_norm : the norm of the scaled residual before the step
+        * step : the (dz, thetax, thetay) step that has been tried
+        * radius : the trust region radius
+        * accepted : whether the step has been accepted
+        * time : the elapsed time since the beginning of computations (s)
+
+        Returns
+        -------
+        list
+        """
+        return self._solver_history
+
     def _reinit_clipper(self):
         try:
             del self.hs_data['clipper']
@@ -557,83 +824,38 @@ class Hydrostatics(object):
         #  que ses donnees
 
         # FIXME: on ne devrait recouper le maillage que si ce dernier a ete modifie !!!
+        # Only the integrals over the underwater part are needed so that the clipped mesh is not assembled
         try:
             clipper = self.hs_data['clipper']
-            clipped_mesh = clipper.clipped_mesh
         except KeyError:
-            clipper = MeshClipper(self.mesh, assert_closed_boundaries=True, verbose=False)
+            clipper = MeshClipper(self.mesh, assert_closed_boundaries=True, verbose=False, integrals_only=True)
             self.hs_data['clipper'] = clipper
-            clipped_mesh = clipper.clipped_mesh
-
-        # Retrieving faces properties for the clipped mesh
-        areas = clipped_mesh.faces_areas
-        # normals = clipped_mesh.faces_normals
-        # centers = clipped_mesh.faces_centers
-
-        if np.any(np.fabs(areas) < 1e-10):  # TODO: bloc a retirer
-            print('probleme de facette')
-            self.mesh.quick_save()
-            raise Exception
 
-        wet_surface_area = areas.sum()
+        wet_surface_area = clipper.clipped_area
 
-        inertia = clipped_mesh.eval_plain_mesh_inertias(rho_medium=self.rho_water)
+        inertia = clipper.eval_clipped_plain_inertias(rho_medium=self.rho_water)
         xb, yb, zb = inertia.gravity_center
         disp_volume = inertia.mass / self.rho_water
 
         # Computing quantities from intersection polygons
-        sigma0 = 0.  # \iint_{waterplane_area} dS = waterplane_area
-        sigma1 = 0.  # \iint_{waterplane_area} x dS
-        sigma2 = 0.  # \iint_{waterplane_area} y dS
-        sigma3 = 0.  # \iint_{waterplane_area} xy dS
-        sigma4 = 0.  # \iint_{waterplane_area} x^2 dS
-        sigma5 = 0.  # \iint_{waterplane_area} y^2 dS
-
-        xmin = []
-        xmax = []
-        ymin = []
-        ymax = []
-
         polygons = clipper.closed_polygons
-        for polygon in polygons:
-            polyverts = clipper.clipped_crown_mesh.vertices[polygon]
-
-            # TODO: voir si on conserve ce test...
-            if np.any(np.fabs(polyverts[:, 2]) > 1e-3):
-                print('The intersection polygon is not on the plane z=0')
-
-            xi, yi = polyverts[0, :2]
-            for (xii, yii) in polyverts[1:, :2]:
-                dx = xii - xi
-                dy = yii - yi
-                px = xi + xii
-                py = yi + yii
-                # a = xi * xi + xii * xii
-
-                sigma0 += dy * px
-                sigma1 += dy * (px * px - xi * xii)
-                sigma2 += dx * (py * py - yi * yii)
-                # sigma3 += dy * (py * a + 2 * px * (xi * yi + xii * yii))
-                sigma3 += dy * (py * px * px + yi * xi * xi + yii * xii * xii)
-                sigma4 += dy * (xi * xi + xii * xii) * px
-                sigma5 += dx * (yi * yi + yii * yii) * py
-
-                xi, yi = xii, yii
-
-            xmin.append(polyverts[:, 0].min())
-            xmax.append(polyverts[:, 0].max())
-            ymin.append(polyverts[:, 1].min())
-            ymax.append(polyverts[:, 1].max())
-
-        minx, maxx = [min(xmin), max(xmax)]
-        miny, maxy = [min(ymin), max(ymax)]
-
-        sigma0 /= 2
-        sigma1 /= 6
-        sigma2 /= -6
-        sigma3 /= 24
-        sigma4 /= 12
-        sigma5 /= -12
+        polyverts = clipper.clipped_crown_mesh.vertices[np.concatenate(polygons)]
+        offsets = np.cumsum([0] + [len(polygon) for polygon in polygons[:-1]])
+
+        # TODO: voir si on conserve ce test...
+        if np.any(np.fabs(polyverts[:, 2]) > 1e-3):
+            print('The intersection polygon is not on the plane z=0')
+
+        # sigma0 = \iint_{waterplane_area} dS = waterplane_area
+        # sigma1 = \iint_{waterplane_area} x dS
+        # sigma2 = \iint_{waterplane_area} y dS
+        # sigma3 = \iint_{waterplane_area} xy dS
+        # sigma4 = \iint_{waterplane_area} x^2 dS
+        # sigma5 = \iint_{waterplane_area} y^2 dS
+        sigma0, sigma1, sigma2, sigma3, sigma4, sigma5 = polygons_moments(polyverts, offsets).sum(axis=0)
+
+        minx, miny = polyverts[:, :2].min(axis=0)
+        maxx, maxy = polyverts[:, :2].max(axis=0)
 
         # Flotation surface
         waterplane_area = sigma0
@@ -671,7 +893,7 @@ class Hydrostatics(object):
         y_f = s34 / s33
         # TODO: ajouter xf et yf dans le rapport hydro !!
         
-        xmin, xmax, ymin, ymax, zmin, zmax = clipped_mesh.axis_aligned_bbox
+        xmin, xmax, ymin, ymax, zmin, zmax = clipper.clipped_axis_aligned_bbox
 
         # Storing data
         self.hs_data['wet_surface_area'] = wet_surface_area
@@ -680,6 +902,7 @@ class Hydrostatics(object):
         self.hs_data['buoy_center'] = np.array([xb, yb, zb], dtype=np.float)
         self.hs_data['flotation_center'] = np.array([x_f, y_f, 0.], dtype=np.float)
         self.hs_data['waterplane_area'] = waterplane_area
+        self.hs_data['waterplane_moments'] = np.array([sigma0, sigma1, sigma2, sigma3, sigma4, sigma5])
         self.hs_data['transversal_metacentric_radius'] = transversal_metacentric_radius
         self.hs_data['longitudinal_metacentric_radius'] = longitudinal_metacentric_radius
         self.hs_data['gm_x'] = gm_x
@@ -789,6 +1012,118 @@ class Hydrostatics(object):
 
         return residual
 
+    def get_residual_jacobian(self):
+        """Returns the jacobian matrix of the residual with respect to the mesh motions.
+
+        Motions are a vertical translation dz and rotations thetax and thetay around the Ox and Oy axes of the
+        reference frame. Contrary to the hydrostatic stiffness matrix, it accounts for the couplings induced by the
+        gravity force and the additional forces when the mesh is not at equilibrium.
+
+        Returns
+        -------
+        ndarray
+            The (3x3) matrix whose columns are the derivatives of the residual with respect to dz, thetax and thetay
+        """
+        sigma0, sigma1, sigma2, sigma3, sigma4, sigma5 = self.hs_data['waterplane_moments']
+        v_zb = self.hs_data['disp_volume'] * self.hs_data['buoy_center'][2]
+
+        jacobian = self._rhog * np.array([[-sigma0, -sigma2, sigma1],
+                                          [-sigma2, -sigma5 - v_zb, sigma3],
+                                          [sigma1, sigma3, -sigma4 - v_zb]], dtype=np.float)
+
+        jacobian += self.get_gravity_force().hs_jacobian
+        for force in self.additional_forces:
+            jacobian += force.hs_jacobian
+
+        return jacobian
+
+    def _save_state(self):
+        """Returns the data that are modified when the mesh is moved"""
+        forces = [(force.point.copy(), force.value.copy()) for force in self.additional_forces]
+        return (self.mesh.vertices, self._gravity_center.copy(), self._rotation.copy(), self._translation.copy(),
+                forces, self.hs_data.copy())
+
+    def _restore_state(self, state):
+        """Moves back the mesh to a state given by _save_state without updating hydrostatics"""
+        vertices, gravity_center, rotation, translation, forces, hs_data = state
+        self.mesh.vertices = vertices
+        self._gravity_center = gravity_center.copy()
+        self._rotation = rotation.copy()
+        self._translation = translation.copy()
+        for force, (point, value) in zip(self.additional_forces, forces):
+            force.point = point.copy()
+            force.value = value.copy()
+        self.hs_data = hs_data.copy()
+
+    def _restart_angles(self, nb_restart, random_state):
+        """Returns the orientation of the mesh for a restart of equilibrium computations.
+
+        The first restarts try capsized and heeled configurations, then orientations are drawn from the seeded random
+        generator so that computations are reproducible.
+        """
+        deterministic_angles = [(math.pi, 0.), (0., math.pi), (math.pi / 2, 0.), (-math.pi / 2, 0.),
+                                (0., math.pi / 2), (0., -math.pi / 2)]
+        if nb_restart <= len(deterministic_angles):
+            return deterministic_angles[nb_restart - 1]
+        return tuple(random_state.uniform(-math.pi, math.pi, 2))
+
+    def _cached_solve(self, operation, solver, warm_parameters=None, **parameters):
+        """Calls a solver, the result being retrieved from or stored in the cache if any.
+
+        Parameters
+        ----------
+        operation : str
+            The name of the computation
+        solver : callable
+            The solver method, called with parameters
+        warm_parameters : dict, optional
+            Parameters overriding the solver ones when it starts from the last position found for the mesh
+        parameters : dict
+            Parameters of the solver that are part of the computation key, except proxy_faces that only speeds up
+            computations
+
+        Returns
+        -------
+        int or None
+            The solver return code
+        """
+        if self.cache is None:
+            return solver(**parameters)
+
+        key_parameters = dict((name, value) for name, value in parameters.items() if name != 'proxy_faces')
+        key = self.cache.get_key(self, operation, **key_parameters)
+        mesh_key = self.cache.get_mesh_key(self, operation)
+
+        entry = self.cache.load(key)
+        if entry is not None:
+            if self.verbose:
+                print('\t-> Computation retrieved from cache')
+            # No solver iteration is done, the history of a previous computation must not be reported
+            self._solver_history = []
+            self._transform(entry['rotation'], entry['translation'], update=False)
+            self.hs_data = entry['hs_data']
+            return None if entry['code'] < 0 else entry['code']
+
+        initial_rotation = self._rotation.copy()
+        initial_translation = self._translation.copy()
+
+        entry = self.cache.load(mesh_key)
+        if entry is not None:
+            # Warm start from the last position found for the mesh
+            if self.verbose:
+                print('\t-> Starting from the last position found in cache for this mesh')
+            self._transform(entry['rotation'], entry['translation'])
+            parameters.update(warm_parameters or dict())
+
+        code = solver(**parameters)
+
+        # Transformation from the position before computations
+        rotation = np.dot(self._rotation, initial_rotation.T)
+        translation = self._translation - np.dot(rotation, initial_translation)
+        self.cache.store([key, mesh_key], rotation, translation, -1 if code is None else code, self.hs_data)
+
+        return code
+
     def set_displacement(self, disp):
         """
         Displaces the mesh at a prescribed displacement
@@ -804,6 +1139,10 @@ class Hydrostatics(object):
             print("----------------------------------------------")
 
         self.mass = disp
+        self._cached_solve('set_displacement', self._set_displacement)
+
+    def _set_displacement(self):
+        """Translates the mesh vertically so that its displacement equals its mass"""
 
         itermax = self._solver_parameters['itermax']
         reltol = self._solver_parameters['reltol']
@@ -814,6 +1153,10 @@ class Hydrostatics(object):
         dz = 0.
         iter = 0
 
+        # Bound of the heave steps, enlarged while steps are successful
+        z_step = z_relax
+        previous_residual = None
+
         while True:
             # print iter
             if iter == itermax:
@@ -821,16 +1164,18 @@ class Hydrostatics(object):
                     print(('\t-> No convergence of the displacement after %u iterations' % itermax))
                 break
 
-            # Translating the mesh
-            self.mesh.translate_z(dz)
-            self._gravity_center[2] += dz
-            total_dz += dz
+            # Translating the mesh, hydrostatics being already up to date for the initial position
+            if dz != 0.:
+                self.mesh.translate_z(dz)
+                self._gravity_center[2] += dz
+                self._translation[2] += dz
+                total_dz += dz
 
-            for force in self.additional_forces:
-                force.update(dz=dz)
+                for force in self.additional_forces:
+                    force.update(dz=dz)
 
-            self._reinit_clipper()
-            self._update_hydrostatic_properties()
+                self._reinit_clipper()
+                self._update_hydrostatic_properties()
 
             residual = self.delta_fz
             if math.fabs(residual / self._mg) < reltol:
@@ -839,18 +1184,31 @@ class Hydrostatics(object):
                     print(('\t-> Mesh has been translated in z by: %f' % total_dz))
                 break
 
+            if previous_residual is not None:
+                if math.fabs(residual) < math.fabs(previous_residual):
+                    if math.fabs(dz) >= z_step:
+                        z_step *= 2.
+                else:
+                    z_step *= 0.5
+            previous_residual = residual
+
             dz = residual / (self._rhog * self.flotation_surface_area)
-            if math.fabs(dz) > z_relax:
-                dz = math.copysign(z_relax, dz)
+            if math.fabs(dz) > z_step:
+                dz = math.copysign(z_step, dz)
             iter += 1
 
-    def equilibrate(self, init_disp=True):
+    def equilibrate(self, init_disp=True, proxy_faces=None):
         """Performs 3D equilibrium search.
         
         Parameters
         ----------
         init_disp : bool, optional
             Flag to indicate if the mesh has to be first placed at its displacement. Default is True.
+        proxy_faces : int, optional
+            If given, the equilibrium is first searched (including restarts) on a decimated proxy of the mesh
+            having this number of faces. Computations on the full mesh then start from the proxy equilibrium
+            position so that only a few iterations are needed. Default is None (no proxy).
+
         Returns
         -------
         int
@@ -864,132 +1222,148 @@ class Hydrostatics(object):
         * 0 : Failed to find an equilibrium position
         * 1 : A stable equilibrium configuration has been reached
         * 2 : An unstable equilibrium configuration has been reached
+
+        The equilibrium is searched by Newton iterations using the jacobian of the residual given by
+        get_residual_jacobian. Steps are limited by a trust region whose initial size is given by z_relax and
+        theta_relax. When no stable equilibrium is found, computations are restarted from the initial configuration
+        capsized, heeled and then randomly oriented, random orientations being drawn with the seed parameter. Every
+        evaluation of the hydrostatic properties is recorded in solver_history.
         """
-        
-        linear_solver = np.linalg.solve
-        
+
+        return self._cached_solve('equilibrate', self._equilibrate, {'init_disp': False},
+                                  init_disp=init_disp, proxy_faces=proxy_faces)
+
+    def _equilibrate(self, init_disp=True, proxy_faces=None):
+        """Performs 3D equilibrium search without using the cache. See equilibrate."""
+
+        # Coarse equilibrium search on a decimated mesh
+        if proxy_faces is not None and proxy_faces < self.mesh.nb_faces:
+            if self._equilibrate_proxy(proxy_faces, init_disp=init_disp) != 0:
+                init_disp = False
+
         # Initial displacement equilibrium
         if init_disp:
             if self.verbose:
                 print("First placing the mesh at the target displacement")
                 print("-------------------------------------------------")
-            self.set_displacement(self.mass)
+            self._set_displacement()
 
         if self.verbose:
             print('\nComputing equilibrium from initial condition.')
             print('----------------------------------------------')
 
         # Retrieving solver parameters
-        z_relax = self._solver_parameters['z_relax']
-        theta_relax = self._solver_parameters['theta_relax']
-        theta_relax_x = math.radians(theta_relax)
-        theta_relax_y = math.radians(theta_relax)
+        # Relaxation values define the unit trust region of the (dz, thetax, thetay) steps
+        step_scale = np.array([self._solver_parameters['z_relax'],
+                               math.radians(self._solver_parameters['theta_relax']),
+                               math.radians(self._solver_parameters['theta_relax'])])
 
         itermax = self._solver_parameters['itermax']
         reltol = self._solver_parameters['reltol']
         max_nb_restart = self._solver_parameters['max_nb_restart']
+        random_state = np.random.RandomState(self._solver_parameters['seed'])
 
-        rhog = self._rhog
-        mg = self._mg
+        self._solver_history = []
+        start_time = time.time()
+        initial_state = self._save_state()
 
-        # Initialization
-        dz = thetax = thetay = 0.
         iter = nb_restart = 0
-        unstable_config = False
-
         while True:
-            # print '\n', iter
-            if unstable_config or (iter == (nb_restart + 1) * (itermax - 1)):
-                if self.verbose:
-                    if unstable_config:
-                        print('Unstable equilibrium reached.')
-                        print(('\t-> Keep searching a stable configuration by random restart number %u.' % (
-                        nb_restart + 1)))
-                    else:
-                        print(('Failed to find an equilibrium configuration with these initial conditions in %u ' \
-                              'iterations.' % itermax))
-                        print(('\t-> Keep searching by random restart number %u.' % (nb_restart + 1)))
-
-                unstable_config = False
-
-                # Max iterations reached
-                if nb_restart < max_nb_restart - 1:
-                    nb_restart += 1
-                    # Random on the position of the body
-                    thetax, thetay = np.random.rand(2) * math.pi
-                    rot_matrix = self.mesh.rotate([thetax, thetay, 0.])
-                    self._gravity_center = np.dot(rot_matrix, self._gravity_center)
-                    self._rotation = np.dot(rot_matrix, self._rotation)
-                    self._reinit_clipper()
-                    self._update_hydrostatic_properties()
-
-                    for force in self.additional_forces:
-                        force.update(rot=rot_matrix)
-
-                    dz = thetax = thetay = 0.
-
-                else:
-                    # Max number of restart allowed. Failed to find an equilibrium configuration.
-                    code = 0
+            # Trust region Newton iterations from the current configuration
+            converged = False
+            radius = 1.
+            for iteration in range(itermax):
+                scale = self._scale
+                residual = self.residual / scale
+                residual_norm = np.linalg.norm(residual)
+
+                if np.all(np.fabs(residual) < reltol):
+                    converged = True
                     break
 
-            # Applying transformation to the mesh
-            self.mesh.translate_z(dz)
-            self._gravity_center[2] += dz
-
-            rot_matrix = self.mesh.rotate([thetax, thetay, 0.])
-            self._gravity_center = np.dot(rot_matrix, self._gravity_center)
-            self._rotation = np.dot(rot_matrix, self._rotation)
-
-            # Updating force data
-            for force in self.additional_forces:
-                force.update(dz=dz, rot=rot_matrix)
-
-            self._reinit_clipper()
-            self._update_hydrostatic_properties()
-
-            # TODO: animation may be trigged here
-
-            residual = self.residual
-            scale = self._scale
+                jacobian = self.get_residual_jacobian() / scale[:, np.newaxis]
+                try:
+                    step = -np.linalg.solve(jacobian, residual)
+                except np.linalg.LinAlgError:
+                    step = -np.linalg.lstsq(jacobian, residual, rcond=None)[0]
+
+                step_norm = np.linalg.norm(step / step_scale)
+                if step_norm > radius:
+                    step *= radius / step_norm
+                    step_norm = radius
+                predicted = residual_norm**2 - np.linalg.norm(residual + np.dot(jacobian, step))**2
+
+                # Trying the step
+                state = self._save_state()
+                try:
+                    dz, thetax, thetay = step
+                    self._transform(_rodrigues(thetax, thetay), [0., 0., dz])
+                    new_residual_norm = np.linalg.norm(self.residual / scale)
+                except (RuntimeError, KeyError, ValueError):
+                    # Clipping failed, typically because the mesh gets out of water
+                    new_residual_norm = np.inf
+
+                if predicted > 0.:
+                    ratio = (residual_norm**2 - new_residual_norm**2) / predicted
+                else:
+                    ratio = -1.
+                accepted = ratio > 1e-4
+
+                self._solver_history.append({'restart': nb_restart,
+                                             'iteration': iteration,
+                                             'residual_norm': residual_norm,
+                                             'step': step,
+                                             'radius': radius,
+                                             'accepted': accepted,
+                                             'time': time.time() - start_time})
+                iter += 1
+
+                # Updating the trust region
+                if accepted:
+                    if ratio > 0.75 and step_norm >= radius:
+                        radius *= 2.
+                    elif ratio < 0.25:
+                        radius = 0.5 * step_norm
+                else:
+                    self._restore_state(state)
+                    radius = 0.25 * step_norm
+                    if radius < 1e-10:
+                        # The solver stalls
+                        break
 
-            if np.all(np.fabs(self.residual / scale) < reltol):
-                # Convergence at an equilibrium
+            if converged:
                 if self.isstable():
                     # Stable equilibrium
                     code = 1
                     break
-                else:
-                    if self._solver_parameters['stop_at_unstable']:
-                        # Unstable configuration reached
-                        code = 2
-                        break
-                    # TODO: mettre une option permettant de choisir si on s'arrete a des configs instables
-                    else:
-                        # We force the restart with an other random orientation as initial condition
-                        unstable_config = True
-                        iter += 1
-                        continue
-
-            # Computing correction
-            stiffness_matrix = self.hs_data['stiffness_matrix']
-            dz, thetax, thetay = linear_solver(stiffness_matrix, residual)
-
-            # Relaxation
-            if math.fabs(dz) > z_relax:
-                dz = math.copysign(z_relax, dz)
+                elif self._solver_parameters['stop_at_unstable']:
+                    # Unstable configuration reached
+                    code = 2
+                    break
 
-            if math.fabs(thetax) > theta_relax_x:
-                thetax = math.copysign(theta_relax_x, thetax)
+            if nb_restart >= max_nb_restart - 1:
+                # Max number of attempts, the first one included, allowed. Failed to find an equilibrium configuration.
+                code = 0
+                break
 
-            if math.fabs(thetay) > theta_relax_y:
-                thetay = math.copysign(theta_relax_y, thetay)
+            # Restarting from the initial configuration with an other orientation
+            nb_restart += 1
+            if self.verbose:
+                if converged:
+                    print('Unstable equilibrium reached.')
+                    print(('\t-> Keep searching a stable configuration by restart number %u.' % nb_restart))
+                else:
+                    print('Failed to find an equilibrium configuration with these initial conditions.')
+                    print(('\t-> Keep searching by restart number %u.' % nb_restart))
 
-            iter += 1
+            self._restore_state(initial_state)
+            thetax, thetay = self._restart_angles(nb_restart, random_state)
+            self._transform(_rodrigues(thetax, thetay), [0., 0., 0.])
 
         # Zeroing xcog and ycog
         self.mesh.translate([-self._gravity_center[0], -self._gravity_center[1], 0.])
         self.hs_data['buoy_center'][:2] -= self._gravity_center[:2]
+        self._translation[:2] -= self._gravity_center[:2]
 
         for force in self.additional_forces:
             force.update_xy(-self._gravity_center[0], -self._gravity_center[1])
@@ -1000,12 +1374,171 @@ class Hydrostatics(object):
             if code == 0:
                 print("\t-> Maximum number of restart reached. Failed to find an equilibrum position.")
             elif code == 1:
-                print(("Stable equilibrium reached after %u iterations and %u random restart" % (iter, nb_restart)))
+                print(("Stable equilibrium reached after %u iterations and %u restart" % (iter, nb_restart)))
             elif code == 2:
-                print(('Unstable equilibrium reached after %u iterations and %u random restart' % (iter, nb_restart)))
+                print(('Unstable equilibrium reached after %u iterations and %u restart' % (iter, nb_restart)))
 
         return code
 
+    def _equilibrate_proxy(self, proxy_faces, init_disp=True):
+        """Searches the equilibrium of a decimated copy of the mesh and moves the mesh at the proxy equilibrium.
+
+        Parameters
+        ----------
+        proxy_faces : int
+            The number of faces of the proxy mesh
+        init_disp : bool, optional
+            Flag to indicate if the proxy has to be first placed at its displacement. Default is True.
+
+        Returns
+        -------
+        int
+            The code returned by the proxy equilibrium solver. If 0, the mesh is not moved.
+        """
+        if self.verbose:
+            print(("\nSearching equilibrium on a proxy mesh of %u faces" % proxy_faces))
+            print("--------------------------------------------------")
+
+        # The decimated mesh is kept in the initial mesh frame so that it can be reused by later calls
+        if self.backup.get('proxy_faces') != proxy_faces:
+            proxy_mesh = self.backup['init_mesh'].copy()
+            proxy_mesh.verbose_off()
+            proxy_mesh.merge_duplicates()
+            proxy_mesh.decimate(target_faces=proxy_faces)
+            self.backup['proxy_mesh'] = proxy_mesh
+            self.backup['proxy_faces'] = proxy_faces
+
+        proxy_mesh = self.backup['proxy_mesh'].copy()
+        proxy_mesh.vertices = np.dot(proxy_mesh.vertices, self._rotation.T) + self._translation
+
+        proxy = Hydrostatics(proxy_mesh, cog=self._gravity_center, rho_water=self._rho_water, grav=self._gravity)
+        try:
+            proxy.mass = self.mass
+        except ValueError:
+            # The proxy is sinking due to its slightly smaller volume
+            return 0
+
+        proxy._solver_parameters = self._solver_parameters.copy()
+        proxy.additional_forces = [copy.deepcopy(force) for force in self.additional_forces]
+
+        try:
+            code = proxy.equilibrate(init_disp=init_disp)
+        except (RuntimeError, KeyError):
+            # Clipping may fail on a coarse proxy, the search is then entirely done on the full mesh
+            code = 0
+
+        if code != 0:
+            self._transform(proxy.rotation, proxy.translation)
+
+        if self.verbose:
+            if code == 0:
+                print("\t-> Failed to find an equilibrium position with the proxy mesh")
+            else:
+                print("\t-> Finishing equilibrium computations on the full mesh")
+
+        return code
+
+    def set_pose(self, draught, heel=0., trim=0., gm=None, zg=None):
+        """Solves the inverse hydrostatics problem by setting the mass and the gravity center so that the mesh is at
+        equilibrium in a prescribed position.
+
+        The mesh is moved from its initial position by a rotation of angle heel around Ox followed by a rotation of
+        angle trim around Oy, and is then translated vertically so that its lowest point is at the prescribed draught.
+        The displacement and the buoyancy center being obtained from a single clipping in this position, the mass is
+        set to the displacement and the gravity center is placed on the vertical line passing through the buoyancy
+        center. Additional forces are not taken into account.
+
+        Parameters
+        ----------
+        draught : float
+            The depth of the lowest point of the mesh (m)
+        heel : float, optional
+            Rotation angle around Ox (rad). Default is 0.
+        trim : float, optional
+            Rotation angle around Oy (rad). Default is 0.
+        gm : float, optional
+            The transversal metacentric height (m) used to place the gravity center vertically.
+        zg : float, optional
+            The vertical position of the gravity center in the initial mesh frame (m). It is only used when gm is not
+            given. Default is the current one.
+        """
+        # Gravity center in the initial mesh frame
+        gravity_center = np.dot(self._rotation.T, self._gravity_center - self._translation)
+        if zg is None:
+            zg = gravity_center[2]
+
+        rotation = np.dot(_rodrigues(0., trim), _rodrigues(heel, 0.))
+        vertices = self.backup['init_mesh'].vertices[np.unique(self.backup['init_mesh'].faces)]
+        translation = np.array([0., 0., -draught - np.dot(vertices, rotation[2]).min()])
+
+        # Moving the mesh from its current position, which is the only clipping operation
+        rot_matrix = np.dot(rotation, self._rotation.T)
+        self._transform(rot_matrix, translation - np.dot(rot_matrix, self._translation))
+
+        xb, yb, zb = self.buoyancy_center
+        self.mass = self.hs_data['disp_mass'] / 1000.
+
+        if gm is not None:
+            z_world = zb + self.transversal_metacentric_radius - gm
+        else:
+            # Intersection of the vertical line passing through B with the plane z = zg of the initial mesh frame
+            z_world = translation[2] + (zg - rotation[0, 2] * xb - rotation[1, 2] * yb) / rotation[2, 2]
+
+        self._gravity_center = np.array([xb, yb, z_world], dtype=np.float)
+        self.backup['gravity_center'] = np.dot(rotation.T, self._gravity_center - translation)
+
+        # Hydrostatic properties depending on the gravity center are updated without clipping again
+        self._update_hydrostatic_properties()
+
+    def get_curves_of_form(self, draughts=None, nb_draughts=50):
+        """Computes the hydrostatic curves of form of the mesh in its current position.
+
+        Parameters
+        ----------
+        draughts : array_like, optional
+            The draughts, measured from the lowest point of the mesh, at which the curves are evaluated.
+        nb_draughts : int, optional
+            When draughts is not given, the number of draughts evenly distributed up to the mesh height. Default is
+            50.
+
+        Returns
+        -------
+        dict
+            The curves of form, see get_curves_of_form function
+
+        See Also
+        --------
+        get_curves_of_form
+        """
+        return get_curves_of_form(self.mesh, draughts=draughts, nb_draughts=nb_draughts, rho_water=self._rho_water)
+
+    def get_cross_curves(self, displacements, heels, xg=None, free_trim=True):
+        """Computes the cross curves of stability of the mesh in its current position, taken as the upright one.
+
+        Parameters
+        ----------
+        displacements : array_like
+            The mass displacements (tons)
+        heels : array_like
+            The heel angles, that are rotation angles around Ox (rad)
+        xg : float or array_like, optional
+            The longitudinal position of the gravity center used for free trim computations. Default is the buoyancy
+            center longitudinal position in the upright position at the same displacement.
+        free_trim : bool, optional
+            Whether the mesh trims freely. Default is True.
+
+        Returns
+        -------
+        dict
+            The cross curves, see get_cross_curves function
+
+        See Also
+        --------
+        get_cross_curves
+        """
+        return get_cross_curves(self.mesh, displacements, heels, xg=xg, free_trim=free_trim,
+                                rho_water=self._rho_water)
+
     def get_hydrostatic_report(self):
         """Returns a hydrostatic report for the current configuration
         
@@ -1166,3 +1699,317 @@ class Hydrostatics(object):
         self.viewer.finalize()
 
         return
+
+
+def _triangles_waterplane_integrals(triangles):
+    """Computes the surface integrals of triangles that are needed by curves of form computations.
+
+    Returns a (n x 11) array whose columns are the triangles areas and the integrals of n_z, x n_z, y n_z, z n_z,
+    yz n_z, xz n_z, xy n_z, x**2 n_z, y**2 n_z and z**2 n_z over the triangles, n_z being the vertical component of
+    their unit normal.
+    """
+    normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    double_areas = np.linalg.norm(normals, axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        nz = normals[:, 2] / double_areas
+    nz[double_areas == 0.] = 0.
+
+    integrals = np.zeros((triangles.shape[0], 11), dtype=np.float)
+    integrals[:, 0] = 0.5 * double_areas
+    integrals[:, 1] = 0.5 * normals[:, 2]
+    if triangles.shape[0] > 0:
+        integrals[:, 2:] = nz[:, None] * Mesh._compute_triangles_integrals(triangles)[:9].T
+
+    return integrals
+
+
+class _WaterlineSweep(object):
+    """Integrals of triangles over their part lying under planes z = a x + c.
+
+    Triangles are sorted once by their highest point so that those lying entirely under a plane are accounted for by
+    prefix sums, only the triangles within the vertical band spanned by the plane being clipped.
+
+    Parameters
+    ----------
+    triangles : ndarray
+        (n x 3 x 3) array of the triangles vertices coordinates
+    """
+    def __init__(self, triangles):
+        self.triangles = triangles
+        self.zmin = triangles[:, :, 2].min(axis=1)
+        self.zmax = triangles[:, :, 2].max(axis=1)
+        self.xmax = np.fabs(triangles[:, :, 0]).max()
+
+        self.sorted_ids = np.argsort(self.zmax)
+        self.sorted_zmax = self.zmax[self.sorted_ids]
+        self.cumulated = np.zeros((len(triangles) + 1, 11), dtype=np.float)
+        np.cumsum(_triangles_waterplane_integrals(triangles[self.sorted_ids]), axis=0, out=self.cumulated[1:])
+
+    def get_integrals(self, c, a=0.):
+        """Returns the (11,) integrals of _triangles_waterplane_integrals over the part of triangles under the plane
+        z = a x + c"""
+        bound = math.fabs(a) * self.xmax
+        nb_under = np.searchsorted(self.sorted_zmax, c - bound, side='right')
+
+        band = self.sorted_ids[nb_under:]
+        band = band[self.zmin[band] < c + bound]
+        triangles = self.triangles[band]
+        clipped_triangles, _ = clip_triangles(triangles, triangles[:, :, 2] - a * triangles[:, :, 0] - c)
+
+        return self.cumulated[nb_under] + _triangles_waterplane_integrals(clipped_triangles).sum(axis=0)
+
+    def get_levels_integrals(self, levels):
+        """Returns the (nl x 11) integrals of _triangles_waterplane_integrals over the part of triangles under the
+        horizontal planes z = levels, levels being sorted.
+
+        Every triangle straddling some levels is clipped once per level in a single batch."""
+        integrals = self.cumulated[np.searchsorted(self.sorted_zmax, levels, side='right')]
+
+        # Triangles straddling a level are those whose vertical extent strictly contains it
+        first_level = np.searchsorted(levels, self.zmin, side='right')
+        last_level = np.searchsorted(levels, self.zmax, side='left')
+        nb_levels = np.maximum(last_level - first_level, 0)
+        straddling_ids = np.repeat(np.arange(len(self.triangles)), nb_levels)
+        levels_ids = np.repeat(first_level - np.cumsum(nb_levels) + nb_levels, nb_levels) + np.arange(nb_levels.sum())
+
+        clipped_triangles, ids = clip_triangles(self.triangles[straddling_ids],
+                                                self.triangles[straddling_ids, :, 2] - levels[levels_ids, None])
+        clipped_integrals = _triangles_waterplane_integrals(clipped_triangles)
+        for i in range(11):
+            integrals[:, i] += np.bincount(levels_ids[ids], weights=clipped_integrals[:, i], minlength=len(levels))
+
+        return integrals
+
+
+def get_curves_of_form(mesh, draughts=None, nb_draughts=50, rho_water=1023.):
+    """Computes the hydrostatic curves of form of a mesh for a set of draughts.
+
+    The mesh is kept in its position and the free surface is swept upward from its lowest point. The submerged
+    volume properties are obtained from surface integrals over the wet part of the hull only, the lid lying in the
+    free surface plane being accounted for by the divergence theorem. Faces are sorted by their highest point so that
+    integrals over the faces that are entirely submerged at a draught are given by prefix sums. Only the faces
+    straddling the free surface plane are clipped, each one against the draughts it spans.
+
+    Parameters
+    ----------
+    mesh : Mesh
+        The mesh, in its upright position. Its part under the highest draught must be watertight.
+    draughts : array_like, optional
+        The draughts, measured from the lowest point of the mesh, at which the curves are evaluated.
+    nb_draughts : int, optional
+        When draughts is not given, the number of draughts evenly distributed up to the mesh height. Default is 50.
+    rho_water : float, optional
+        The density of water (in kg/m**3). Default is 1023 kg/m**3.
+
+    Returns
+    -------
+    dict
+        Arrays of the curves of form, with keys:
+
+        * draught: the draughts (m)
+        * disp_volume: the displacement volume (m**3)
+        * displacement: the mass displacement (tons)
+        * wet_surface_area: the area of the wet surface (m**2)
+        * waterplane_area: the area of the flotation plane (m**2)
+        * xb, yb, kb: the buoyancy center position, kb being measured from the lowest point of the mesh (m)
+        * xf, yf: the flotation center position (m)
+        * bmt, bml: the transversal and longitudinal metacentric radii (m)
+        * kmt, kml: the transversal and longitudinal metacenter heights above the lowest point of the mesh (m)
+
+    Note
+    ----
+    Metacentric radii are computed with the second moments of area of the flotation plane about axes passing by the
+    flotation center.
+    """
+    vertices = mesh.vertices.copy()
+    zmin, zmax = vertices[:, 2].min(), vertices[:, 2].max()
+
+    if draughts is None:
+        draughts = np.linspace(0., zmax - zmin, int(nb_draughts) + 1)[1:]
+    draughts = np.asarray(draughts, dtype=np.float).ravel()
+
+    # Working with vertical coordinates measured from the lowest point and sorted draughts
+    vertices[:, 2] -= zmin
+    order = np.argsort(draughts)
+    levels = draughts[order]
+
+    faces = mesh.faces
+    quads = faces[:, 0] != faces[:, 3]
+    triangles = vertices[np.concatenate((faces[:, :3], faces[quads][:, (0, 2, 3)]))]
+    integrals = _WaterlineSweep(triangles).get_levels_integrals(levels)
+
+    area, s0, sx, sy, sz, syz, sxz, sxy, sxx, syy, szz = integrals.T
+
+    # Integrals over the flotation plane and submerged volume from the divergence theorem
+    waterplane_area = -s0
+    disp_volume = sz - levels * s0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        xb = (sxz - levels * sx) / disp_volume
+        yb = (syz - levels * sy) / disp_volume
+        kb = 0.5 * (szz - levels**2 * s0) / disp_volume
+
+        xf = sx / s0
+        yf = sy / s0
+        bmt = (-syy - waterplane_area * yf**2) / disp_volume
+        bml = (-sxx - waterplane_area * xf**2) / disp_volume
+
+    curves = {'draught': levels,
+              'disp_volume': disp_volume,
+              'displacement': rho_water * disp_volume / 1000.,
+              'wet_surface_area': area,
+              'waterplane_area': waterplane_area,
+              'xb': xb,
+              'yb': yb,
+              'kb': kb,
+              'xf': xf,
+              'yf': yf,
+              'bmt': bmt,
+              'bml': bml,
+              'kmt': kb + bmt,
+              'kml': kb + bml}
+
+    # Back to the draughts order given by the user
+    inverse_order = np.empty_like(order)
+    inverse_order[order] = np.arange(len(order))
+
+    return dict((key, value[inverse_order]) for (key, value) in curves.items())
+
+
+def _solve_waterline(sweep, volume, xg, c, a, free_trim, zbounds, reltol=1e-8, itermax=50):
+    """Solves for the plane z = a x + c under which the volume is given and, if free_trim, whose buoyancy center is
+    on the vertical of x = xg. Returns c, a and the integrals under the plane."""
+    lower, upper = zbounds
+
+    for _ in range(itermax):
+        integrals = sweep.get_integrals(c, a)
+        _, s0, sx, sy, sz, syz, sxz, sxy, sxx, syy, szz = integrals
+
+        disp_volume = sz - a * sx - c * s0
+        x_volume = sxz - a * sxx - c * sx
+        z_volume = 0.5 * (szz - a * a * sxx - 2. * a * c * sx - c * c * s0)
+
+        f_volume = disp_volume - volume
+        f_moment = x_volume - xg * disp_volume + a * z_volume if free_trim else 0.
+
+        # The volume increasing with c at a given slope, the waterline is bracketed
+        if not free_trim:
+            if f_volume < 0.:
+                lower = c
+            else:
+                upper = c
+
+        if math.fabs(f_volume) < reltol * volume and math.fabs(f_moment) < reltol * volume * sweep.xmax:
+            break
+
+        if free_trim:
+            jacobian = np.array([[-s0, -sx],
+                                 [-sx + xg * s0 - a * (a * sx + c * s0),
+                                  -sxx + xg * sx + z_volume - a * (a * sxx + c * sx)]])
+            try:
+                dc, da = np.linalg.solve(jacobian, [-f_volume, -f_moment])
+            except np.linalg.LinAlgError:
+                dc, da = 0.5 * (lower + upper) - c, 0.
+            # Limiting trim steps to 0.1 rad
+            if math.fabs(da) > 0.1:
+                dc *= 0.1 / math.fabs(da)
+                da = math.copysign(0.1, da)
+        else:
+            dc = f_volume / s0 if s0 < 0. else np.inf
+            da = 0.
+
+        # Bisection when Newton steps get out of the bracket
+        if not lower < c + dc < upper:
+            dc = 0.5 * (lower + upper) - c
+        c += dc
+        a += da
+
+    return c, a, integrals
+
+
+def get_cross_curves(mesh, displacements, heels, xg=None, free_trim=True, rho_water=1023.):
+    """Computes the cross curves of stability of a mesh.
+
+    For every heel angle, the mesh is rotated around the Ox axis passing by the keel point K and triangles are sorted
+    once by their highest point. Waterlines of the displacements are then searched with the mesh at this heel by a
+    Newton method, each one starting from the waterline of the previous displacement. With free trim, waterlines are
+    planes z = a x + c in the heeled mesh frame, the trim being the angle arctan(a).
+
+    Parameters
+    ----------
+    mesh : Mesh
+        The mesh, in its upright position. It must be watertight.
+    displacements : array_like
+        The mass displacements (tons)
+    heels : array_like
+        The heel angles, that are rotation angles around Ox (rad)
+    xg : float or array_like, optional
+        The longitudinal position of the gravity center used for free trim computations, for every displacement.
+        Default is the buoyancy center longitudinal position in the upright position at the same displacement.
+    free_trim : bool, optional
+        Whether the mesh trims freely so that the buoyancy center is on the vertical of the gravity center. If False,
+        the mesh is heeled without trim. Default is True.
+    rho_water : float, optional
+        The density of water (in kg/m**3). Default is 1023 kg/m**3.
+
+    Returns
+    -------
+    dict
+        Arrays with keys:
+
+        * heel: the heel angles (rad), of size nh
+        * displacement: the displacements (tons), of size nd
+        * kn: (nh x nd) array of the righting levers KN (m), which are the horizontal distances from the buoyancy
+          center to the keel point, positive when the buoyancy force gives a moment opposed to the heel
+        * trim: (nh x nd) array of the trim angles around Oy (rad)
+
+    Note
+    ----
+    The keel point K is the point of coordinates (0, 0, zmin) in the upright mesh, zmin being the lowest vertical
+    position of the mesh.
+    """
+    displacements = np.asarray(displacements, dtype=np.float).ravel()
+    heels = np.asarray(heels, dtype=np.float).ravel()
+    volumes = displacements * 1000. / rho_water
+
+    vertices = mesh.vertices - [0., 0., mesh.vertices[:, 2].min()]
+    faces = mesh.faces
+    quads = faces[:, 0] != faces[:, 3]
+    triangles = vertices[np.concatenate((faces[:, :3], faces[quads][:, (0, 2, 3)]))]
+
+    if xg is None:
+        # Buoyancy center in the upright position
+        sweep = _WaterlineSweep(triangles)
+        xg = np.zeros(len(volumes), dtype=np.float)
+        c = 0.
+        for i, volume in enumerate(volumes):
+            c, _, integrals = _solve_waterline(sweep, volume, 0., c, 0., False, (0., vertices[:, 2].max()))
+            sx, sxz = integrals[2], integrals[6]
+            xg[i] = (sxz - c * sx) / volume
+    xg = np.broadcast_to(np.asarray(xg, dtype=np.float), volumes.shape)
+
+    kn = np.zeros((len(heels), len(volumes)), dtype=np.float)
+    trim = np.zeros((len(heels), len(volumes)), dtype=np.float)
+
+    # Displacements are swept in increasing order so that each waterline starts from the previous one
+    order = np.argsort(volumes)
+    waterlines = np.zeros((len(volumes), 2), dtype=np.float)
+
+    for ih, heel in enumerate(heels):
+        heeled_triangles = np.dot(triangles, _rodrigues(heel, 0.).T)
+        sweep = _WaterlineSweep(heeled_triangles)
+        zbounds = (heeled_triangles[:, :, 2].min() - sweep.xmax, heeled_triangles[:, :, 2].max() + sweep.xmax)
+
+        for k, i in enumerate(order):
+            if k == 0:
+                # Starting from the same displacement at the previous heel
+                c, a = waterlines[i] if ih > 0 else (0.5 * (zbounds[0] + zbounds[1]), 0.)
+            c, a, integrals = _solve_waterline(sweep, volumes[i], xg[i], c, a, free_trim, zbounds)
+            waterlines[i] = c, a
+
+            _, s0, sx, sy, _, syz, _, sxy, _, _, _ = integrals
+            y_volume = syz - a * sxy - c * sy
+            kn[ih, i] = -y_volume / volumes[i]
+            trim[ih, i] = math.atan(a)
+
+    return {'heel': heels, 'displacement': displacements, 'kn': kn, 'trim': trim}
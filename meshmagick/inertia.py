@@ -10,7 +10,13 @@ from . import densities
 
 # FIXME: attention, changer les signes pour les produits d'inertie !
 # TODO: ajouter la production d'inerties de solides connus --> utile pour comparaison !!
-# TODO: indiquer une frame d'expression ...
+
+
+def _huygens_transports(masses, vectors):
+    """Returns the (n x 3 x 3) Huygens terms of masses located at vectors from the reduction points"""
+    squared_norms = np.einsum('ij, ij -> i', vectors, vectors)
+    return masses[:, None, None] * (squared_norms[:, None, None] * np.eye(3) -
+                                    vectors[:, :, None] * vectors[:, None, :])
 
 
 class RigidBodyInertia(object):
@@ -81,8 +87,8 @@ class RigidBodyInertia(object):
     @reduction_point.setter
     def reduction_point(self, point):
         """Set the reduction point"""
-        mat_at_cog = self.at_cog.inertia_matrix
         assert len(point) == 3
+        mat_at_cog = self._3d_rotational_inertia - self._huygens_transport()
         self._point = np.asarray(point, dtype=np.float)
         self._3d_rotational_inertia = mat_at_cog + self._huygens_transport()
     
@@ -120,6 +126,78 @@ class RigidBodyInertia(object):
     def _huygens_transport(self):
         p_g = self._cog - self._point
         return self._mass * (np.dot(p_g, p_g) * np.eye(3) - np.outer(p_g, p_g))
+
+    def get_principal_axes(self):
+        """Get the principal moments of inertia and the principal axes at cog.
+
+        Returns
+        -------
+        moments : ndarray
+            The 3 principal moments of inertia in ascending order
+        axes : ndarray
+            (3x3) array whose columns are the principal axes
+        """
+        return np.linalg.eigh(self.at_cog.inertia_matrix)
+
+    def get_matrices_at(self, points, rotations=None):
+        """Get the inertia matrix at several reduction points and frames at once.
+
+        Parameters
+        ----------
+        points : array_like
+            (n x 3) array of reduction points, or a single point
+        rotations : array_like, optional
+            (n x 3 x 3) array of rotation matrices, or a single one, whose columns are the axes of the frames in which
+            the matrices are expressed. Default is the current frame.
+
+        Returns
+        -------
+        ndarray
+            (n x 3 x 3) array of inertia matrices, or a (3 x 3) one if a single point and rotation are given
+        """
+        points = np.asarray(points, dtype=np.float)
+        single = points.ndim == 1 and (rotations is None or np.ndim(rotations) == 2)
+        points = np.atleast_2d(points)
+        assert points.shape[1] == 3
+
+        mat_at_cog = self._3d_rotational_inertia - self._huygens_transport()
+        matrices = mat_at_cog + _huygens_transports(np.full(len(points), self._mass), self._cog - points)
+
+        if rotations is not None:
+            rotations = np.asarray(rotations, dtype=np.float)
+            matrices = np.einsum('...ji, ...jk, ...kl -> ...il', rotations, matrices, rotations)
+
+        if single:
+            matrices = matrices.reshape((3, 3))
+        return matrices
+
+    def get_inertia_at(self, point, rotation=None):
+        """Returns a new inertia object that is expressed at an other reduction point and in an other frame.
+
+        Parameters
+        ----------
+        point : array_like
+            The new reduction point, in the current frame
+        rotation : array_like, optional
+            (3 x 3) rotation matrix whose columns are the axes of the new frame. This frame shares its origin with the
+            current one. The center of gravity and the reduction point of the returned object are expressed in it.
+            Default is the current frame.
+
+        Returns
+        -------
+        RigidBodyInertia
+        """
+        point = np.asarray(point, dtype=np.float)
+        assert point.shape == (3,)
+        matrix = self.get_matrices_at(point, rotation)
+        cog = self._cog
+        if rotation is not None:
+            rotation = np.asarray(rotation, dtype=np.float)
+            cog = np.dot(cog, rotation)
+            point = np.dot(point, rotation)
+
+        return RigidBodyInertia(self._mass, cog, matrix[0, 0], matrix[1, 1], matrix[2, 2],
+                                -matrix[1, 2], -matrix[0, 2], -matrix[0, 1], point=point)
     
     @property
     def xx(self):
@@ -209,6 +287,217 @@ class RigidBodyInertia(object):
         return str_repr
 
 
+class InertiaSet(object):
+    """A set of rigid body inertias stored in arrays.
+
+    It allows to handle assemblies of many components, such as a weight breakdown, with vectorized operations.
+
+    Parameters
+    ----------
+    masses : array_like
+        (n,) array of the masses of the bodies in kg
+    cogs : array_like
+        (n x 3) array of the centers of gravity
+    inertia_matrices : array_like, optional
+        (n x 3 x 3) array of the 3D rotational inertia matrices. Default is zero matrices (point masses).
+    points : array_like, optional
+        (n x 3) array of the reduction points of the inertia matrices. Default is cogs.
+    """
+    def __init__(self, masses, cogs, inertia_matrices=None, points=None):
+
+        self._masses = np.asarray(masses, dtype=np.float).ravel()
+        nb_inertias = len(self._masses)
+
+        self._cogs = np.asarray(cogs, dtype=np.float).reshape((nb_inertias, 3))
+
+        if inertia_matrices is None:
+            self._inertia_matrices = np.zeros((nb_inertias, 3, 3), dtype=np.float)
+        else:
+            self._inertia_matrices = np.asarray(inertia_matrices, dtype=np.float).reshape((nb_inertias, 3, 3))
+
+        if points is None:
+            self._points = self._cogs.copy()
+        else:
+            self._points = np.asarray(points, dtype=np.float).reshape((nb_inertias, 3))
+
+    @classmethod
+    def from_inertias(cls, inertias):
+        """Builds a set from rigid body inertias.
+
+        Parameters
+        ----------
+        inertias : list of RigidBodyInertia
+            The inertias, e.g. obtained from Mesh.eval_plain_mesh_inertias or Mesh.eval_shell_mesh_inertias
+
+        Returns
+        -------
+        InertiaSet
+        """
+        return cls([inertia.mass for inertia in inertias],
+                   [inertia.gravity_center for inertia in inertias],
+                   [inertia.inertia_matrix for inertia in inertias],
+                   [inertia.reduction_point for inertia in inertias])
+
+    @classmethod
+    def from_table(cls, table):
+        """Builds a set from a weight table.
+
+        Parameters
+        ----------
+        table : array_like
+            Array with one line per body. Its 4 first columns are the mass and the center of gravity coordinates. If
+            given, 6 more columns are the inertia moments xx, yy, zz and products yz, xz, xy expressed at cog, with
+            the same sign convention as RigidBodyInertia.
+
+        Returns
+        -------
+        InertiaSet
+        """
+        table = np.atleast_2d(np.asarray(table, dtype=np.float))
+        assert table.shape[1] in (4, 10)
+
+        inertia_matrices = None
+        if table.shape[1] == 10:
+            xx, yy, zz, yz, xz, xy = table[:, 4:].T
+            inertia_matrices = np.array([[xx, -xy, -xz],
+                                         [-xy, yy, -yz],
+                                         [-xz, -yz, zz]]).transpose((2, 0, 1))
+
+        return cls(table[:, 0], table[:, 1:4], inertia_matrices)
+
+    @classmethod
+    def from_csv(cls, filename, delimiter=',', skiprows=0):
+        """Builds a set from a weight table stored in a CSV file.
+
+        Parameters
+        ----------
+        filename : str
+            The CSV file, whose columns are those described in from_table
+        delimiter : str, optional
+            The columns delimiter. Default is ','.
+        skiprows : int, optional
+            The number of header lines to skip. Default is 0.
+
+        Returns
+        -------
+        InertiaSet
+        """
+        return cls.from_table(np.loadtxt(filename, delimiter=delimiter, skiprows=skiprows, ndmin=2))
+
+    def __len__(self):
+        return len(self._masses)
+
+    def __getitem__(self, index):
+        """Get one of the inertias as a RigidBodyInertia"""
+        matrix = self._inertia_matrices[index]
+        return RigidBodyInertia(self._masses[index], self._cogs[index].copy(),
+                                matrix[0, 0], matrix[1, 1], matrix[2, 2], -matrix[1, 2], -matrix[0, 2], -matrix[0, 1],
+                                point=self._points[index].copy())
+
+    @property
+    def nb_inertias(self):
+        """The number of inertias in the set"""
+        return len(self._masses)
+
+    @property
+    def masses(self):
+        """The masses of the bodies"""
+        return self._masses
+
+    @property
+    def gravity_centers(self):
+        """The positions of the centers of gravity"""
+        return self._cogs
+
+    @property
+    def inertia_matrices(self):
+        """The 3D rotational inertia matrices"""
+        return self._inertia_matrices
+
+    @property
+    def reduction_points(self):
+        """The reduction points of the inertia matrices"""
+        return self._points
+
+    def get_matrices_at(self, point):
+        """Get the inertia matrices transported at a common point.
+
+        Parameters
+        ----------
+        point : array_like
+            The reduction point
+
+        Returns
+        -------
+        ndarray
+            (n x 3 x 3) array of the inertia matrices expressed at point
+        """
+        point = np.asarray(point, dtype=np.float)
+        assert point.shape == (3,)
+        return (self._inertia_matrices - _huygens_transports(self._masses, self._cogs - self._points) +
+                _huygens_transports(self._masses, self._cogs - point))
+
+    def shift_at_cog(self):
+        """Shift the inertia matrices internally at their cog.
+
+        The reduction points are then the cogs.
+        """
+        self._inertia_matrices = self._inertia_matrices - _huygens_transports(self._masses, self._cogs - self._points)
+        self._points = self._cogs.copy()
+
+    @property
+    def at_cog(self):
+        """Returns a new set of inertias that are expressed at their cog.
+
+        Returns
+        -------
+        InertiaSet
+        """
+        inertias = deepcopy(self)
+        inertias.shift_at_cog()
+        return inertias
+
+    def sum(self, point=None):
+        """Get the inertia of the assembly of the bodies.
+
+        Parameters
+        ----------
+        point : array_like, optional
+            The reduction point of the inertia matrix. Default is the assembly center of gravity.
+
+        Returns
+        -------
+        RigidBodyInertia
+        """
+        mass = self._masses.sum()
+        cog = np.dot(self._masses, self._cogs) / mass
+        if point is None:
+            point = cog
+        point = np.asarray(point, dtype=np.float)
+
+        # Matrices at cogs are transported at the common point by summing Huygens terms at once
+        matrices_at_cog = self._inertia_matrices - _huygens_transports(self._masses, self._cogs - self._points)
+        vectors = self._cogs - point
+        weighted_vectors = self._masses[:, None] * vectors
+        matrix = (matrices_at_cog.sum(axis=0) + np.einsum('ij, ij', weighted_vectors, vectors) * np.eye(3) -
+                  np.dot(weighted_vectors.T, vectors))
+
+        return RigidBodyInertia(mass, cog, matrix[0, 0], matrix[1, 1], matrix[2, 2],
+                                -matrix[1, 2], -matrix[0, 2], -matrix[0, 1], point=point)
+
+    def get_principal_axes(self):
+        """Get the principal moments of inertia and the principal axes of every body at its cog.
+
+        Returns
+        -------
+        moments : ndarray
+            (n x 3) array of the principal moments of inertia in ascending order
+        axes : ndarray
+            (n x 3 x 3) array whose columns are the principal axes
+        """
+        return np.linalg.eigh(self.at_cog.inertia_matrices)
+
+
 # Principal geometrical shapes
 # From "Handbook of equations for mass and area of various geometrical shapes, J.A. Myers, 1962"
 def right_circular_cylinder(radius, length, density=1.):
@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+#  -*- coding: utf-8 -*-
+"""This module allows to detect self-intersections of a mesh and intersections between two meshes.
+
+Candidate pairs of faces are given by the bounding volume hierarchies of the meshes. They are then checked with a
+vectorized triangle-triangle intersection test based on the separating axis theorem.
+"""
+
+import numpy as np
+
+__author__ = "Francois Rongere"
+__copyright__ = "Copyright 2014-2015, Ecole Centrale de Nantes"
+__credits__ = "Francois Rongere"
+__licence__ = "CeCILL"
+__maintainer__ = "Francois Rongere"
+__email__ = "Francois.Rongere@ec-nantes.fr"
+__status__ = "Development"
+
+
+# Number of triangles pairs that are tested at once, limiting the memory used by the intersection kernel
+_CHUNK_SIZE = 50000
+
+
+def triangles_intersect(tri_a, tri_b, rtol=1e-9):
+    """Tells whether pairs of triangles intersect.
+
+    The test is based on the separating axis theorem. Two triangles do not intersect if there exists an axis on
+    which their projections are disjoint. Candidate axes are the triangles normals, the cross products of their
+    edges and, to deal with coplanar triangles, the in-plane normals of their edges.
+
+    Parameters
+    ----------
+    tri_a : ndarray
+        (n x 3 x 3) array of the first triangles vertices coordinates
+    tri_b : ndarray
+        (n x 3 x 3) array of the second triangles vertices coordinates
+    rtol : float, optional
+        Relative tolerance. Triangles that are closer to each other than this tolerance (relative to the triangles
+        size) are considered as intersecting. In particular, triangles that touch each other intersect. Default is
+        1e-9.
+
+    Returns
+    -------
+    ndarray
+        (n,) boolean array
+    """
+    tri_a = np.asarray(tri_a, dtype=float)
+    tri_b = np.asarray(tri_b, dtype=float)
+
+    edges_a = np.roll(tri_a, -1, axis=1) - tri_a
+    edges_b = np.roll(tri_b, -1, axis=1) - tri_b
+
+    # Characteristic length of each pair
+    length = np.sqrt(np.maximum((edges_a**2).sum(axis=2).max(axis=1), (edges_b**2).sum(axis=2).max(axis=1)))
+
+    normal_a = np.cross(edges_a[:, 0], edges_a[:, 1])
+    normal_b = np.cross(edges_b[:, 0], edges_b[:, 1])
+
+    # The triangles normals separate most of the pairs, they are tested first
+    axes = np.stack((normal_a, normal_b), axis=1)
+    intersect = np.logical_not(_are_separated(axes, tri_a, tri_b, length, 2, rtol))
+
+    # Remaining candidate axes: the cross products of edges and the in-plane normals of edges
+    ids = np.where(intersect)[0]
+    edges_a, edges_b = edges_a[ids], edges_b[ids]
+    edges_cross = np.cross(edges_a[:, :, None, :], edges_b[:, None, :, :]).reshape((-1, 9, 3))
+    in_plane = np.concatenate((np.cross(normal_a[ids, None, :], edges_a),
+                               np.cross(normal_b[ids, None, :], edges_b)), axis=1)
+
+    separated = _are_separated(edges_cross, tri_a[ids], tri_b[ids], length[ids], 2, rtol)
+    separated |= _are_separated(in_plane, tri_a[ids], tri_b[ids], length[ids], 3, rtol)
+    intersect[ids[separated]] = False
+
+    return intersect
+
+
+def _are_separated(axes, tri_a, tri_b, length, degree, rtol):
+    """Tells whether some of the axes separate the projections of the triangles.
+
+    Axes are given as a (n x na x 3) array. Axes whose norm is negligible with respect to length**degree are not
+    used.
+    """
+    norms = np.linalg.norm(axes, axis=2)
+    valid = norms > 1e-12 * length[:, None]**degree
+    with np.errstate(divide='ignore', invalid='ignore'):
+        axes = axes / norms[:, :, None]
+
+    proj_a = np.matmul(tri_a, axes.transpose((0, 2, 1)))
+    proj_b = np.matmul(tri_b, axes.transpose((0, 2, 1)))
+
+    tol = rtol * length[:, None]
+    separated = (proj_a.max(axis=1) < proj_b.min(axis=1) - tol) | (proj_b.max(axis=1) < proj_a.min(axis=1) - tol)
+
+    return np.any(separated & valid, axis=1)
+
+
+def _split_faces(vertices, faces, faces_ids):
+    """Splits faces into triangles. Returns the id of the face in faces_ids and the triangles vertices."""
+
+    faces = faces[faces_ids]
+    quads = np.where(faces[:, 0] != faces[:, 3])[0]
+
+    ids = np.concatenate((np.arange(len(faces_ids)), quads))
+    triangles = np.concatenate((faces[:, (0, 1, 2)], faces[quads][:, (0, 2, 3)]))
+
+    return ids, vertices[triangles]
+
+
+def _faces_intersect(vertices_a, faces_a, vertices_b, faces_b, pairs, rtol):
+    """Tests candidate pairs of faces with the triangles intersection kernel and returns those that intersect"""
+
+    intersecting = np.zeros(len(pairs), dtype=bool)
+
+    for start in range(0, len(pairs), _CHUNK_SIZE):
+        chunk = np.arange(start, min(start + _CHUNK_SIZE, len(pairs)))
+
+        # Every triangle of face a is tested against every triangle of face b
+        ids_a, triangles_a = _split_faces(vertices_a, faces_a, pairs[chunk, 0])
+        ids_b, triangles_b = _split_faces(vertices_b, faces_b, pairs[chunk, 1])
+
+        # Quadrangles give a second triangle whose index is stored here (-1 for triangles)
+        nb = len(chunk)
+        second_a = np.full(nb, -1, dtype=int)
+        second_a[ids_a[nb:]] = np.arange(nb, len(ids_a))
+        second_b = np.full(nb, -1, dtype=int)
+        second_b[ids_b[nb:]] = np.arange(nb, len(ids_b))
+
+        has_second_a = second_a >= 0
+        has_second_b = second_b >= 0
+        both = np.logical_and(has_second_a, has_second_b)
+        first = np.arange(nb)
+
+        tri_a_ids = np.concatenate((first, second_a[has_second_a], first[has_second_b], second_a[both]))
+        tri_b_ids = np.concatenate((first, first[has_second_a], second_b[has_second_b], second_b[both]))
+        pairs_ids = np.concatenate((first, first[has_second_a], first[has_second_b], first[both]))
+
+        hit = triangles_intersect(triangles_a[tri_a_ids], triangles_b[tri_b_ids], rtol=rtol)
+        intersecting[chunk[pairs_ids[hit]]] = True
+
+    return pairs[intersecting]
+
+
+def get_self_intersections(mesh, rtol=1e-9):
+    """Get the pairs of faces of a mesh that intersect each other.
+
+    Faces sharing a vertex are not tested against each other.
+
+    Parameters
+    ----------
+    mesh : Mesh
+        The mesh to check
+    rtol : float, optional
+        Relative tolerance of the triangles intersection test. Default is 1e-9.
+
+    Returns
+    -------
+    ndarray
+        (n x 2) array of the ids of intersecting faces. The first id of each pair is lower than the second.
+    """
+    faces = mesh.faces
+    pairs = mesh.bvh.get_overlapping_faces()
+
+    # Removing pairs of adjacent faces
+    faces_a = faces[pairs[:, 0]]
+    faces_b = faces[pairs[:, 1]]
+    shared = np.any(faces_a[:, :, None] == faces_b[:, None, :], axis=(1, 2))
+    pairs = pairs[np.logical_not(shared)]
+
+    return _faces_intersect(mesh.vertices, faces, mesh.vertices, faces, pairs, rtol)
+
+
+def get_intersections(mesh_a, mesh_b, rtol=1e-9):
+    """Get the pairs of faces of two meshes that intersect each other.
+
+    Parameters
+    ----------
+    mesh_a : Mesh
+        The first mesh
+    mesh_b : Mesh
+        The second mesh
+    rtol : float, optional
+        Relative tolerance of the triangles intersection test. Default is 1e-9.
+
+    Returns
+    -------
+    ndarray
+        (n x 2) array of intersecting faces ids. First column gives faces of mesh_a, second column faces of mesh_b.
+    """
+    pairs = mesh_a.bvh.get_overlapping_faces(mesh_b.bvh)
+
+    return _faces_intersect(mesh_a.vertices, mesh_a.faces, mesh_b.vertices, mesh_b.faces, pairs, rtol)
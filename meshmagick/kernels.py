@@ -0,0 +1,616 @@
+#!/usr/bin/env python
+#  -*- coding: utf-8 -*-
+"""This module gathers the loop kernels of meshmagick that cannot be expressed efficiently with NumPy operations.
+
+Kernels are written as plain loops over arrays. When numba is importable, they are compiled at first call and the
+'numba' backend is selected by default. Otherwise, or if the 'python' backend is selected with set_backend, the very
+same functions are run by the Python interpreter so that both backends give identical results.
+"""
+
+import numpy as np
+from functools import wraps
+
+try:
+    import numba
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+__author__ = "Francois Rongere"
+__copyright__ = "Copyright 2014-2015, Ecole Centrale de Nantes"
+__credits__ = "Francois Rongere"
+__licence__ = "CeCILL"
+__maintainer__ = "Francois Rongere"
+__email__ = "Francois.Rongere@ec-nantes.fr"
+__status__ = "Development"
+
+
+BACKENDS = ('python', 'numba')
+
+_backend = 'numba' if HAS_NUMBA else 'python'
+
+
+def get_backend():
+    """Get the backend used by the kernels.
+
+    Returns
+    -------
+    str
+        'numba' or 'python'
+    """
+    return _backend
+
+
+def set_backend(backend):
+    """Set the backend used by the kernels.
+
+    Parameters
+    ----------
+    backend : str
+        'numba' to use compiled kernels or 'python' to run them with the Python interpreter
+    """
+    global _backend
+    if backend not in BACKENDS:
+        raise ValueError('Unknown backend %s. Available backends are %s' % (backend, ', '.join(BACKENDS)))
+    if backend == 'numba' and not HAS_NUMBA:
+        raise ImportError('numba backend needs numba module to be installed')
+    _backend = backend
+
+
+def _kernel(func):
+    """Makes a loop kernel dispatch to its compiled version when the numba backend is selected"""
+    compiled = numba.njit(cache=True, nogil=True)(func) if HAS_NUMBA else func
+
+    @wraps(func)
+    def dispatch(*args):
+        if _backend == 'numba':
+            return compiled(*args)
+        return func(*args)
+
+    return dispatch
+
+
+@_kernel
+def _merge_rows(arr, atol):
+    nv, nbdim = arr.shape
+    iperm = np.arange(nv)
+
+    levels = np.empty(nv + 1, dtype=np.int64)
+    new_levels = np.empty(nv + 1, dtype=np.int64)
+    levels[0] = 0
+    levels[1] = nv
+    nb_levels = 1
+
+    for dim in range(nbdim):
+        # Splitting every level by sorting its rows along the current dimension
+        nb_new_levels = 0
+        for ilevel in range(nb_levels):
+            istart = levels[ilevel]
+            istop = levels[ilevel + 1]
+            new_levels[nb_new_levels] = istart
+            nb_new_levels += 1
+            if istop - istart > 1:
+                values = arr[iperm[istart:istop], dim]
+                order = np.argsort(values, kind='mergesort')
+                iperm[istart:istop] = iperm[istart:istop][order]
+                vref = values[order[0]]
+                for idx in range(1, istop - istart):
+                    cur_val = values[order[idx]]
+                    if abs(cur_val - vref) > atol:
+                        new_levels[nb_new_levels] = istart + idx
+                        nb_new_levels += 1
+                        vref = cur_val
+        new_levels[nb_new_levels] = nv
+        levels, new_levels = new_levels, levels
+        nb_levels = nb_new_levels
+
+        if nb_levels == nv:
+            # No duplicate rows
+            ids = np.arange(nv)
+            return ids, ids.copy()
+
+    representatives = np.empty(nb_levels, dtype=np.int64)
+    new_ids = np.empty(nv, dtype=np.int64)
+    for ilevel in range(nb_levels):
+        representatives[ilevel] = iperm[levels[ilevel]]
+        for idx in range(levels[ilevel], levels[ilevel + 1]):
+            new_ids[iperm[idx]] = ilevel
+    return representatives, new_ids
+
+
+def merge_rows(arr, atol=1e-8):
+    """Clusters the rows of an array that are equal up to a tolerance.
+
+    Parameters
+    ----------
+    arr : array_like
+        (n x d) array
+    atol : float, optional
+        Absolute tolerance on every column. Default is 1e-8.
+
+    Returns
+    -------
+    representatives : ndarray
+        Ids of the first row of every cluster, clusters being sorted in lexicographic order. If no rows are merged,
+        rows keep their order.
+    new_ids : ndarray
+        (n,) array of the cluster id of every row
+    """
+    arr = np.ascontiguousarray(arr, dtype=np.float64)
+    if arr.shape[0] == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return _merge_rows(arr, float(atol))
+
+
+@_kernel
+def _chain_edges(origins, targets, nb_vertices):
+    next_vertex = np.full(nb_vertices, -1, dtype=np.int64)
+    for iedge in range(len(origins)):
+        next_vertex[origins[iedge]] = targets[iedge]
+
+    used = np.zeros(nb_vertices, dtype=np.bool_)
+    vertices = np.empty(2 * len(origins) + 1, dtype=np.int64)
+    offsets = np.empty(len(origins) + 1, dtype=np.int64)
+    closed = np.empty(len(origins), dtype=np.bool_)
+    nb_chained = 0
+    nb_lines = 0
+    offsets[0] = 0
+
+    # Closed lines are the cycles of the graph where every vertex points to its successor
+    state = np.zeros(nb_vertices, dtype=np.int8)  # 0: not visited, 1: on the current walk, 2: done
+    for ivertex in range(nb_vertices):
+        if state[ivertex] != 0 or next_vertex[ivertex] < 0:
+            continue
+        current = ivertex
+        while current >= 0 and state[current] == 0:
+            state[current] = 1
+            current = next_vertex[current]
+
+        if current >= 0 and state[current] == 1:
+            start = current
+            vertices[nb_chained] = start
+            nb_chained += 1
+            while True:
+                used[current] = True
+                current = next_vertex[current]
+                vertices[nb_chained] = current
+                nb_chained += 1
+                if current == start:
+                    break
+            closed[nb_lines] = True
+            nb_lines += 1
+            offsets[nb_lines] = nb_chained
+
+        current = ivertex
+        while current >= 0 and state[current] == 1:
+            state[current] = 2
+            current = next_vertex[current]
+
+    # Remaining edges form open lines that are started from their first vertex when possible
+    has_incoming = np.zeros(nb_vertices, dtype=np.bool_)
+    for ivertex in range(nb_vertices):
+        if next_vertex[ivertex] >= 0 and not used[ivertex]:
+            has_incoming[next_vertex[ivertex]] = True
+
+    for ipass in range(2):
+        for ivertex in range(nb_vertices):
+            if next_vertex[ivertex] < 0 or used[ivertex]:
+                continue
+            if ipass == 0 and has_incoming[ivertex]:
+                continue
+            current = ivertex
+            vertices[nb_chained] = current
+            nb_chained += 1
+            while next_vertex[current] >= 0 and not used[current]:
+                used[current] = True
+                current = next_vertex[current]
+                vertices[nb_chained] = current
+                nb_chained += 1
+            closed[nb_lines] = False
+            nb_lines += 1
+            offsets[nb_lines] = nb_chained
+
+    return vertices[:nb_chained], offsets[:nb_lines + 1], closed[:nb_lines]
+
+
+def chain_edges(origins, targets, nb_vertices):
+    """Chains directed edges into lines.
+
+    Every vertex must be the origin of at most one edge. When it is not the case, the last edge is kept. Closed lines,
+    i.e. the cycles formed by the edges, are extracted first and remaining edges are chained into open lines.
+
+    Parameters
+    ----------
+    origins : array_like
+        (n,) array of the edges origin vertices ids
+    targets : array_like
+        (n,) array of the edges target vertices ids
+    nb_vertices : int
+        The number of vertices, greater than every vertex id
+
+    Returns
+    -------
+    vertices : ndarray
+        The concatenation of the lines vertices ids. Closed lines end with their first vertex.
+    offsets : ndarray
+        (nl+1,) array of the lines offsets into vertices
+    closed : ndarray
+        (nl,) boolean array telling if the lines are closed
+    """
+    origins = np.ascontiguousarray(origins, dtype=np.int64).ravel()
+    targets = np.ascontiguousarray(targets, dtype=np.int64).ravel()
+    assert len(origins) == len(targets)
+    return _chain_edges(origins, targets, int(nb_vertices))
+
+
+@_kernel
+def _flood_orientation(faces, ff_offsets, ff_neighbors):
+    nf = faces.shape[0]
+    faces = faces.copy()
+
+    visited = np.zeros(nf, dtype=np.bool_)
+    stack = np.empty(nf, dtype=np.int64)
+    nb_reversed = 0
+    nb_ambiguous = 0
+
+    for seed in range(nf):
+        if visited[seed]:
+            continue
+        visited[seed] = True
+        stack[0] = seed
+        top = 1
+
+        while top > 0:
+            top -= 1
+            iface = stack[top]
+            nb_face = 3 if faces[iface, 0] == faces[iface, 3] else 4
+
+            for k in range(ff_offsets[iface], ff_offsets[iface + 1]):
+                iadj_f = ff_neighbors[k]
+                if visited[iadj_f]:
+                    continue
+                visited[iadj_f] = True
+                nb_adj = 3 if faces[iadj_f, 0] == faces[iadj_f, 3] else 4
+
+                # Shared vertices
+                nb_common = 0
+                for i in range(nb_face):
+                    for j in range(nb_adj):
+                        if faces[iface, i] == faces[iadj_f, j]:
+                            nb_common += 1
+                if nb_common != 2:
+                    nb_ambiguous += 1
+                    continue
+
+                # The shared edge must be described in opposite directions by both faces
+                same_direction = False
+                for i in range(nb_face):
+                    i_v1 = faces[iface, i]
+                    i_v2 = faces[iface, (i + 1) % nb_face]
+                    for j in range(nb_adj):
+                        if faces[iadj_f, j] == i_v1 and faces[iadj_f, (j + 1) % nb_adj] == i_v2:
+                            same_direction = True
+
+                if same_direction:
+                    nb_reversed += 1
+                    for i in range(2):
+                        tmp = faces[iadj_f, i]
+                        faces[iadj_f, i] = faces[iadj_f, 3 - i]
+                        faces[iadj_f, 3 - i] = tmp
+
+                stack[top] = iadj_f
+                top += 1
+
+    return faces, nb_reversed, nb_ambiguous
+
+
+def flood_orientation(faces, ff_offsets, ff_neighbors):
+    """Makes the orientation of faces consistent by flooding the faces / faces connectivity.
+
+    Every connected group of faces is flooded from its lowest face id whose orientation is kept.
+
+    Parameters
+    ----------
+    faces : array_like
+        (nf x 4) array of the faces vertices ids, triangles repeating their first vertex
+    ff_offsets : array_like
+        (nf+1,) array of the offsets of the faces neighbors into ff_neighbors
+    ff_neighbors : array_like
+        Concatenation of the ids of the neighbors of every face
+
+    Returns
+    -------
+    faces : ndarray
+        (nf x 4) array of the faces with consistent orientations
+    nb_reversed : int
+        The number of faces that have been reversed
+    nb_ambiguous : int
+        The number of pairs of neighbor faces that do not share exactly 2 vertices and could not be compared
+    """
+    faces = np.ascontiguousarray(faces, dtype=np.int64)
+    ff_offsets = np.ascontiguousarray(ff_offsets, dtype=np.int64)
+    ff_neighbors = np.ascontiguousarray(ff_neighbors, dtype=np.int64)
+    faces, nb_reversed, nb_ambiguous = _flood_orientation(faces, ff_offsets, ff_neighbors)
+    return faces, int(nb_reversed), int(nb_ambiguous)
+
+
+@_kernel
+def _cuthill_mckee(offsets, neighbors, starts):
+    nb_vertices = len(offsets) - 1
+    order = np.empty(nb_vertices, dtype=np.int64)
+    visited = np.zeros(nb_vertices, dtype=np.bool_)
+    nb_ordered = 0
+
+    for start in starts:
+        if visited[start]:
+            continue
+        # Breadth first traversal of the component, the queue being the order itself
+        visited[start] = True
+        order[nb_ordered] = start
+        head = nb_ordered
+        nb_ordered += 1
+        while head < nb_ordered:
+            ivertex = order[head]
+            head += 1
+            for k in range(offsets[ivertex], offsets[ivertex + 1]):
+                ineighbor = neighbors[k]
+                if not visited[ineighbor]:
+                    visited[ineighbor] = True
+                    order[nb_ordered] = ineighbor
+                    nb_ordered += 1
+
+    return order
+
+
+def reverse_cuthill_mckee(offsets, neighbors):
+    """Computes the reverse Cuthill-McKee ordering of the vertices of a graph.
+
+    Every connected component is traversed breadth first from its vertex of lowest degree, neighbors being visited by
+    increasing degrees. The reversed order reduces the bandwidth of the graph adjacency matrix.
+
+    Parameters
+    ----------
+    offsets : array_like
+        (nv+1,) array of the offsets of the vertices neighbors into neighbors
+    neighbors : array_like
+        Concatenation of the ids of the neighbors of every vertex
+
+    Returns
+    -------
+    ndarray
+        (nv,) array of the vertices ids in their new order
+    """
+    offsets = np.ascontiguousarray(offsets, dtype=np.int64)
+    neighbors = np.ascontiguousarray(neighbors, dtype=np.int64)
+    nb_vertices = len(offsets) - 1
+    degrees = np.diff(offsets)
+
+    # Sorting the neighbors of every vertex by increasing degrees
+    rows = np.repeat(np.arange(nb_vertices), degrees)
+    neighbors = neighbors[np.lexsort((neighbors, degrees[neighbors], rows))]
+    starts = np.argsort(degrees, kind='mergesort')
+
+    return _cuthill_mckee(offsets, neighbors, starts)[::-1].copy()
+
+
+# Clipping cases of a crown face with respect to a plane, keyed by the numbers of vertices of the face above, on and
+# below the plane. Vertices of the rolled face are referred to by their position (0 to 3, the fourth vertex of a
+# triangle being its first one) and the vertices created at the intersection of the face edges with the plane by
+# _NEW_0 and _NEW_1. Faces of cases '211', '112' and '111' depend on whether vertex 1 of the rolled face is below the
+# plane.
+_NEW_0, _NEW_1 = 4, 5
+
+_NO_ROLL, _ROLL_FIRST, _ROLL_SECOND = 0, 1, 2
+_ABOVE, _ON, _BELOW = 0, 1, 2
+
+_CROWN_CASES = (
+    # (face type, vertex 1 below, roll, intersected edges, boundary edge, crown faces, upper crown faces)
+    ('202', None, (_ROLL_SECOND, _ABOVE), ((0, 1), (2, 3)), (_NEW_0, _NEW_1),
+     ((_NEW_0, 1, 2, _NEW_1), ), ((0, _NEW_0, _NEW_1, 3), )),
+    ('301', None, (_ROLL_FIRST, _BELOW), ((0, 3), (0, 1)), (_NEW_0, _NEW_1),
+     ((_NEW_0, 0, _NEW_1, _NEW_0), ), ((_NEW_1, 1, 2, 3), (_NEW_1, 3, _NEW_0, _NEW_1))),
+    ('103', None, (_ROLL_FIRST, _ABOVE), ((0, 1), (0, 3)), (_NEW_0, _NEW_1),
+     ((_NEW_0, 1, 3, _NEW_1), (1, 2, 3, 1)), ((0, _NEW_0, _NEW_1, 0), )),
+    ('102', None, (_ROLL_FIRST, _ABOVE), ((0, 1), (0, 2)), (_NEW_0, _NEW_1),
+     ((_NEW_0, 1, 2, _NEW_1), ), ((0, _NEW_0, _NEW_1, 0), )),
+    ('201', None, (_ROLL_FIRST, _BELOW), ((0, 2), (0, 1)), (_NEW_0, _NEW_1),
+     ((_NEW_0, 0, _NEW_1, _NEW_0), ), ((_NEW_1, 1, 2, _NEW_0), )),
+    ('211', True, (_ROLL_FIRST, _ON), ((1, 2), ), (0, _NEW_0),
+     ((0, 1, _NEW_0, 0), ), ((_NEW_0, 2, 3, 0), )),
+    ('211', False, (_ROLL_FIRST, _ON), ((2, 3), ), (_NEW_0, 0),
+     ((_NEW_0, 3, 0, _NEW_0), ), ((0, 1, 2, _NEW_0), )),
+    ('112', True, (_ROLL_FIRST, _ON), ((2, 3), ), (0, _NEW_0),
+     ((0, 1, 2, _NEW_0), ), ((_NEW_0, 3, 0, _NEW_0), )),
+    ('112', False, (_ROLL_FIRST, _ON), ((1, 2), ), (_NEW_0, 0),
+     ((_NEW_0, 2, 3, 0), ), ((0, 1, _NEW_0, 0), )),
+    ('111', True, (_ROLL_FIRST, _ON), ((1, 2), ), (0, _NEW_0),
+     ((0, 1, _NEW_0, 0), ), ((_NEW_0, 2, 0, _NEW_0), )),
+    ('111', False, (_ROLL_FIRST, _ON), ((1, 2), ), (_NEW_0, 0),
+     ((_NEW_0, 2, 0, _NEW_0), ), ((0, 1, _NEW_0, 0), )),
+    ('121', None, (_ROLL_FIRST, _ABOVE), (), (1, 3), ((1, 2, 3, 1), ), ((3, 0, 1, 3), )),
+    ('021', None, (_ROLL_FIRST, _BELOW), (), (2, 1), ((0, 1, 2, 0), ), ()),
+    ('022', None, (_ROLL_SECOND, _ON), (), (0, 3), ((0, 1, 2, 3), ), ()),
+    # Faces lying entirely under the plane
+    ('013', None, (_NO_ROLL, _ABOVE), (), None, ((0, 1, 2, 3), ), ()),
+    ('012', None, (_NO_ROLL, _ABOVE), (), None, ((0, 1, 2, 3), ), ()),
+    ('003', None, (_NO_ROLL, _ABOVE), (), None, ((0, 1, 2, 3), ), ()),
+    ('004', None, (_NO_ROLL, _ABOVE), (), None, ((0, 1, 2, 3), ), ()),
+    # Faces lying entirely above the plane
+    ('210', None, (_NO_ROLL, _ABOVE), (), None, (), ((0, 1, 2, 3), )),
+    ('310', None, (_NO_ROLL, _ABOVE), (), None, (), ((0, 1, 2, 3), )),
+    ('120', None, (_NO_ROLL, _ABOVE), (), None, (), ((0, 1, 2, 3), )),
+    ('220', None, (_NO_ROLL, _ABOVE), (), None, (), ((0, 1, 2, 3), )),
+    ('300', None, (_NO_ROLL, _ABOVE), (), None, (), ((0, 1, 2, 3), )),
+    ('400', None, (_NO_ROLL, _ABOVE), (), None, (), ((0, 1, 2, 3), )),
+    # Faces lying in the plane are dropped
+    ('030', None, (_NO_ROLL, _ABOVE), (), None, (), ()),
+    ('040', None, (_NO_ROLL, _ABOVE), (), None, (), ()),
+)
+
+
+def _build_crown_cases():
+    """Packs the crown clipping cases into the fixed-size arrays used by the _clip_crown kernel, unused entries being
+    set to -1"""
+    nb_cases = len(_CROWN_CASES)
+    case_ids = np.full((5, 5, 5, 2), -1, dtype=np.int64)
+    rolls = np.zeros((nb_cases, 2), dtype=np.int64)
+    edges = np.full((nb_cases, 2, 2), -1, dtype=np.int64)
+    boundary_edges = np.full((nb_cases, 2), -1, dtype=np.int64)
+    crown_faces = np.full((nb_cases, 2, 4), -1, dtype=np.int64)
+    upper_faces = np.full((nb_cases, 2, 4), -1, dtype=np.int64)
+
+    for icase, (face_type, below, roll, case_edges, boundary_edge, case_crown, case_upper) in enumerate(_CROWN_CASES):
+        nb_above, nb_on, nb_below = [int(digit) for digit in face_type]
+        for variant in (0, 1):
+            if below is None or below == bool(variant):
+                case_ids[nb_above, nb_on, nb_below, variant] = icase
+        rolls[icase] = roll
+        edges[icase, :len(case_edges)] = np.reshape(case_edges, (-1, 2))
+        if boundary_edge is not None:
+            boundary_edges[icase] = boundary_edge
+        crown_faces[icase, :len(case_crown)] = np.reshape(case_crown, (-1, 4))
+        upper_faces[icase, :len(case_upper)] = np.reshape(case_upper, (-1, 4))
+
+    return case_ids, rolls, edges, boundary_edges, crown_faces, upper_faces
+
+
+_CROWN_CASES_ARRAYS = _build_crown_cases()
+
+
+@_kernel
+def _clip_crown(faces, positions, distances, case_ids, rolls, case_edges, case_boundary_edges, case_crown_faces,
+                case_upper_faces):
+    nb_faces = faces.shape[0]
+    nb_vertices = len(distances)
+
+    crown_faces = np.empty((2 * nb_faces, 4), dtype=np.int64)
+    upper_faces = np.empty((2 * nb_faces, 4), dtype=np.int64)
+    edges = np.empty((2 * nb_faces, 2), dtype=np.int64)
+    boundary_edges = np.empty((nb_faces, 2), dtype=np.int64)
+    nb_crown = 0
+    nb_upper = 0
+    nb_edges = 0
+    nb_boundary = 0
+
+    counts = np.empty(3, dtype=np.int64)
+    firsts = np.empty(3, dtype=np.int64)
+    seconds = np.empty(3, dtype=np.int64)
+    tokens = np.empty(6, dtype=np.int64)
+
+    for iface in range(nb_faces):
+        nb_face_vertices = 3 if faces[iface, 0] == faces[iface, 3] else 4
+
+        # Determining the type of face clipping
+        counts[:] = 0
+        for k in range(nb_face_vertices):
+            position = positions[faces[iface, k]]
+            if position < 0:
+                continue
+            if counts[position] == 0:
+                firsts[position] = k
+            elif counts[position] == 1:
+                seconds[position] = k
+            counts[position] += 1
+
+        icase = case_ids[counts[0], counts[1], counts[2], 0]
+        if icase < 0:
+            return crown_faces[:nb_crown], upper_faces[:nb_upper], edges[:nb_edges], boundary_edges[:nb_boundary], \
+                   iface
+
+        # Rolling the face so that the case vertices come first
+        roll = rolls[icase, 0]
+        side = rolls[icase, 1]
+        shift = 0
+        if roll == _ROLL_FIRST:
+            shift = firsts[side]
+        elif roll == _ROLL_SECOND and seconds[side] == firsts[side] + 1:
+            shift = seconds[side]
+        for k in range(nb_face_vertices):
+            tokens[k] = faces[iface, (k + shift) % nb_face_vertices]
+        if nb_face_vertices == 3:
+            tokens[3] = tokens[0]
+        tokens[4] = nb_vertices + nb_edges
+        tokens[5] = tokens[4] + 1
+
+        if distances[tokens[1]] < 0.:
+            icase = case_ids[counts[0], counts[1], counts[2], 1]
+
+        for k in range(2):
+            if case_edges[icase, k, 0] < 0:
+                break
+            edges[nb_edges, 0] = tokens[case_edges[icase, k, 0]]
+            edges[nb_edges, 1] = tokens[case_edges[icase, k, 1]]
+            nb_edges += 1
+
+        if case_boundary_edges[icase, 0] >= 0:
+            boundary_edges[nb_boundary, 0] = tokens[case_boundary_edges[icase, 0]]
+            boundary_edges[nb_boundary, 1] = tokens[case_boundary_edges[icase, 1]]
+            nb_boundary += 1
+
+        for k in range(2):
+            if case_crown_faces[icase, k, 0] < 0:
+                break
+            for j in range(4):
+                crown_faces[nb_crown, j] = tokens[case_crown_faces[icase, k, j]]
+            nb_crown += 1
+
+        for k in range(2):
+            if case_upper_faces[icase, k, 0] < 0:
+                break
+            for j in range(4):
+                upper_faces[nb_upper, j] = tokens[case_upper_faces[icase, k, j]]
+            nb_upper += 1
+
+    return crown_faces[:nb_crown], upper_faces[:nb_upper], edges[:nb_edges], boundary_edges[:nb_boundary], -1
+
+
+def clip_crown(faces, above_mask, on_mask, below_mask, distances):
+    """Clips the faces of a crown mesh by a plane, face by face.
+
+    Faces are split along the intersection of their edges with the plane into the crown faces, lying under the plane,
+    and the upper crown faces. Vertices created on the intersected edges are numbered after the existing vertices, in
+    the order of the intersected edges, and are not shared by neighbor faces.
+
+    Parameters
+    ----------
+    faces : array_like
+        (nf x 4) array of the faces vertices ids, triangles repeating their first vertex
+    above_mask : array_like
+        (nv,) boolean array of the vertices above the plane
+    on_mask : array_like
+        (nv,) boolean array of the vertices on the plane
+    below_mask : array_like
+        (nv,) boolean array of the vertices below the plane
+    distances : array_like
+        (nv,) array of the signed distances of the vertices with respect to the plane
+
+    Returns
+    -------
+    crown_faces : ndarray
+        (n x 4) array of the faces under the plane
+    upper_faces : ndarray
+        (m x 4) array of the faces above the plane
+    edges : ndarray
+        (ni x 2) array of the vertices ids of the intersected edges, the ith edge giving the vertex nv+i
+    boundary_edges : ndarray
+        (nb x 2) array of the directed edges of the faces under the plane that lie in the plane
+
+    Raises
+    ------
+    ValueError
+        If the vertices of a face do not match any clipping case
+    """
+    faces = np.ascontiguousarray(faces, dtype=np.int64)
+    distances = np.ascontiguousarray(distances, dtype=np.float64)
+    positions = np.full(len(distances), -1, dtype=np.int64)
+    positions[np.asarray(above_mask, dtype=bool)] = _ABOVE
+    positions[np.asarray(on_mask, dtype=bool)] = _ON
+    positions[np.asarray(below_mask, dtype=bool)] = _BELOW
+
+    crown_faces, upper_faces, edges, boundary_edges, iface = _clip_crown(faces, positions, distances,
+                                                                         *_CROWN_CASES_ARRAYS)
+    if iface >= 0:
+        face = faces[iface, :3] if faces[iface, 0] == faces[iface, 3] else faces[iface]
+        face_type = ''.join([str(np.count_nonzero(positions[face] == side)) for side in (_ABOVE, _ON, _BELOW)])
+        raise ValueError("Face %u clipping case %s not known." % (iface, face_type))
+    return crown_faces, upper_faces, edges, boundary_edges
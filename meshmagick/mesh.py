@@ -12,12 +12,19 @@ import math
 import copy
 import vtk
 from itertools import count
+from concurrent.futures import ThreadPoolExecutor
 from warnings import warn
 import sys  # TODO: Retirer
 
-from .tools import merge_duplicate_rows
+from .tools import (merge_duplicate_rows, get_symmetric_half, get_faces_neighbors, get_connected_components,
+                    get_vertices_neighbors, morton_codes)
+from .bvh import FacesBVH
+from .intersection import get_self_intersections, get_intersections
+from .decimation import decimate
 from . import MMviewer
 from .inertia import RigidBodyInertia
+from .kernels import merge_rows, chain_edges, flood_orientation, reverse_cuthill_mckee
+from .quality import get_faces_quality, format_quality_report
 
 __author__ = "Francois Rongere"
 __copyright__ = "Copyright 2014-2015, Ecole Centrale de Nantes"
@@ -351,6 +358,29 @@ class Plane(object):
             raise RuntimeError('Intersection is outside the edge')
         return (1-t) * p0 + t * p1
 
+    def get_edges_intersections(self, p0, p1):
+        """
+        Returns the coordinates of the intersection points between the plane and a set of edges P0P1.
+
+        Parameters
+        ----------
+        p0 : ndarray
+            (n x 3) array of the coordinates of the points p0
+        p1 : ndarray
+            (n x 3) array of the coordinates of the points p1
+
+        Returns
+        -------
+        I : ndarray
+            (n x 3) array of the coordinates of the intersection points
+        """
+        p0n = np.dot(p0, self.normal)
+        p1n = np.dot(p1, self.normal)
+        t = (p0n - self._scalar) / (p0n - p1n)
+        if np.any((t < 0.) | (t > 1.)):
+            raise RuntimeError('Intersection is outside the edge')
+        return (1-t)[:, None] * p0 + t[:, None] * p1
+
     def orthogonal_projection_on_plane(self, points):
         """
         Returns the coordinates of the orthogonal projection of points
@@ -377,13 +407,160 @@ class Plane(object):
         return self.c * self.normal
 
 
-class _3DPointsArray(np.ndarray):
-    def __new__(cls, points):
-        obj = np.asarray(points).view(cls)
-        cls.x = property(fget=lambda cls: cls[:, 0])
-        cls.y = property(fget=lambda cls: cls[:, 1])
-        cls.z = property(fget=lambda cls: cls[:, 2])
-        return obj
+# Number of triangles processed at once by the surface integrals kernel, so that its scratch buffers fit in L2 cache
+TRIANGLES_CHUNK_SIZE = 8192
+
+
+def _triangles_integrals_block(vertices, triangles, out, scratch):
+    """Computes the surface integrals of a block of triangles (see Mesh._compute_triangles_integrals).
+
+    Every intermediate result is written in preallocated buffers so that no temporary array is created.
+
+    Parameters
+    ----------
+    vertices : ndarray
+        (nv x 3) array of vertices coordinates
+    triangles : ndarray
+        (n x 3) array of the triangles vertices ids
+    out : ndarray
+        (15 x n) array in which the integrals are written
+    scratch : ndarray
+        (9 x 3 x m) scratch array with m >= n
+    """
+    nb_triangles = len(triangles)
+    point_0, point_1, point_2, f1, f2, f3, t1, t2, rows = scratch[:, :, :nb_triangles]
+    delta, tmp = rows[0], rows[1]
+
+    for i, point in enumerate((point_0, point_1, point_2)):
+        np.take(vertices, triangles[:, i], axis=0, out=point.T)
+
+    np.add(point_0, point_1, out=t2)
+    np.add(t2, point_2, out=f1)
+    np.multiply(point_0, point_0, out=t1)
+    np.multiply(point_1, t2, out=t2)
+    t2 += t1
+    np.multiply(point_2, f1, out=f2)
+    f2 += t2
+    np.multiply(point_0, t1, out=f3)
+    np.multiply(point_1, t2, out=t2)
+    f3 += t2
+    np.multiply(point_2, f2, out=t2)
+    f3 += t2
+
+    # Twice the triangles areas, the cross product of the edges being stored in the first output rows
+    edge_1, edge_2 = t1, t2
+    np.subtract(point_1, point_0, out=edge_1)
+    np.subtract(point_2, point_0, out=edge_2)
+    for i, (j, k) in enumerate(((1, 2), (2, 0), (0, 1))):
+        np.multiply(edge_1[j], edge_2[k], out=out[i])
+        np.multiply(edge_1[k], edge_2[j], out=tmp)
+        out[i] -= tmp
+    np.einsum('ij, ij -> j', out[0:3], out[0:3], out=delta)
+    np.sqrt(delta, out=delta)
+
+    np.multiply(f1, delta, out=out[0:3])
+    out[0:3] /= 6.
+
+    for row, (j, k) in zip((3, 4, 5), ((1, 2), (0, 2), (0, 1))):
+        np.multiply(point_1[j], point_1[k], out=out[row])
+        np.multiply(point_2[j], point_2[k], out=tmp)
+        out[row] += tmp
+        out[row] *= 3.
+        np.multiply(point_0[j], point_0[k], out=tmp)
+        tmp *= 6.
+        out[row] += tmp
+        np.multiply(point_0[j], f1[k], out=tmp)
+        out[row] -= tmp
+        np.multiply(point_0[k], f1[j], out=tmp)
+        out[row] -= tmp
+        out[row] *= delta
+        out[row] /= 12.
+
+    np.multiply(f2, delta, out=out[6:9])
+    out[6:9] /= 12.
+    np.multiply(f3, delta, out=out[9:12])
+    out[9:12] /= 20.
+
+    for row, (j, k) in zip((12, 13, 14), ((1, 0), (2, 1), (0, 2))):
+        out[row] = 0.
+        for point in (point_0, point_1, point_2):
+            np.add(f1[k], point[k], out=tmp)
+            tmp *= point[k]
+            tmp += f2[k]
+            tmp *= point[j]
+            out[row] += tmp
+        out[row] *= delta
+        out[row] /= 60.
+
+
+def _triangles_integrals(vertices, triangles, sum_faces_contrib=False, weights=None,
+                         chunk_size=TRIANGLES_CHUNK_SIZE, nb_threads=1):
+    """Computes the surface integrals of triangles by chunks.
+
+    Parameters
+    ----------
+    vertices : ndarray
+        (nv x 3) array of vertices coordinates
+    triangles : ndarray
+        (n x 3) array of the triangles vertices ids
+    sum_faces_contrib : bool, optional
+        If True, the contributions of the triangles are summed chunk by chunk so that the (15 x n) array of integrals
+        is never stored. Default is False.
+    weights : ndarray, optional
+        (n,) or (n x k) array of weights of the triangles contributions, only used if sum_faces_contrib is True.
+    chunk_size : int, optional
+        Number of triangles processed at once. Default is TRIANGLES_CHUNK_SIZE.
+    nb_threads : int, optional
+        Number of threads among which the chunks are distributed. Default is 1.
+
+    Returns
+    -------
+    ndarray
+        (15 x n) array of the integrals or, if sum_faces_contrib is True, their (weighted) sum
+    """
+    vertices = np.ascontiguousarray(vertices, dtype=np.float)
+    triangles = np.asarray(triangles, dtype=np.int)
+    nb_triangles = len(triangles)
+    chunk_size = max(1, min(int(chunk_size), nb_triangles))
+
+    if sum_faces_contrib:
+        if weights is None:
+            weights = np.ones(nb_triangles, dtype=np.float)
+        weights = np.asarray(weights, dtype=np.float)
+        integrals = None
+    else:
+        integrals = np.empty((15, nb_triangles), dtype=np.float)
+
+    starts = list(range(0, nb_triangles, chunk_size))
+    nb_threads = max(1, min(int(nb_threads), len(starts)))
+
+    def process(chunks_starts):
+        scratch = np.empty((9, 3, chunk_size), dtype=np.float)
+        out = np.empty((15, chunk_size), dtype=np.float) if sum_faces_contrib else None
+        total = 0.
+        for start in chunks_starts:
+            stop = min(start + chunk_size, nb_triangles)
+            if sum_faces_contrib:
+                block = out[:, :stop - start]
+                _triangles_integrals_block(vertices, triangles[start:stop], block, scratch)
+                total = total + np.dot(block, weights[start:stop])
+            else:
+                _triangles_integrals_block(vertices, triangles[start:stop], integrals[:, start:stop], scratch)
+        return total
+
+    if nb_threads == 1:
+        totals = [process(starts)]
+    else:
+        # Numpy releases the GIL in its kernels so that chunks are processed concurrently
+        with ThreadPoolExecutor(max_workers=nb_threads) as executor:
+            totals = list(executor.map(process, [starts[i::nb_threads] for i in range(nb_threads)]))
+
+    if sum_faces_contrib:
+        total = sum(totals)
+        if np.isscalar(total):
+            total = np.zeros((15,) + weights.shape[1:], dtype=np.float)
+        return total
+    return integrals
 
 
 class Mesh(object):
@@ -455,79 +632,35 @@ class Mesh(object):
                )
         return str_repr
 
-    def print_quality(self):
-        """Returns data on the mesh quality
-        
-        It uses VTK and is reproduced from
-        http://vtk.org/gitweb?p=VTK.git;a=blob;f=Filters/Verdict/Testing/Python/MeshQuality.py
+    def get_quality(self):
+        """Get the quality measures of every face of the mesh.
+
+        Returns
+        -------
+        dict
+            Dictionary giving a (nf,) array for every measure
+
+        See Also
+        --------
+        meshmagick.quality.get_faces_quality
+        """
+        return get_faces_quality(self._vertices, self._faces)
+
+    def print_quality(self, bins=10):
+        """Prints data on the mesh quality
+
+        Parameters
+        ----------
+        bins : int, optional
+            Number of bins of the printed histograms. Default is 10.
+
+        See Also
+        --------
+        meshmagick.quality.get_faces_quality
         """
-        # This function is reproduced from
-        # http://vtk.org/gitweb?p=VTK.git;a=blob;f=Filters/Verdict/Testing/Python/MeshQuality.py
-        polydata = self._vtk_polydata()
-        quality = vtk.vtkMeshQuality()
-        if vtk.VTK_MAJOR_VERSION <= 5:
-            quality.SetInput(polydata)
-        else:
-            quality.SetInputData(polydata)
-
-        def DumpQualityStats(iq, arrayname):
-            an = iq.GetOutput().GetFieldData().GetArray(arrayname)
-            cardinality = an.GetComponent(0, 4)
-            range = list()
-            range.append(an.GetComponent(0, 0))
-            range.append(an.GetComponent(0, 2))
-            average = an.GetComponent(0, 1)
-            stdDev = math.sqrt(math.fabs(an.GetComponent(0, 3)))
-            outStr = '%s%g%s%g\n%s%g%s%g' % (
-                '    range: ', range[0], '  -  ', range[1],
-                '    average: ', average, '  , standard deviation: ', stdDev)
-            return outStr
-
-        # Here we define the various mesh types and labels for output.
-        meshTypes = [
-            ['Triangle', 'Triangle',
-             [['QualityMeasureToArea', ' Area Ratio:'],
-              ['QualityMeasureToEdgeRatio', ' Edge Ratio:'],
-              ['QualityMeasureToAspectRatio', ' Aspect Ratio:'],
-              ['QualityMeasureToRadiusRatio', ' Radius Ratio:'],
-              ['QualityMeasureToAspectFrobenius', ' Frobenius Norm:'],
-              ['QualityMeasureToMinAngle', ' Minimal Angle:']
-              ]
-             ],
-
-            ['Quad', 'Quadrilateral',
-             [['QualityMeasureToArea', ' Area Ratio:'],
-              ['QualityMeasureToEdgeRatio', ' Edge Ratio:'],
-              ['QualityMeasureToAspectRatio', ' Aspect Ratio:'],
-              ['QualityMeasureToRadiusRatio', ' Radius Ratio:'],
-              ['QualityMeasureToMedAspectFrobenius',
-               ' Average Frobenius Norm:'],
-              ['QualityMeasureToMaxAspectFrobenius',
-               ' Maximal Frobenius Norm:'],
-              ['QualityMeasureToMinAngle', ' Minimal Angle:']
-              ]
-             ]
-        ]
         res = ''
-        if polydata.GetNumberOfCells() > 0:
-            for meshType in meshTypes:
-                res += '\n%s%s' % (meshType[1], ' quality of the mesh ')
-                quality.Update()
-                an = quality.GetOutput().GetFieldData().GetArray('Mesh ' + meshType[1] + ' Quality')
-                cardinality = an.GetComponent(0, 4)
-
-                res = ''.join((res, '(%u elements):\n' % cardinality))
-
-                # res += '('+str(cardinality) +meshType[1]+'):\n'
-
-                for measure in meshType[2]:
-                    eval('quality.Set' + meshType[0] + measure[0] + '()')
-                    quality.Update()
-                    res += '\n%s\n%s' % (
-                        measure[1],
-                        DumpQualityStats(quality, 'Mesh ' + meshType[1] + ' Quality')
-                    )
-                res += '\n'
+        if self.nb_faces > 0:
+            res = format_quality_report(self.get_quality(), self._faces[:, 0] == self._faces[:, -1], bins=bins)
 
         info = """\n\nDefinition of the different quality measures is given
         in the verdict library manual :
@@ -980,29 +1113,14 @@ class Mesh(object):
                     raise RuntimeError('Unexpected error while computing mesh connectivities')
 
         # Computing boundaries
-        boundaries = list()
         # TODO: calculer des boundaries fermees et ouvertes (closed_boundaries et open_boundaries) et mettre dans dict
-        while True:
-            try:
-                boundary = list()
-                i_v0_init, i_v1 = boundary_edges.popitem()
-                boundary.append(i_v0_init)
-                boundary.append(i_v1)
-                i_v0 = i_v1
-
-                while True:
-                    try:
-                        i_v1 = boundary_edges.pop(i_v0)
-                        boundary.append(i_v1)
-                        i_v0 = i_v1
-                    except KeyError:
-                        if boundary[0] != boundary[-1]:
-                            print('Boundary is not closed !!!')
-                        else:
-                            boundaries.append(boundary)
-                        break
-            except KeyError:
-                break
+        boundaries = list()
+        chained_vertices, offsets, closed = chain_edges(list(boundary_edges.keys()), list(boundary_edges.values()), nv)
+        for iline, is_closed in enumerate(closed):
+            if is_closed:
+                boundaries.append(chained_vertices[offsets[iline]:offsets[iline+1]].tolist())
+            else:
+                print('Boundary is not closed !!!')
 
         connectivity = {'v_v': v_v,
                         'v_f': v_f,
@@ -1125,7 +1243,33 @@ class Mesh(object):
         d = (np.array([xmax-xmin, ymax-ymin, zmax-zmin]) * 0.5).max()
         
         return x0-d, x0+d, y0-d, y0+d, z0-d, z0+d
-    
+
+    def _has_bvh(self):
+        return 'bvh' in self.__internals__
+
+    def _remove_bvh(self):
+        if 'bvh' in self.__internals__:
+            del self.__internals__['bvh']
+        return
+
+    @property
+    def bvh(self):
+        """Get the bounding volume hierarchy over the mesh faces.
+
+        It is built at first access and kept until the mesh is modified.
+
+        Returns
+        -------
+        FacesBVH
+
+        See Also
+        --------
+        meshmagick.bvh.FacesBVH
+        """
+        if 'bvh' not in self.__internals__:
+            self.__internals__['bvh'] = FacesBVH(self._vertices, self._faces)
+        return self.__internals__['bvh']
+
     def is_mesh_closed(self):
         """Returns if the mesh is a closed manifold.
         
@@ -1138,6 +1282,47 @@ class Mesh(object):
             self._connectivity()
         return len(self.__internals__['boundaries']) == 0
 
+    def get_self_intersections(self, rtol=1e-9):
+        """Get the pairs of faces of the mesh that intersect each other.
+
+        Parameters
+        ----------
+        rtol : float, optional
+            Relative tolerance of the triangles intersection test. Default is 1e-9.
+
+        Returns
+        -------
+        ndarray
+            (n x 2) array of the ids of intersecting faces
+
+        See Also
+        --------
+        meshmagick.intersection.get_self_intersections
+        """
+        return get_self_intersections(self, rtol=rtol)
+
+    def get_intersections_with(self, mesh, rtol=1e-9):
+        """Get the pairs of faces of the mesh that intersect faces of another mesh.
+
+        Parameters
+        ----------
+        mesh : Mesh
+            The other mesh
+        rtol : float, optional
+            Relative tolerance of the triangles intersection test. Default is 1e-9.
+
+        Returns
+        -------
+        ndarray
+            (n x 2) array of intersecting faces ids. First column gives faces of the current mesh, second column
+            faces of the other mesh.
+
+        See Also
+        --------
+        meshmagick.intersection.get_intersections
+        """
+        return get_intersections(self, mesh, rtol=rtol)
+
     def is_mesh_conformal(self):
         """Returns if the mesh is conformal.
         
@@ -1250,6 +1435,7 @@ class Mesh(object):
         ndarray
             The (3x3) rotation matrix that has been applied to rotate the mesh
         """
+        self._remove_bvh()
         if self.has_surface_integrals():
             self._remove_surface_integrals()
         # TODO: docstring
@@ -1304,6 +1490,7 @@ class Mesh(object):
         tx : float
             Distance
         """
+        self._remove_bvh()
         vertices = self._vertices
         vertices[:, 0] += tx
         self._vertices = vertices
@@ -1327,6 +1514,7 @@ class Mesh(object):
         ty : float
             Distance
         """
+        self._remove_bvh()
         vertices = self._vertices.copy()
         vertices[:, 1] += ty
         self._vertices = vertices
@@ -1350,6 +1538,7 @@ class Mesh(object):
         tz : float
             Distance
         """
+        self._remove_bvh()
         vertices = self._vertices.copy()
         vertices[:, 2] += tz
         self._vertices = vertices
@@ -1373,6 +1562,7 @@ class Mesh(object):
         t : array_like
             translation vector
         """
+        self._remove_bvh()
         tx, ty, tz = t
         V = self._vertices.copy() # FIXME: why doing a copy ???
         V[:, 0] += tx
@@ -1401,6 +1591,7 @@ class Mesh(object):
         alpha : float
             A positive scaling factor
         """
+        self._remove_bvh()
         assert 0 < alpha
         
         # TODO: voir pourquoi il est fait une copie ici...
@@ -1421,6 +1612,7 @@ class Mesh(object):
         alpha : float
             A positive scaling factor
         """
+        self._remove_bvh()
         assert 0 < alpha
         
         vertices = self._vertices.copy()
@@ -1440,6 +1632,7 @@ class Mesh(object):
         alpha : float
             A positive scaling factor
         """
+        self._remove_bvh()
         assert 0 < alpha
         
         vertices = self._vertices.copy()
@@ -1459,6 +1652,7 @@ class Mesh(object):
         alpha : float
             A positive scaling factor
         """
+        self._remove_bvh()
         assert 0 < alpha
         
         vertices = self._vertices.copy()
@@ -1472,6 +1666,7 @@ class Mesh(object):
 
     def flip_normals(self):
         """Flips every normals of the mesh."""
+        self._remove_bvh()
         
         faces = self._faces.copy()
         self._faces = np.fliplr(faces)
@@ -1484,6 +1679,82 @@ class Mesh(object):
 
         return
 
+    @classmethod
+    def concatenate(cls, meshes, merge=True, atol=1e-8, name=None, return_offsets=False):
+        """Builds a mesh from several meshes.
+
+        Arrays are stacked in a single allocation and duplicate vertices are merged in one pass that only considers the
+        seam vertices, i.e. the vertices of every part that lie in the bounding box of another part.
+
+        Parameters
+        ----------
+        meshes : iterable
+            The Mesh instances to concatenate, whose own duplicate vertices are supposed to be already merged
+        merge : bool, optional
+            Flag to merge the duplicate vertices at seams between parts. Default is True.
+        atol : float, optional
+            Absolute tolerance used to merge vertices. Default is 1e-8.
+        name : str, optional
+            The name of the new mesh. Default is the names of the parts joined by underscores.
+        return_offsets : bool, optional
+            Flag to return the faces offsets of the parts
+
+        Returns
+        -------
+        Mesh
+            The composite mesh
+        faces_offsets : ndarray, optional
+            (k+1,) array such that the faces of the part i are the faces faces_offsets[i] to faces_offsets[i+1]-1 of
+            the composite mesh. Returned if return_offsets is True.
+        """
+        meshes = list(meshes)
+        assert all([isinstance(mesh, Mesh) for mesh in meshes])
+
+        vertices_offsets = np.cumsum([0] + [mesh.nb_vertices for mesh in meshes])
+        faces_offsets = np.cumsum([0] + [mesh.nb_faces for mesh in meshes])
+
+        vertices = np.empty((vertices_offsets[-1], 3), dtype=np.float)
+        faces = np.empty((faces_offsets[-1], 4), dtype=np.int)
+        for ipart, mesh in enumerate(meshes):
+            vertices[vertices_offsets[ipart]:vertices_offsets[ipart+1]] = mesh._vertices
+            faces[faces_offsets[ipart]:faces_offsets[ipart+1]] = mesh._faces + vertices_offsets[ipart]
+
+        if merge and len(meshes) > 1:
+            # Seam vertices are looked for in the bounding boxes of the other parts that overlap the part box
+            lower = np.array([mesh._vertices.min(axis=0) if mesh.nb_vertices > 0 else np.full(3, np.inf)
+                              for mesh in meshes]) - atol
+            upper = np.array([mesh._vertices.max(axis=0) if mesh.nb_vertices > 0 else np.full(3, -np.inf)
+                              for mesh in meshes]) + atol
+            overlaps = np.all((lower[:, None] <= upper[None]) & (lower[None] <= upper[:, None]), axis=2)
+            np.fill_diagonal(overlaps, False)
+
+            seam = np.zeros(len(vertices), dtype=bool)
+            for ipart, jpart in zip(*np.where(overlaps)):
+                part_slice = slice(vertices_offsets[ipart], vertices_offsets[ipart+1])
+                part_vertices = vertices[part_slice]
+                seam[part_slice] |= np.all((part_vertices >= lower[jpart]) & (part_vertices <= upper[jpart]), axis=1)
+
+            seam_ids = np.where(seam)[0]
+            representatives, new_seam_ids = merge_rows(vertices[seam_ids], atol=atol)
+
+            new_id = np.arange(len(vertices))
+            new_id[seam_ids] = seam_ids[representatives][new_seam_ids]
+            kept = new_id == np.arange(len(vertices))
+            renumber = np.cumsum(kept) - 1
+
+            vertices = vertices[kept]
+            faces = renumber[new_id][faces]
+
+        if name is None:
+            name = '_'.join([mesh.name for mesh in meshes])
+        new_mesh = cls(vertices, faces, name=name)
+        new_mesh._verbose = any([mesh._verbose for mesh in meshes])
+
+        if return_offsets:
+            return new_mesh, faces_offsets
+        else:
+            return new_mesh
+
     def __add__(self, mesh_to_add):
         """Adds two meshes
         
@@ -1499,15 +1770,18 @@ class Mesh(object):
             
         Note
         ----
-        This method should not be called as is but it overides the + binary operator for convenience.
+        This method should not be called as is but it overides the + binary operator for convenience. Duplicate
+        vertices are merged over the whole composite mesh, so that meshes still having their own duplicates can be
+        added. When every part is known to be already merged, Mesh.concatenate only merges the seams between parts and
+        avoids merging the growing mesh again at every addition.
         """
         
         assert isinstance(mesh_to_add, Mesh)
-        vertices = np.concatenate((self._vertices, mesh_to_add._vertices), axis=0)
-        faces = np.concatenate((self._faces, mesh_to_add._faces + self.nb_vertices), axis=0)
-        new_mesh = Mesh(vertices, faces, name='_'.join([self.name, mesh_to_add.name]))
+        new_mesh = Mesh.concatenate((self, mesh_to_add), merge=False)
+        verbose = new_mesh._verbose
+        new_mesh._verbose = False
         new_mesh.merge_duplicates()
-        new_mesh._verbose = self._verbose or mesh_to_add._verbose
+        new_mesh._verbose = verbose
 
         return new_mesh
 
@@ -1541,6 +1815,7 @@ class Mesh(object):
         meshmagick.tools.merge_duplicate_rows
         
         """
+        self._remove_bvh()
         uniq, new_id = merge_duplicate_rows(self._vertices, atol=atol, return_index=True)
 
         nv_init = self.nb_vertices
@@ -1572,7 +1847,7 @@ class Mesh(object):
     def heal_normals(self):
         """Heals the mesh's normals orientations so that they have a consistent orientation and try to make them outward.
         """
-        # TODO: return the different groups of a mesh in case it is made of several unrelated groups
+        self._remove_bvh()
 
         nv = self.nb_vertices
         nf = self.nb_faces
@@ -1590,61 +1865,13 @@ class Mesh(object):
             mesh_closed = True
 
         # Flooding the mesh to find inconsistent normals
-        type_cell = np.zeros(nf, dtype=np.int32)
-        type_cell[:] = 4
-        type_cell[self.triangles_ids] = 3
-
-        f_vis = np.zeros(nf, dtype=bool)
-        f_vis[0] = True
-        stack = [0]
-        nb_reversed = 0
-        while 1:
-            if len(stack) == 0:
-                if np.any(np.logical_not(f_vis)):
-                    iface = np.where(np.logical_not(f_vis))[0][0]
-                    stack.append(iface)
-                    f_vis[iface] = True
-                else:
-                    break
-
-            iface = stack.pop()
-            face = faces[iface]
-            s1 = set(face)
-
-            for iadj_f in f_f[iface]:
-                if f_vis[iadj_f]:
-                    continue
-                f_vis[iadj_f] = True
-                # Removing the other pointer
-                f_f[iadj_f].remove(iface)  # So as it won't go from iadj_f to iface in the future
-
-                # Shared vertices
-                adjface = faces[iadj_f]
-                s2 = set(adjface)
-                # try:
-                common_vertices = list(s1 & s2)
-                if len(common_vertices) == 2:
-                    i_v1, i_v2 = common_vertices
-                else:
-                    print(('WARNING: faces %u and %u have more than 2 vertices in common !' % (iface, iadj_f)))
-                    continue
+        ff_offsets = np.zeros(nf+1, dtype=np.int)
+        ff_offsets[1:] = np.cumsum([len(f_f[iface]) for iface in range(nf)])
+        ff_neighbors = np.array([iadj_f for iface in range(nf) for iadj_f in sorted(f_f[iface])], dtype=np.int)
 
-                # Checking normal consistency
-                face_ref = np.roll(face[:type_cell[iface]], -np.where(face == i_v1)[0][0])
-                adj_face_ref = np.roll(adjface[:type_cell[iadj_f]], -np.where(adjface == i_v1)[0][0])
-
-                if face_ref[1] == i_v2:
-                    i = 1
-                else:
-                    i = -1
-
-                if adj_face_ref[i] == i_v2:
-                    # Reversing normal
-                    nb_reversed += 1
-                    faces[iadj_f] = np.flipud(faces[iadj_f])
-
-                # Appending to the stack
-                stack.append(iadj_f)
+        faces, nb_reversed, nb_ambiguous = flood_orientation(faces, ff_offsets, ff_neighbors)
+        if nb_ambiguous > 0:
+            print(('WARNING: %u pairs of neighbor faces have more than 2 vertices in common !' % nb_ambiguous))
 
         if self._verbose:
             print("* Healing normals to make them consistent and if possible outward")
@@ -1654,6 +1881,8 @@ class Mesh(object):
                 print("\t--> Normals orientations are consistent")
 
         self._faces = faces
+        if nb_reversed > 0 and self._has_faces_properties():
+            self._remove_faces_properties()
 
         # Checking if the normals are outward
         if mesh_closed:
@@ -1695,6 +1924,7 @@ class Mesh(object):
         
         Those are vertices that are not used by any face connectivity.
         """
+        self._remove_bvh()
         # TODO: implementer return_index !!
         nv = self.nb_vertices
         vertices, faces = self._vertices, self._faces
@@ -1730,6 +1960,7 @@ class Mesh(object):
         
         A general face is stored internally as a 4 integer array. It allows to describe indices of a quadrangle's vertices. For triangles, the first index should be equal to the last. This method ensures that this rule is applied everywhere and correct bad triangles description.
         """
+        self._remove_bvh()
         if self._has_faces_properties():
             self._remove_faces_properties()
         
@@ -1771,6 +2002,7 @@ class Mesh(object):
         rtol : float, optional
             Positive relative tolerance
         """
+        self._remove_bvh()
         
         assert 0 < rtol
         
@@ -1853,6 +2085,42 @@ class Mesh(object):
 
         return faces
 
+    def decimate(self, target_faces=None, max_error=None, z_tol=1e-6):
+        """Decimates the mesh by edge collapses driven by quadric error metrics.
+
+        Parameters
+        ----------
+        target_faces : int, optional
+            Number of faces to reach
+        max_error : float, optional
+            Maximum quadric error (squared distance) allowed for an edge collapse
+        z_tol : float, optional
+            Absolute tolerance to consider a vertex lies on the waterline. Default is 1e-6.
+
+        Note
+        ----
+        Quadrangles are split so that the decimated mesh is only made of triangles. Boundaries and the waterline
+        (intersection with the plane z=0) are preserved.
+
+        See Also
+        --------
+        meshmagick.decimation.decimate
+        """
+        nf_init = self.nb_faces
+
+        vertices, faces = decimate(self._vertices, self._faces, target_faces=target_faces, max_error=max_error,
+                                   z_tol=z_tol)
+
+        self.__internals__.clear()
+        self._vertices, self._faces = vertices, faces
+
+        if self._verbose:
+            print('* Decimating the mesh:')
+            print(('\t--> Initial number of faces : %u' % nf_init))
+            print(('\t--> Final number of faces   : %u' % self.nb_faces))
+
+        return
+
     def symmetrize(self, plane):
         """Symmetrize the mesh with respect to a plane.
         
@@ -1864,10 +2132,11 @@ class Mesh(object):
         # Symmetrizing the nodes
         vertices, faces = self._vertices, self._faces
 
-        vertices = np.concatenate((vertices, vertices - 2 * np.outer(np.dot(vertices, plane.normal) - plane.c, plane.normal)))
-        faces = np.concatenate((faces, np.fliplr(faces.copy() + self.nb_vertices)))
+        mirrored_vertices = vertices - 2 * np.outer(np.dot(vertices, plane.normal) - plane.c, plane.normal)
+        symmetric_mesh = Mesh.concatenate((Mesh(vertices, faces), Mesh(mirrored_vertices, np.fliplr(faces))),
+                                          merge=False)
 
-        self._vertices, self._faces = vertices, faces
+        self._vertices, self._faces = symmetric_mesh._vertices, symmetric_mesh._faces
         verbose = self.verbose
         self.verbose_off()
         self.merge_duplicates()
@@ -1877,6 +2146,128 @@ class Mesh(object):
             
         return
     
+    def components(self):
+        """Get the connected components of the mesh.
+
+        Faces belong to the same component if they are connected by a chain of faces sharing edges.
+
+        Returns
+        -------
+        ndarray
+            (nf,) array of the components labels of the faces, components being numbered from 0 in the order of their
+            first face
+
+        See Also
+        --------
+        meshmagick.tools.get_connected_components
+        """
+        face_1, face_2 = get_faces_neighbors(self._faces)
+        return get_connected_components(self.nb_faces, face_1, face_2)
+
+    @property
+    def nb_components(self):
+        """Get the number of connected components of the mesh"""
+        if self.nb_faces == 0:
+            return 0
+        return self.components().max() + 1
+
+    def split(self):
+        """Splits the mesh into its connected components.
+
+        Returns
+        -------
+        list
+            The list of the components meshes, e.g. the different bodies of a multi-body mesh
+        """
+        if self.nb_faces == 0:
+            return list()
+
+        labels = self.components()
+        order = np.argsort(labels, kind='mergesort')
+        offsets = np.searchsorted(labels[order], np.arange(labels.max() + 2))
+
+        meshes = list()
+        for icomponent in range(len(offsets) - 1):
+            mesh = self.extract_faces(order[offsets[icomponent]:offsets[icomponent+1]])
+            mesh.name = '%s_%u' % (self.name, icomponent)
+            meshes.append(mesh)
+        return meshes
+
+    def reorder(self, method='morton'):
+        """Renumbers vertices and faces to improve memory locality.
+
+        Vertices are sorted along a space filling curve or by a bandwidth reducing order and faces are then sorted by
+        their lowest vertex id, so that faces that are close in the arrays share vertices that are close in memory.
+        The gain is mainly on the evaluation of faces properties (areas, normals and centers), which is dominated by
+        gathering vertices. Surface integrals are dominated by arithmetic and are only slightly faster.
+
+        Parameters
+        ----------
+        method : str, optional
+            'morton' to sort vertices by their Morton (Z-order) codes or 'rcm' to use the reverse Cuthill-McKee order
+            of the vertices / vertices connectivity. Default is 'morton'.
+
+        Returns
+        -------
+        vertices_order : ndarray
+            (nv,) array of the old ids of the new vertices
+        faces_order : ndarray
+            (nf,) array of the old ids of the new faces
+
+        See Also
+        --------
+        meshmagick.tools.morton_codes
+        meshmagick.kernels.reverse_cuthill_mckee
+        """
+        if method == 'morton':
+            vertices_order = np.argsort(morton_codes(self._vertices), kind='mergesort')
+        elif method == 'rcm':
+            vertices_order = reverse_cuthill_mckee(*get_vertices_neighbors(self.nb_vertices, self._faces))
+        else:
+            raise ValueError("Unknown reordering method %s. It must be 'morton' or 'rcm'" % method)
+
+        new_id = np.empty(self.nb_vertices, dtype=np.int)
+        new_id[vertices_order] = np.arange(self.nb_vertices)
+        faces = new_id[self._faces]
+        faces_order = np.argsort(faces.min(axis=1), kind='mergesort')
+
+        self._remove_bvh()
+        self._remove_faces_properties()
+        self._remove_triangles_quadrangles()
+        self._remove_connectivity()
+
+        self._vertices = self._vertices[vertices_order]
+        self._faces = faces[faces_order]
+
+        if self._verbose:
+            print("* Reordering vertices and faces with %s method" % method)
+
+        return vertices_order, faces_order
+
+    def get_symmetric_half(self, axis=1, atol=1e-6):
+        """Get the half of the mesh if it is symmetric with respect to a coordinate plane.
+
+        Parameters
+        ----------
+        axis : int, optional
+            The axis normal to the symmetry plane: 0 for Oyz, 1 for Oxz. Default is 1.
+        atol : float, optional
+            Absolute tolerance on vertices coordinates. Default is 1e-6.
+
+        Returns
+        -------
+        Mesh or None
+            The half of the mesh lying on the positive side of the plane, or None if the mesh is not symmetric
+
+        See Also
+        --------
+        meshmagick.tools.get_symmetric_half
+        """
+        half = get_symmetric_half(self._vertices, self._faces, axis=axis, atol=atol)
+        if half is None:
+            return None
+        return Mesh(*half, name='%s_half' % self.name)
+
     def mirror(self, plane):
         """Mirrors the mesh instance with respect to a plane.
         
@@ -1890,32 +2281,39 @@ class Mesh(object):
         self.__internals__.clear()
         return
     
-    def _compute_faces_integrals(self, sum_faces_contrib=False): # TODO: implementer le sum_surface_contrib
+    def _compute_faces_integrals(self, sum_faces_contrib=False, weights=None, nb_threads=1):
+        """Computes the faces surface integrals, quadrangles being split into two triangles.
 
-        # TODO: Utiliser sum_faces_contrib
-        surface_integrals = np.zeros((15, self.nb_faces), dtype=np.float)
-
-        # First triangles
-        if self.nb_triangles > 0:
-            triangles_ids = self.triangles_ids
-            # print self._faces[triangles_ids][:, :3].shape
-            triangles_vertices = self._vertices[self._faces[triangles_ids][:, :3]] # Remettre le 3
-            surface_integrals[:, triangles_ids] = self._compute_triangles_integrals(triangles_vertices)
+        Parameters
+        ----------
+        sum_faces_contrib : bool, optional
+            If True, returns the sum of the faces contributions instead of storing them. Default is False.
+        weights : ndarray, optional
+            (nf,) or (nf x k) array of weights of the faces contributions, only used if sum_faces_contrib is True.
+        nb_threads : int, optional
+            Number of threads among which the faces are distributed. Default is 1.
 
-        # Now quadrangles by splitting them up
-        if self.nb_quadrangles > 0:
-            quadrangles_ids = self.quadrangles_ids
-            quadrangles = self._faces[quadrangles_ids]
+        Returns
+        -------
+        ndarray
+            The sum of the faces contributions if sum_faces_contrib is True
+        """
+        quadrangles_ids = self.quadrangles_ids
+        triangles = np.concatenate((self._faces[:, :3], self._faces[quadrangles_ids][:, (0, 2, 3)]))
 
-            # First pass
-            surface_integrals[:, quadrangles_ids] = \
-                self._compute_triangles_integrals(self._vertices[quadrangles[:, (0, 1, 2)]])
+        if sum_faces_contrib:
+            if weights is None:
+                weights = np.ones(self.nb_faces, dtype=np.float)
+            weights = np.asarray(weights, dtype=np.float)
+            weights = np.concatenate((weights, weights[quadrangles_ids]))
+            return _triangles_integrals(self._vertices, triangles, sum_faces_contrib=True, weights=weights,
+                                        nb_threads=nb_threads)
 
-            # Second pass
-            surface_integrals[:, quadrangles_ids] += \
-                self._compute_triangles_integrals(self._vertices[quadrangles[:, (0, 2, 3)]])
+        integrals = _triangles_integrals(self._vertices, triangles, nb_threads=nb_threads)
+        surface_integrals = integrals[:, :self.nb_faces]
+        surface_integrals[:, quadrangles_ids] += integrals[:, self.nb_faces:]
 
-        self.__internals__['surface_integrals'] = surface_integrals
+        self.__internals__['surface_integrals'] = np.ascontiguousarray(surface_integrals)
 
         return
     
@@ -1927,18 +2325,35 @@ class Mesh(object):
     def has_surface_integrals(self):
         return 'surface_integrals' in self.__internals__
 
-    def get_surface_integrals(self):
+    def get_surface_integrals(self, sum_faces_contrib=False, weights=None, nb_threads=1):
         """Get the mesh surface integrals
         
+        Parameters
+        ----------
+        sum_faces_contrib : bool, optional
+            If True, returns the sum of the faces contributions. If the integrals are not already stored, they are
+            then summed by chunks without storing the (15 x nf) array. Default is False.
+        weights : array_like, optional
+            (nf,) or (nf x k) array of weights of the faces contributions, only used if sum_faces_contrib is True.
+        nb_threads : int, optional
+            Number of threads used if the integrals have to be computed. Default is 1.
+
         Returns
         -------
         ndarray
-            The mesh surface integrals array
+            The mesh surface integrals array or their (weighted) sum
         """
-        # TODO: add an option to do the summation
         # TODO: decrire les integrales de surface en question
+        if sum_faces_contrib:
+            if self.has_surface_integrals():
+                surface_integrals = self.__internals__['surface_integrals']
+                if weights is None:
+                    return surface_integrals.sum(axis=1)
+                return np.dot(surface_integrals, np.asarray(weights, dtype=np.float))
+            return self._compute_faces_integrals(sum_faces_contrib=True, weights=weights, nb_threads=nb_threads)
+
         if not self.has_surface_integrals():
-            self._compute_faces_integrals()
+            self._compute_faces_integrals(nb_threads=nb_threads)
         return self.__internals__['surface_integrals']
 
     def _compute_volume(self):
@@ -1961,36 +2376,64 @@ class Mesh(object):
         """
         return self._compute_volume()
     
-    # TODO: add the possibility to compute the inertia to an other point than [0, 0, 0]
-    def eval_plain_mesh_inertias(self, rho_medium=1023.):
+    def eval_plain_mesh_inertias(self, rho_medium=1023., point=None, rotation=None):
         """Evaluates the mesh inertia under the assumption of an enclosed volume made of an homogeneous medium of the given density.
         
         Parameters
         ----------
         rho_medium : float, optional
             The medium density (kg/m**3). Default is 1023 kg.m**3 (salt water)
+        point : array_like, optional
+            The reduction point of the inertia matrix. Default is origin (0, 0, 0).
+        rotation : array_like, optional
+            (3 x 3) rotation matrix whose columns are the axes of the frame in which the inertia is expressed. Default
+            is the mesh frame.
 
         Returns
         -------
         RigidBodyInertia
-            The mesh inertia instance expressed at origin (0, 0, 0)
+            The mesh inertia instance expressed at point
         """
-        # TODO: allow to specify an other point for inertia matrix expression
         # TODO: manipuler plutot un objet inertia --> creer une classe !
+        weighted_integrals = np.dot(self.faces_normals.T, self.get_surface_integrals().T)
+        inertia = self._plain_inertias_from_integrals(weighted_integrals, rho_medium=rho_medium)
+        return self._transport_inertia(inertia, point, rotation)
+
+    @staticmethod
+    def _transport_inertia(inertia, point=None, rotation=None):
+        """Transports an inertia expressed at origin to an other reduction point and frame"""
+        if point is None and rotation is None:
+            return inertia
+        if point is None:
+            point = inertia.reduction_point
+        return inertia.get_inertia_at(point, rotation)
+
+    @staticmethod
+    def _plain_inertias_from_integrals(weighted_integrals, rho_medium=1023.):
+        """Evaluates the inertia of an homogeneous volume from the surface integrals over its boundary.
+
+        Parameters
+        ----------
+        weighted_integrals : ndarray
+            (3 x 15) array whose element (i, j) is the sum over the boundary faces of the i-th component of the face
+            normal times the j-th surface integral of the face (see _compute_triangles_integrals).
+        rho_medium : float, optional
+            The medium density (kg/m**3). Default is 1023 kg.m**3 (salt water)
+
+        Returns
+        -------
+        RigidBodyInertia
+            The inertia instance expressed at origin (0, 0, 0)
+        """
         rho_medium = float(rho_medium)
-        
-        volume = self.volume
+
+        volume = np.trace(weighted_integrals[:, 0:3]) / 3.
         mass = rho_medium * volume
-        
-        integrals = self.get_surface_integrals()[6:15]
-        sigma_6_8 = integrals[:3]
-        
-        normals = self.faces_normals.T
-        
-        cog = (normals * sigma_6_8).sum(axis=1) / (2*volume)
-        
-        sigma9, sigma10, sigma11 = (normals * integrals[3:6]).sum(axis=1)
-        sigma12, sigma13, sigma14 = (normals * integrals[6:10]).sum(axis=1)
+
+        cog = np.diag(weighted_integrals[:, 6:9]) / (2*volume)
+
+        sigma9, sigma10, sigma11 = np.diag(weighted_integrals[:, 9:12])
+        sigma12, sigma13, sigma14 = np.diag(weighted_integrals[:, 12:15])
 
         xx = rho_medium * (sigma10 + sigma11) / 3.
         yy = rho_medium * (sigma9 + sigma11) / 3.
@@ -2001,41 +2444,67 @@ class Mesh(object):
 
         return RigidBodyInertia(mass, cog, xx, yy, zz, yz, xz, xy, point=[0, 0, 0])
     
-    def eval_shell_mesh_inertias(self, rho_medium=7850., thickness=0.02):
-        """Evaluates the mesh inertia under the assumption of an enclosed volume made of an homogeneous medium of the
-        given density.
+    def eval_shell_mesh_inertias(self, rho_medium=7850., thickness=0.02, zones=None, point=None, rotation=None):
+        """Evaluates the mesh inertia under the assumption of a shell made of a medium of the given density and
+        thickness.
+
+        Density and thickness may either be uniform or vary from a face to another so that the plating of the different
+        zones of a hull may be weighted in one single reduction over the faces integrals.
 
         Parameters
         ----------
-        rho_medium : float, optional
-            The medium density (kg/m**3). Default is 7850 kg/m**3 (Steel density)
-        thickness : flaot, optional
-            The hull thickness (m). Default is 0.02 m.
+        rho_medium : float or array_like, optional
+            The medium density (kg/m**3). Default is 7850 kg/m**3 (Steel density). If an array is given, it holds one
+            density per face or, if zones is given, one density per zone id.
+        thickness : float or array_like, optional
+            The hull thickness (m). Default is 0.02 m. If an array is given, it holds one thickness per face or, if
+            zones is given, one thickness per zone id.
+        zones : array_like, optional
+            Array of integer zone ids, one per face, used to look up rho_medium and thickness when they are arrays.
+        point : array_like, optional
+            The reduction point of the inertia matrix. Default is origin (0, 0, 0).
+        rotation : array_like, optional
+            (3 x 3) rotation matrix whose columns are the axes of the frame in which the inertia is expressed. Default
+            is the mesh frame.
 
         Returns
         -------
         RigidBodyInertia
-            The mesh inertia instance expressed at origin (0, 0, 0)
+            The mesh inertia instance expressed at point
         """
-        rho_medium = float(rho_medium)
-        thickness = float(thickness)
-        surf_density = rho_medium * thickness
-        
-        surface = self.faces_areas.sum()
-        mass = surf_density * surface
+        rho_medium = np.asarray(rho_medium, dtype=np.float)
+        thickness = np.asarray(thickness, dtype=np.float)
 
-        s0, s1, s2, s3, s4, s5, s6, s7, s8 = self.get_surface_integrals()[:9].sum(axis=1)
-        
-        cog = np.array([s0, s1, s2], dtype=np.float) / surface
-        
-        xx = surf_density * (s7 + s8)
-        yy = surf_density * (s6 + s8)
-        zz = surf_density * (s6 + s7)
-        yz = surf_density * s3
-        xz = surf_density * s4
-        xy = surf_density * s5
-        
-        return RigidBodyInertia(mass, cog, xx, yy, zz, yz, xz, xy, point=[0, 0, 0])
+        if zones is not None:
+            zones = np.asarray(zones, dtype=np.int)
+            if zones.shape != (self.nb_faces,):
+                raise ValueError('zones must hold one zone id per face')
+            if rho_medium.ndim > 0:
+                rho_medium = rho_medium[zones]
+            if thickness.ndim > 0:
+                thickness = thickness[zones]
+
+        for field in (rho_medium, thickness):
+            if field.ndim > 0 and field.shape != (self.nb_faces,):
+                raise ValueError('Density and thickness must be scalars or hold one value per face')
+
+        surf_density = np.broadcast_to(rho_medium * thickness, (self.nb_faces,))
+
+        mass = np.dot(self.faces_areas, surf_density)
+
+        s0, s1, s2, s3, s4, s5, s6, s7, s8 = np.dot(self.get_surface_integrals()[:9], surf_density)
+
+        cog = np.array([s0, s1, s2], dtype=np.float) / mass
+
+        xx = s7 + s8
+        yy = s6 + s8
+        zz = s6 + s7
+        yz = s3
+        xz = s4
+        xy = s5
+
+        inertia = RigidBodyInertia(mass, cog, xx, yy, zz, yz, xz, xy, point=[0, 0, 0])
+        return self._transport_inertia(inertia, point, rotation)
         
     def _edges_stats(self):
         """Computes the min, max, and mean of the mesh's edge length"""
@@ -2063,9 +2532,28 @@ class Mesh(object):
         return self._edges_stats()[2]
     
     @staticmethod
-    def _compute_triangles_integrals(triangles_vertices, sum_faces_contrib=False):
+    def _compute_triangles_integrals(triangles_vertices, sum_faces_contrib=False, weights=None,
+                                     chunk_size=TRIANGLES_CHUNK_SIZE, nb_threads=1):
         """Performs the computation of the various interesting surface integrals.
         
+        Parameters
+        ----------
+        triangles_vertices : ndarray
+            (n x 3 x 3) array of the triangles vertices coordinates
+        sum_faces_contrib : bool, optional
+            If True, returns the sum of the contributions of the triangles, without storing them. Default is False.
+        weights : ndarray, optional
+            (n,) or (n x k) array of weights of the triangles contributions, only used if sum_faces_contrib is True.
+        chunk_size : int, optional
+            Number of triangles processed at once. Default is TRIANGLES_CHUNK_SIZE.
+        nb_threads : int, optional
+            Number of threads among which the triangles are distributed. Default is 1.
+
+        Returns
+        -------
+        ndarray
+            (15 x n) array of the integrals or, if sum_faces_contrib is True, their (weighted) sum
+
         Notes
         -----
         triangles_vertices doit decrire par dimension croissante du general au particulier :
@@ -2077,40 +2565,11 @@ class Mesh(object):
         ----
         Explicit the integrals
         """
-
-        s_int = np.zeros((15, triangles_vertices.shape[0]), dtype=np.float)
-
-        point_0, point_1, point_2 = list(map(_3DPointsArray, np.rollaxis(triangles_vertices, 1, 0)))
-
-        t0 = point_0 + point_1
-        f1 = t0 + point_2
-        t1 = point_0 * point_0
-        t2 = t1 + point_1*t0
-        f2 = t2 + point_2*f1
-        f3 = point_0*t1 + point_1*t2 + point_2*f2
-        g0 = f2 + point_0 * (f1 + point_0)
-        g1 = f2 + point_1 * (f1 + point_1)
-        g2 = f2 + point_2 * (f1 + point_2)
-
-        e1 = point_1 - point_0
-        e2 = point_2 - point_0
-
-        delta = np.linalg.norm(np.cross(e1, e2), axis=1)
-
-        s_int[0:3] = np.einsum('i, ij -> ji', delta, f1) / 6.
-
-        s_int[3] = delta * (6.*point_0.y*point_0.z + 3*(point_1.y*point_1.z + point_2.y*point_2.z) - point_0.y*f1[:, 2] - point_0.z*f1[:, 1]) / 12.
-        s_int[4] = delta * (6.*point_0.x*point_0.z + 3*(point_1.x*point_1.z + point_2.x*point_2.z) - point_0.x*f1[:, 2] - point_0.z*f1[:, 0]) / 12.
-        s_int[5] = delta * (6.*point_0.x*point_0.y + 3*(point_1.x*point_1.y + point_2.x*point_2.y) - point_0.x*f1[:, 1] - point_0.y*f1[:, 0]) / 12.
-
-        s_int[6:9] = np.einsum('i, ij -> ji', delta, f2) / 12.
-        s_int[9:12] = np.einsum('i, ij -> ji', delta, f3) / 20.
-
-        s_int[12] = delta * (point_0.y*g0[:, 0] + point_1.y*g1[:, 0] + point_2.y*g2[:, 0]) / 60.
-        s_int[13] = delta * (point_0.z*g0[:, 1] + point_1.z*g1[:, 1] + point_2.z*g2[:, 1]) / 60.
-        s_int[14] = delta * (point_0.x*g0[:, 2] + point_1.x*g1[:, 2] + point_2.x*g2[:, 2]) / 60.
-
-        return s_int
+        triangles_vertices = np.asarray(triangles_vertices, dtype=np.float)
+        nb_triangles = triangles_vertices.shape[0]
+        return _triangles_integrals(triangles_vertices.reshape((-1, 3)), np.arange(3 * nb_triangles).reshape((-1, 3)),
+                                    sum_faces_contrib=sum_faces_contrib, weights=weights, chunk_size=chunk_size,
+                                    nb_threads=nb_threads)
 
     def quick_save(self, filename=None):
         """Saves the current mesh instance in a VTK file.
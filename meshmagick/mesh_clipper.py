@@ -4,6 +4,7 @@
 """This module holds a tools to clip meshes against a plane"""
 
 from .mesh import *
+from .kernels import chain_edges, clip_crown
 
 
 class MeshClipper(object):
@@ -22,10 +23,16 @@ class MeshClipper(object):
         plane are not closed. It may be caused by a non-watertight mesh.
     verbose : bool, optional
         False by default. If True, some messages on operations that are handled are printed.
+    integrals_only : bool, optional
+        False by default. When True, the clipper does not build the lower, upper and clipped meshes but only sums the
+        surface integrals over the part of the mesh that is below the plane (see clipped_surface_integrals). Meshes
+        are still built on demand when their properties are accessed.
     """
-    def __init__(self, source_mesh, plane=Plane(), vicinity_tol=1e-3, assert_closed_boundaries=False, verbose=False):
+    def __init__(self, source_mesh, plane=Plane(), vicinity_tol=1e-3, assert_closed_boundaries=False, verbose=False,
+                 integrals_only=False):
         self._source_mesh = source_mesh
         self._plane = plane
+        self._integrals_only = integrals_only
 
         self._vicinity_tol = vicinity_tol
 
@@ -142,38 +149,65 @@ class MeshClipper(object):
 
         source_mesh_faces = self.source_mesh.faces
 
-        nb_vertices_above = vertices_above_mask[source_mesh_faces].sum(axis=1)
-        nb_vertices_below = vertices_below_mask[source_mesh_faces].sum(axis=1)
-
-        # Simple criteria ensuring that _faces are totally above or below the plane (4 _vertices at the same side)
-        # Works for both triangles and quadrangles
-        above_faces_mask = nb_vertices_above == 4
-        below_faces_mask = nb_vertices_below == 4
-        crown_faces_mask = np.logical_and(np.logical_not(above_faces_mask), np.logical_not(below_faces_mask))
+        if self._source_mesh._has_bvh():
+            # The spatial index of the mesh gives the crown faces by only visiting the tree nodes that cross the plane
+            crown_faces_ids = self._source_mesh.bvh.get_faces_near_plane(self._plane.normal, self._plane.c,
+                                                                          tol=self._vicinity_tol)
+            crown_faces_mask = np.zeros(self._source_mesh.nb_faces, dtype=bool)
+            crown_faces_mask[crown_faces_ids] = True
+
+            # Other faces are entirely at one side of the plane so that their first vertex is enough to classify them
+            first_vertex_above = vertices_above_mask[source_mesh_faces[:, 0]]
+            above_faces_mask = np.logical_and(np.logical_not(crown_faces_mask), first_vertex_above)
+            below_faces_mask = np.logical_and(np.logical_not(crown_faces_mask), np.logical_not(first_vertex_above))
+
+        else:
+            nb_vertices_above = vertices_above_mask[source_mesh_faces].sum(axis=1)
+            nb_vertices_below = vertices_below_mask[source_mesh_faces].sum(axis=1)
+
+            # Simple criteria ensuring that _faces are totally above or below the plane (4 _vertices at the same side)
+            # Works for both triangles and quadrangles
+            above_faces_mask = nb_vertices_above == 4
+            below_faces_mask = nb_vertices_below == 4
+            crown_faces_mask = np.logical_and(np.logical_not(above_faces_mask), np.logical_not(below_faces_mask))
+            crown_faces_ids = np.where(crown_faces_mask)[0]
 
         above_faces_ids = np.where(above_faces_mask)[0]
         below_faces_ids = np.where(below_faces_mask)[0]
-        crown_faces_ids = np.where(crown_faces_mask)[0]
+
+        self.__internals__['above_faces_ids'] = above_faces_ids
+        self.__internals__['crown_faces_ids'] = crown_faces_ids
+        self.__internals__['below_faces_ids'] = below_faces_ids
+
+        # Generating partition meshes, the crown mesh being always needed for clipping
+        self._generate_partition_mesh('crown_mesh')
+        if not self._integrals_only:
+            self._generate_partition_mesh('upper_mesh')
+            self._generate_partition_mesh('lower_mesh')
+
+    def _generate_partition_mesh(self, key):
+        """Extracts one of the partition meshes from the source mesh.
+
+        Parameters
+        ----------
+        key : str
+            The partition mesh to generate, 'upper_mesh', 'crown_mesh' or 'lower_mesh'
+        """
+
+        faces_ids = self.__internals__[{'upper_mesh': 'above_faces_ids',
+                                        'crown_mesh': 'crown_faces_ids',
+                                        'lower_mesh': 'below_faces_ids'}[key]]
+
+        new_mesh, ids = self._source_mesh.extract_faces(faces_ids, return_index=True)
+        new_mesh.name = key
 
         partition = dict()
-        
-        def generate_mesh(faces_ids, key):
-            new_mesh, ids = self._source_mesh.extract_faces(faces_ids, return_index=True)
-            new_mesh.name = key
-            partition['_'.join((key, 'vertices_ids'))] = ids
-            partition['_'.join((key, 'vertices_distances'))] = vertices_distances[ids]
-            partition['_'.join((key, 'above_vertices_mask'))] = vertices_above_mask[ids]
-            partition['_'.join((key, 'on_vertices_mask'))] = vertices_on_mask[ids]
-            partition['_'.join((key, 'below_vertices_mask'))] = vertices_below_mask[ids]
-            partition[key] = new_mesh
-
-        # Generating partition meshes
-        generate_mesh(above_faces_ids, 'upper_mesh')
-        generate_mesh(crown_faces_ids, 'crown_mesh')
-        generate_mesh(below_faces_ids, 'lower_mesh')
-        partition['above_faces_ids'] = above_faces_ids
-        partition['crown_faces_ids'] = crown_faces_ids
-        partition['below_faces_ids'] = below_faces_ids
+        partition['_'.join((key, 'vertices_ids'))] = ids
+        partition['_'.join((key, 'vertices_distances'))] = self.__internals__['vertices_distances'][ids]
+        partition['_'.join((key, 'above_vertices_mask'))] = self.__internals__['vertices_above_mask'][ids]
+        partition['_'.join((key, 'on_vertices_mask'))] = self.__internals__['vertices_on_mask'][ids]
+        partition['_'.join((key, 'below_vertices_mask'))] = self.__internals__['vertices_below_mask'][ids]
+        partition[key] = new_mesh
 
         self.__internals__.update(partition)
 
@@ -186,6 +220,8 @@ class MeshClipper(object):
         Mesh
         """
         
+        if 'lower_mesh' not in self.__internals__:
+            self._generate_partition_mesh('lower_mesh')
         return self.__internals__['lower_mesh']
 
     @property
@@ -208,6 +244,8 @@ class MeshClipper(object):
         Mesh
         """
         
+        if 'upper_mesh' not in self.__internals__:
+            self._generate_partition_mesh('upper_mesh')
         return self.__internals__['upper_mesh']
 
     @property
@@ -225,7 +263,117 @@ class MeshClipper(object):
     def clipped_mesh(self):
         """The resulting clipped mesh"""
         
+        if 'clipped_mesh' not in self.__internals__:
+            self._assemble_clipped_mesh()
         return self.__internals__['clipped_mesh']
+
+    @property
+    def clipped_upper_crown_mesh(self):
+        """A new mesh that is the part of the crown_mesh lying above the clipping plane.
+
+        It is obtained from the same intersections as the clipped_crown_mesh whose vertices it shares.
+
+        Returns
+        -------
+        Mesh
+        """
+
+        if 'clipped_upper_crown_mesh' not in self.__internals__:
+            self.__internals__['clipped_upper_crown_mesh'] = Mesh(self.clipped_crown_mesh.vertices,
+                                                                  self.__internals__['clipped_upper_crown_faces'],
+                                                                  name='clipped_upper_crown_mesh')
+        return self.__internals__['clipped_upper_crown_mesh']
+
+    @property
+    def clipped_upper_mesh(self):
+        """The part of the mesh lying above the clipping plane, the faces crossing the plane being clipped.
+
+        Returns
+        -------
+        Mesh
+        """
+
+        if 'clipped_upper_mesh' not in self.__internals__:
+            clipped_upper_mesh = Mesh.concatenate((self.upper_mesh, self.clipped_upper_crown_mesh))
+            clipped_upper_mesh.name = '_'.join((self._source_mesh.name, 'clipped_upper'))
+            self.__internals__['clipped_upper_mesh'] = clipped_upper_mesh
+        return self.__internals__['clipped_upper_mesh']
+
+    @property
+    def clipped_area(self):
+        """The area of the part of the mesh that is below the clipping plane
+
+        Returns
+        -------
+        float
+        """
+
+        if 'clipped_area' not in self.__internals__:
+            self._compute_clipped_integrals()
+        return self.__internals__['clipped_area']
+
+    @property
+    def clipped_surface_integrals(self):
+        """The surface integrals of the faces of the clipped mesh, summed over the faces.
+
+        Returns
+        -------
+        ndarray
+            (15,) array of the integrals described in Mesh._compute_triangles_integrals
+        """
+
+        if 'clipped_surface_integrals' not in self.__internals__:
+            self._compute_clipped_integrals()
+        return self.__internals__['clipped_surface_integrals']
+
+    @property
+    def clipped_weighted_surface_integrals(self):
+        """The surface integrals of the faces of the clipped mesh, weighted by the faces normals and summed.
+
+        Returns
+        -------
+        ndarray
+            (3 x 15) array whose element (i, j) is the sum over the faces of the i-th component of the face normal
+            times the j-th surface integral of the face
+        """
+
+        if 'clipped_weighted_surface_integrals' not in self.__internals__:
+            self._compute_clipped_integrals()
+        return self.__internals__['clipped_weighted_surface_integrals']
+
+    @property
+    def clipped_axis_aligned_bbox(self):
+        """The axis aligned bounding box of the clipped mesh
+
+        Returns
+        -------
+        tuple
+            (xmin, xmax, ymin, ymax, zmin, zmax)
+        """
+
+        if 'clipped_axis_aligned_bbox' not in self.__internals__:
+            self._compute_clipped_integrals()
+        return self.__internals__['clipped_axis_aligned_bbox']
+
+    def eval_clipped_plain_inertias(self, rho_medium=1023.):
+        """Evaluates the inertia of the clipped mesh, considered as filled with an homogeneous medium.
+
+        The clipped mesh is not built, the inertia is obtained from its summed surface integrals. As for
+        Mesh.eval_plain_mesh_inertias, the clipped mesh is not closed by a lid so that the result is only relevant
+        for a clipping plane passing by the origin.
+
+        Parameters
+        ----------
+        rho_medium : float, optional
+            The medium density (kg/m**3). Default is 1023 kg.m**3 (salt water)
+
+        Returns
+        -------
+        RigidBodyInertia
+            The inertia instance expressed at origin (0, 0, 0)
+        """
+
+        return Mesh._plain_inertias_from_integrals(self.clipped_weighted_surface_integrals, rho_medium=rho_medium)
     
     @property
     def closed_polygons(self):
@@ -243,7 +391,8 @@ class MeshClipper(object):
         
         * The first vertex is repeated at the end of the list. By definition, these polygons are lying on the clipping
           plane.
-        * Vertices IDs are corresponding to the IDs of the clipped_crown_mesh, not those of the clipped_mesh.
+        * Vertices IDs are corresponding to the IDs of the clipped_crown_mesh, not those of the clipped_mesh. They are
+          also those of the clipped_upper_crown_mesh, for which polygons are described in the clockwise order.
         """
         
         return self.__internals__['closed_polygons']
@@ -346,399 +495,65 @@ class MeshClipper(object):
 
         vertices_distances = self.__internals__['crown_mesh_vertices_distances']
 
-        # Init
-        crown_faces = list()
-        direct_boundary_edges = dict()
-        inv_boundary_edges = dict()
-        intersections = list()
-
-        index = crown_mesh.nb_vertices
-
-        for face_id in range(crown_mesh.nb_faces):
-
-            face = crown_mesh.get_face(face_id)
-
-            # # Determining the type of face clipping
-            v_above_face = np.where(vertices_above_mask[face])[0]
-            v_on_face = np.where(vertices_on_mask[face])[0]
-            v_below_face = np.where(vertices_below_mask[face])[0]
-
-            nb_above = len(v_above_face)
-            nb_on = len(v_on_face)
-            nb_below = len(v_below_face)
-
-            face_type = str(nb_above) + str(nb_on) + str(nb_below)
-
-            if face_type == '202':  # Done
-                #    0*-----*3
-                #     |     |
-                # ----o-----o----
-                #     |     |
-                #    1*-----*2
-                if v_above_face[1] == v_above_face[0] + 1:
-                    face = np.roll(face, -v_above_face[1])
-                p0, p1, p2, p3 = vertices[face]
-                ileft = self._plane.get_edge_intersection(p0, p1)
-                iright = self._plane.get_edge_intersection(p2, p3)
-                intersections += [ileft, iright]
-                boundary_edge = [index, index + 1]
-                crown_faces.append([index, face[1], face[2], index + 1])
-                index += 2
-
-            elif face_type == '301':  # Done
-                #      *2
-                #     / \
-                #    /   \
-                #   /     \
-                # 3*       *1
-                #   \     /
-                # ---o---o---
-                #     \ /
-                #      *0
-                face = np.roll(face, -v_below_face[0])
-                p0, p1, p3 = vertices[face[[0, 1, 3]]]
-                ileft = self._plane.get_edge_intersection(p0, p3)
-                iright = self._plane.get_edge_intersection(p0, p1)
-                intersections += [ileft, iright]
-                boundary_edge = [index, index + 1]
-                crown_faces.append([index, face[0], index + 1, index])
-                index += 2
-
-            elif face_type == '103':  # Done
-                #      *0
-                #     / \
-                # ---o---o---
-                #   /     \
-                # 1* - - - *3
-                #   \     /
-                #    \   /
-                #     \ /
-                #      *2
-                face = np.roll(face, -v_above_face[0])
-                p0, p1, p3 = vertices[face[[0, 1, 3]]]
-                ileft = self._plane.get_edge_intersection(p0, p1)
-                iright = self._plane.get_edge_intersection(p0, p3)
-                intersections += [ileft, iright]
-                boundary_edge = [index, index + 1]
-                crown_faces.append([index, face[1], face[3], index + 1])
-                crown_faces.append([face[1], face[2], face[3], face[1]])
-                index += 2
-
-            elif face_type == '102':  # Done
-                #      *O
-                #     / \
-                # ---o---o---
-                #   /     \
-                # 1*-------*2
-                face = np.roll(face, -v_above_face[0])
-                p0, p1, p2 = vertices[face]
-                ileft = self._plane.get_edge_intersection(p0, p1)
-                iright = self._plane.get_edge_intersection(p0, p2)
-                intersections += [ileft, iright]
-                boundary_edge = [index, index + 1]
-                crown_faces.append([index, face[1], face[2], index + 1])
-                index += 2
-
-            elif face_type == '201':  # done
-                #  2*-------*1
-                #    \     /
-                #  ---o---o---
-                #      \ /
-                #       *0
-                face = np.roll(face, -v_below_face[0])
-                p0, p1, p2 = vertices[face]
-                ileft = self._plane.get_edge_intersection(p0, p2)
-                iright = self._plane.get_edge_intersection(p0, p1)
-                intersections += [ileft, iright]
-                boundary_edge = [index, index + 1]
-                crown_faces.append([index, face[0], index + 1, index])
-                index += 2
-
-            elif face_type == '211':  # Done
-                #        *3                   *1
-                #       / \                  / \
-                #      /   *2       or     2*   \
-                #    0/   /                  \   \0
-                # ---*---o---              ---o---*---
-                #     \ /                      \ /
-                #      *1                       *3
-                #
-
-                face = np.roll(face, -v_on_face[0])
-                if vertices_distances[face[1]] < 0.:
-                    p1, p2 = vertices[face[[1, 2]]]
-                    iright = self._plane.get_edge_intersection(p1, p2)
-                    intersections.append(iright)
-                    boundary_edge = [face[0], index]
-                    crown_faces.append([face[0], face[1], index, face[0]])
-                else:
-                    p2, p3 = vertices[face[[2, 3]]]
-                    ileft = self._plane.get_edge_intersection(p2, p3)
-                    intersections.append(ileft)
-                    boundary_edge = [index, face[0]]
-                    crown_faces.append([index, face[3], face[0], index])
-                index += 1
-
-            elif face_type == '112':  # Done
-                #       *3                     *1
-                #      / \                    / \
-                #  ---*---o---      or    ---o---*---
-                #     0\   \                /   /0
-                #       \   *2            2*   /
-                #        \ /                \ /
-                #         *1                 *3
-                face = np.roll(face, -v_on_face[0])
-                if vertices_distances[face[1]] < 0.:
-                    p2, p3 = vertices[face[[2, 3]]]
-                    iright = self._plane.get_edge_intersection(p2, p3)
-                    intersections.append(iright)
-                    boundary_edge = [face[0], index]
-                    crown_faces.append([face[0], face[1], face[2], index])
-                else:
-                    p1, p2 = vertices[face[[1, 2]]]
-                    ileft = self._plane.get_edge_intersection(p1, p2)
-                    intersections.append(ileft)
-                    boundary_edge = [index, face[0]]
-                    crown_faces.append([index, face[2], face[3], face[0]])
-                index += 1
-
-            elif face_type == '013':  # Done
-                # -----*-----
-                #     / \
-                #    /   \
-                #   *     *
-                #    \   /
-                #     \ /
-                #      *
-                boundary_edge = None
-                crown_faces.append(list(face))
-
-            elif face_type == '210' or face_type == '310':  # Done
-                #   *-------*               *
-                #    \ 210 /               / \ 310
-                #     \   /               *   *
-                #      \ /                 \ /
-                #   ----*----           ----*----
-                boundary_edge = None
-
-            elif face_type == '111':  # Done
-                #        *2              *1
-                #       /|               |\
-                #      / |               | \
-                #  ---*--o---    or   ---o--*---
-                #     0\ |               | /0
-                #       \|               |/
-                #        *1              *2
-                face = np.roll(face, -v_on_face[0])
-                p1, p2 = vertices[face[[1, 2]]]
-                if vertices_distances[face[1]] < 0.:
-                    iright = self._plane.get_edge_intersection(p1, p2)
-                    intersections.append(iright)
-                    boundary_edge = [face[0], index]
-                    crown_faces.append([face[0], face[1], index, face[0]])
-                else:
-                    ileft = self._plane.get_edge_intersection(p1, p2)
-                    intersections.append(ileft)
-                    boundary_edge = [index, face[0]]
-                    crown_faces.append([index, face[2], face[0], index])
-                index += 1
-
-            elif face_type == '120':  # Done
-                #         *O
-                #        / \
-                #       /   \
-                #     1/     \2
-                # ----*-------*----
-                # face = np.roll(face, -v_above_face[0])
-                # boundary_edge = [face[1], face[2]]
-                # FIXME: quick fix here : robust ?
-                boundary_edge = None
-
-            elif face_type == '021':  # Done
-                #  ----*-------*----
-                #      2\     /1
-                #        \   /
-                #         \ /
-                #          *0
-                face = np.roll(face, -v_below_face[0])
-                boundary_edge = [face[2], face[1]]
-                face = list(face)
-                face.append(face[0])
-                crown_faces.append(face)
-
-            elif face_type == '022':
-                # ----*-----*----
-                #    0|     |3
-                #     |     |
-                #    1*-----*2
-                if v_on_face[1] == v_on_face[0] + 1:
-                    face = np.roll(face, -v_on_face[1])
-                boundary_edge = [face[0], face[3]]
-                crown_faces.append(list(face))
-
-            elif face_type == '012':  # Done
-                #   ------*------
-                #        / \
-                #       /   \
-                #      /     \
-                #     *-------*
-                boundary_edge = None
-                face = list(face)
-                face.append(face[0])
-                crown_faces.append(face)
-
-            elif face_type == '220':  # Done
-                #    0*-----*3
-                #     |     |
-                #    1|     |2
-                # ----*-----*----
-                
-                # if v_above_face[1] == v_above_face[0] + 1:
-                #     face = np.roll(face, -v_above_face[1])
-                # boundary_edge = [face[1], face[2]]
-                # FIXME: quick fix here : robust ?
-                boundary_edge = None
-
-            elif face_type == '121':  # Done
-                #       *0
-                #      / \
-                #     /   \
-                # ---*-----*---
-                #    1\   /3
-                #      \ /
-                #       *2
-                face = np.roll(face, -v_above_face[0])
-                boundary_edge = [face[1], face[3]]
-                crown_faces.append([face[1], face[2], face[3], face[1]])
-
-            elif face_type == '300' or face_type == '400':
-                #       *               *-----*
-                #      / \              |     |
-                #     /300\      or     | 400 |
-                #    *-----*            *-----*
-                # ____________       ______________
-                boundary_edge = None
-
-            elif face_type == '003':
-                #  -----------
-                #       *
-                #      / \
-                #     /   \
-                #    *-----*
-                boundary_edge = None
-                face = list(face)
-                face.append(face[0])
-                crown_faces.append(face)
-
-            elif face_type == '004':
-                #  ---------------
-                #      *-----*
-                #      |     |
-                #      |     |
-                #      *-----*
-                boundary_edge = None
-                crown_faces.append(list(face))
-                
-            elif face_type == '030' or face_type == '040':
-                # Face is totally on the plane --> rare case...
-                boundary_edge = None
-                
-            else:
-                try:
-                    from . import mmio
-                    mmio.write_VTP('full_debug.vtp', self.source_mesh.vertices, self.source_mesh.faces)
-                    # mmio.write_VTP('clipped_crown_debug.vtp', clipped_crown_mesh.vertices, clipped_crown_mesh.faces)
-                    mmio.write_VTP('crown_debug.vtp', crown_mesh.vertices, crown_mesh.faces)
-                except:
-                    pass
-                raise Exception("Face %u clipping case %s not known." % (face_id, face_type))
-
-            # Building boundary connectivity
-            if boundary_edge is not None:
-                direct_boundary_edges[boundary_edge[0]] = boundary_edge[1]
-                inv_boundary_edges[boundary_edge[1]] = boundary_edge[0]
-
-        if len(intersections) > 0:
+        try:
+            crown_faces, upper_crown_faces, edges, boundary_edges = clip_crown(crown_mesh.faces,
+                                                                               vertices_above_mask,
+                                                                               vertices_on_mask,
+                                                                               vertices_below_mask,
+                                                                               vertices_distances)
+        except ValueError:
+            try:
+                from . import mmio
+                mmio.write_VTP('full_debug.vtp', self.source_mesh.vertices, self.source_mesh.faces)
+                mmio.write_VTP('crown_debug.vtp', crown_mesh.vertices, crown_mesh.faces)
+            except:
+                pass
+            raise
+
+        if len(edges) > 0:
+            intersections = self._plane.get_edges_intersections(vertices[edges[:, 0]], vertices[edges[:, 1]])
             vertices = np.concatenate((vertices, intersections))
-        
+
         clipped_crown_mesh = Mesh(vertices, crown_faces)
 
         # TODO: faire un merge uniquement sur la liste instersections et non sur tout le maillage clipped_crown
         # FIXME: potentiellement, un bug a ete introduit ici !!! --> l'update n'est plus bon sur les dictionnaires...
         new_id = clipped_crown_mesh.merge_duplicates(return_index=True, atol=1e-5)  # Warning: choosing a lower value
 
-        # Updating dictionaries
-        direct_boundary_edges = dict(
-            list(zip(new_id[list(direct_boundary_edges.keys())], new_id[list(direct_boundary_edges.values())])))
-        inv_boundary_edges = dict(list(zip(new_id[list(inv_boundary_edges.keys())], new_id[list(inv_boundary_edges.values())])))
+        # The upper part of the crown shares the vertices of the clipped crown mesh
+        upper_crown_faces = new_id[upper_crown_faces]
 
         # Ordering boundary edges in continuous lines
+        chained_vertices, offsets, closed = chain_edges(new_id[boundary_edges[:, 0]], new_id[boundary_edges[:, 1]],
+                                                        clipped_crown_mesh.nb_vertices)
         closed_polygons = list()
         open_lines = list()
-        while True:
+        for iline, is_closed in enumerate(closed):
+            line = chained_vertices[offsets[iline]:offsets[iline+1]].tolist()
+            if is_closed:
+                closed_polygons.append(line)
+            else:
+                open_lines.append(line)
+
+        if self._verbose:
+            print(("%u closed polygon\n%u open curve" % (len(closed_polygons), len(open_lines))))
+
+        if self._assert_closed_boundaries and len(open_lines) > 0:
             try:
-                line = list()
-                v0_init, v1 = direct_boundary_edges.popitem()
-                line.append(v0_init)
-                line.append(v1)
-                v0 = v1
-
-                while True:
-                    try:
-                        v1 = direct_boundary_edges.pop(v0)
-                        line.append(v1)
-                        v0 = v1
-                    except KeyError:
-                        if line[0] != line[-1]:
-                            # Trying to find an other queue
-                            queue = list()
-                            v0 = v0_init
-                            while True:
-                                try:
-                                    v1 = inv_boundary_edges[v0]
-                                    direct_boundary_edges.pop(v1)
-                                    queue.append(v1)
-                                    v0 = v1
-                                except:
-                                    queue.reverse()
-                                    line = queue + line
-                                    
-                                    # Trying to see if both end of line are not connected
-                                    pstart = clipped_crown_mesh.vertices[line[0]]
-                                    pend = clipped_crown_mesh.vertices[line[-1]]
-                                    
-                                    d = np.linalg.norm(pstart-pend)
-                                    print(d)
-                                    
-                                    open_lines.append(line)
-                                    break
-                        else:
-                            closed_polygons.append(line)
-                        break
-
-            except: # FIXME: specifier quelle exception est attendue ici !
-                # TODO: retirer les deux lines suivantes
-                if self._verbose:
-                    print(("%u closed polygon\n%u open curve" % (len(closed_polygons), len(open_lines))))
-
-                if self._assert_closed_boundaries:
-                    if len(open_lines) > 0:
-                        try:
-                            from . import mmio
-                            mmio.write_VTP('full_debug.vtp', self.source_mesh.vertices, self.source_mesh.faces)
-                            mmio.write_VTP('clipped_crown_debug.vtp', clipped_crown_mesh.vertices, clipped_crown_mesh.faces)
-                            mmio.write_VTP('crown_debug.vtp', crown_mesh.vertices, crown_mesh.faces)
-                        except:
-                            pass
-                        
-                        for line in open_lines:
-                            print(line)
-                            
-                        raise RuntimeError('Open intersection curve found with assert_closed_boundaries option enabled. Files full_debug.vtp, crown_debug.vtp and clipped_crown_debug.vtp written.')
+                from . import mmio
+                mmio.write_VTP('full_debug.vtp', self.source_mesh.vertices, self.source_mesh.faces)
+                mmio.write_VTP('clipped_crown_debug.vtp', clipped_crown_mesh.vertices, clipped_crown_mesh.faces)
+                mmio.write_VTP('crown_debug.vtp', crown_mesh.vertices, crown_mesh.faces)
+            except:
+                pass
 
-                break
+            for line in open_lines:
+                print(line)
+
+            raise RuntimeError('Open intersection curve found with assert_closed_boundaries option enabled. Files full_debug.vtp, crown_debug.vtp and clipped_crown_debug.vtp written.')
 
         output = {'clipped_crown_mesh': clipped_crown_mesh,
+                  'clipped_upper_crown_faces': upper_crown_faces,
                   'closed_polygons': closed_polygons,
                   'open_lines': open_lines}
 
@@ -748,7 +563,1218 @@ class MeshClipper(object):
         """Performs clipping and assemble the clipped mesh."""
         
         self._clip_crown_by_plane()
-        clipped_mesh = self.lower_mesh + self.clipped_crown_mesh
+        if self._integrals_only:
+            self._compute_clipped_integrals()
+        else:
+            self._assemble_clipped_mesh()
+        return
+
+    def _assemble_clipped_mesh(self):
+        """Assembles the clipped mesh from the lower mesh and the clipped crown mesh"""
+
+        clipped_mesh = Mesh.concatenate((self.lower_mesh, self.clipped_crown_mesh))
         clipped_mesh.name = '_'.join((self._source_mesh.name, 'clipped'))
         self.__internals__['clipped_mesh'] = clipped_mesh
-        return
+
+    def _compute_clipped_integrals(self):
+        """Sums the surface integrals of the faces of the source mesh that are below the plane and of the clipped
+        crown mesh, without assembling the clipped mesh."""
+
+        source_mesh = self._source_mesh
+        clipped_crown_mesh = self.clipped_crown_mesh
+        below_faces = source_mesh.faces[self.__internals__['below_faces_ids']]
+
+        area = 0.
+        integrals = np.zeros(15, dtype=np.float)
+        weighted_integrals = np.zeros((3, 15), dtype=np.float)
+        bbox_vertices = [np.zeros((0, 3), dtype=np.float)]
+
+        for vertices, faces in ((source_mesh.vertices, below_faces),
+                                (clipped_crown_mesh.vertices, clipped_crown_mesh.faces)):
+            if len(faces) == 0:
+                continue
+            quads = faces[:, 0] != faces[:, 3]
+            triangles = vertices[np.concatenate((faces[:, :3], faces[quads][:, (0, 2, 3)]))]
+
+            normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+            double_areas = np.linalg.norm(normals, axis=1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                normals /= double_areas[:, None]
+            normals[double_areas == 0.] = 0.
+
+            triangles_integrals = Mesh._compute_triangles_integrals(triangles)
+            area += 0.5 * double_areas.sum()
+            integrals += triangles_integrals.sum(axis=1)
+            weighted_integrals += np.dot(normals.T, triangles_integrals.T)
+            bbox_vertices.append(vertices[np.unique(faces)])
+
+        bbox_vertices = np.concatenate(bbox_vertices)
+        if len(bbox_vertices) > 0:
+            xmin, ymin, zmin = bbox_vertices.min(axis=0)
+            xmax, ymax, zmax = bbox_vertices.max(axis=0)
+            bbox = (xmin, xmax, ymin, ymax, zmin, zmax)
+        else:
+            bbox = (np.nan, ) * 6
+
+        self.__internals__['clipped_area'] = area
+        self.__internals__['clipped_surface_integrals'] = integrals
+        self.__internals__['clipped_weighted_surface_integrals'] = weighted_integrals
+        self.__internals__['clipped_axis_aligned_bbox'] = bbox
+
+
+class MultiPlaneClipper(object):
+    """A class to clip a mesh against several planes at once.
+
+    The clipped mesh is the part of the source mesh lying under every plane, that is inside the convex region defined
+    as the intersection of the half-spaces under the planes (a box for instance). Signed distances of the vertices with
+    respect to every plane are computed once and stored in a (nv x nplanes) array. Faces that are entirely inside or
+    outside the region are classified from this array while faces crossing the region boundary are clipped by a
+    Sutherland-Hodgman algorithm against the planes they cross, in a single pass over the faces.
+
+    Parameters
+    ----------
+    source_mesh : Mesh
+        The mesh to be clipped.
+    planes : list
+        The list of the clipping planes (Plane instances).
+    vicinity_tol : float, optional
+        The absolute tolerance to consider en vertex is on a plane. Default is 1e-3.
+    verbose : bool, optional
+        False by default. If True, some messages on operations that are handled are printed.
+
+    Note
+    ----
+    Vertices created on an edge are shared by the faces using this edge so that the clipped mesh remains conformal if
+    the source mesh is. Faces lying on one of the planes are removed, as done by MeshClipper.
+    """
+    def __init__(self, source_mesh, planes, vicinity_tol=1e-3, verbose=False):
+        self._source_mesh = source_mesh
+        self._planes = list(planes)
+
+        self._vicinity_tol = vicinity_tol
+        self._verbose = verbose
+
+        self.__internals__ = dict()
+
+        self._update()
+
+    @property
+    def verbose(self):
+        """Get the current verbosity"""
+
+        return self._verbose
+
+    def verbose_on(self):
+        """Switches ON the verbosity of the clipper."""
+
+        self._verbose = True
+
+    def verbose_off(self):
+        """Switches OFF the verbosity of the clipper."""
+
+        self._verbose = False
+
+    @property
+    def source_mesh(self):
+        """The mesh we work with"""
+
+        return self._source_mesh
+
+    @property
+    def planes(self):
+        """The clipping planes"""
+
+        return self._planes
+
+    @property
+    def nb_planes(self):
+        """The number of clipping planes"""
+
+        return len(self._planes)
+
+    @property
+    def vicinity_tol(self):
+        """Vicinity tolerance.
+
+        It tells if a point is close enough to a plane to consider it lies on the plane
+        """
+
+        return self._vicinity_tol
+
+    @property
+    def vertices_distances(self):
+        """The signed distances of the source mesh vertices with respect to every plane.
+
+        Distances smaller than the vicinity tolerance are set to zero.
+
+        Returns
+        -------
+        ndarray
+            (nv x nplanes) array
+        """
+
+        return self.__internals__['vertices_distances']
+
+    @property
+    def clipped_mesh(self):
+        """The resulting clipped mesh"""
+
+        return self.__internals__['clipped_mesh']
+
+    def _update(self):
+        """Updates the clipper"""
+
+        self._vertices_positions_wrt_planes()
+        self._clip()
+
+    def _vertices_positions_wrt_planes(self):
+        """Computes the signed distances of vertices with respect to the planes"""
+
+        normals = np.array([plane.normal for plane in self._planes], dtype=np.float).reshape((-1, 3))
+        scalars = np.array([plane.c for plane in self._planes], dtype=np.float)
+
+        vertices_distances = np.dot(self._source_mesh.vertices, normals.T) - scalars
+        vertices_distances[np.fabs(vertices_distances) < self._vicinity_tol] = 0.
+
+        self.__internals__['vertices_distances'] = vertices_distances
+
+    def _clip(self):
+        """Classifies the faces with respect to the region and clips those crossing its boundary"""
+
+        source_mesh = self._source_mesh
+        source_vertices = source_mesh.vertices
+        faces = source_mesh.faces
+        nv = source_mesh.nb_vertices
+
+        vertices_distances = self.__internals__['vertices_distances']
+        faces_distances = vertices_distances[faces]  # (nf x 4 x nplanes)
+
+        outside = np.any(faces_distances.min(axis=1) > 0., axis=1)
+        on_plane = np.any(np.fabs(faces_distances).max(axis=1) == 0., axis=1)
+        inside = np.all(faces_distances.max(axis=1) <= 0., axis=1)
+
+        kept_mask = np.logical_and(inside, np.logical_not(on_plane))
+        crossing_ids = np.where(np.logical_not(outside | inside | on_plane))[0]
+
+        # Vertices created on edges are indexed by the edge and the plane
+        new_vertices = list()
+        new_distances = list()
+        edges_vertices = dict()
+
+        def get_vertex(vertex_id):
+            if vertex_id < nv:
+                return source_vertices[vertex_id], vertices_distances[vertex_id]
+            else:
+                return new_vertices[vertex_id - nv], new_distances[vertex_id - nv]
+
+        def get_edge_vertex(v0, v1, iplane):
+            if v0 > v1:
+                v0, v1 = v1, v0
+            key = (v0, v1, iplane)
+            try:
+                return edges_vertices[key]
+            except KeyError:
+                p0, d0 = get_vertex(v0)
+                p1, d1 = get_vertex(v1)
+                t = d0[iplane] / (d0[iplane] - d1[iplane])
+                distances = d0 + t * (d1 - d0)
+                distances[np.fabs(distances) < self._vicinity_tol] = 0.
+                distances[iplane] = 0.
+                new_vertices.append(p0 + t * (p1 - p0))
+                new_distances.append(distances)
+                vertex_id = nv + len(new_vertices) - 1
+                edges_vertices[key] = vertex_id
+                return vertex_id
+
+        clipped_faces = list()
+        for face_id in crossing_ids:
+            polygon = list(source_mesh.get_face(face_id))
+
+            for iplane in range(self.nb_planes):
+                distances = [get_vertex(vertex_id)[1][iplane] for vertex_id in polygon]
+                if max(distances) <= 0.:
+                    continue
+
+                # Sutherland-Hodgman step against the current plane
+                clipped_polygon = list()
+                nb = len(polygon)
+                for i in range(nb):
+                    d0, d1 = distances[i], distances[(i+1) % nb]
+                    if d0 <= 0.:
+                        clipped_polygon.append(polygon[i])
+                    if d0 * d1 < 0.:
+                        clipped_polygon.append(get_edge_vertex(polygon[i], polygon[(i+1) % nb], iplane))
+                polygon = clipped_polygon
+
+                if len(polygon) < 3:
+                    break
+
+            # Polygons having more than 4 vertices are split into triangles
+            if len(polygon) == 3:
+                clipped_faces.append(polygon + polygon[:1])
+            elif len(polygon) == 4:
+                clipped_faces.append(polygon)
+            elif len(polygon) > 4:
+                for i in range(1, len(polygon) - 1):
+                    clipped_faces.append([polygon[0], polygon[i], polygon[i+1], polygon[0]])
+
+        if self._verbose:
+            print(("%u faces kept, %u faces clipped against %u planes" % (kept_mask.sum(), len(crossing_ids),
+                                                                          self.nb_planes)))
+
+        vertices = source_vertices
+        if new_vertices:
+            vertices = np.concatenate((vertices, new_vertices))
+        clipped_faces = np.array(clipped_faces, dtype=np.int).reshape((-1, 4))
+        faces = np.concatenate((faces[kept_mask], clipped_faces))
+
+        # Removing unused vertices
+        used = np.unique(faces)
+        new_id = np.zeros(len(vertices), dtype=np.int)
+        new_id[used] = np.arange(len(used))
+
+        clipped_mesh = Mesh(vertices[used], new_id[faces], name='_'.join((source_mesh.name, 'clipped')))
+        self.__internals__['clipped_mesh'] = clipped_mesh
+
+
+class WaveClipper(object):
+    """A class to clip a mesh by a free surface whose elevation is given by a function eta(x, y).
+
+    Vertices are classified with respect to the free surface by the sign of z - eta(x, y). Faces are split into
+    triangles and those crossing the free surface are clipped. Intersections of the free surface with the crossing
+    edges are found by an Illinois regula falsi performed at once on every crossing edge, each edge shared by two
+    triangles being intersected only once. The triangulation of the source mesh and the geometry of its triangles
+    (area normals and quadrature points) are computed once so that the free surface can be changed (e.g. for successive
+    phases of a wave) at a low cost. See AiryWaveClipper for a faster clipper dedicated to Airy waves.
+
+    Parameters
+    ----------
+    source_mesh : Mesh
+        The mesh to be clipped.
+    eta : callable
+        The free surface elevation function, called as eta(x, y) with arrays of coordinates. See
+        meshmagick.waves.AiryWave.get_eta for instance.
+    nb_iterations : int, optional
+        The maximum number of regula falsi iterations used to find edges intersections with the free surface. Default
+        is 20.
+    atol : float, optional
+        Absolute tolerance on z - eta(x, y) at edges intersections. Default is 1e-9.
+    verbose : bool, optional
+        False by default. If True, some messages on operations that are handled are printed.
+    """
+    def __init__(self, source_mesh, eta, nb_iterations=20, atol=1e-9, verbose=False):
+        self._source_mesh = source_mesh
+        self._eta = eta
+        self._nb_iterations = int(nb_iterations)
+        self._atol = float(atol)
+        self._verbose = verbose
+
+        vertices = source_mesh.vertices
+        faces = source_mesh.faces
+        quads = np.where(faces[:, 0] != faces[:, 3])[0]
+        triangles = np.concatenate((faces[:, :3], faces[quads][:, (0, 2, 3)]))
+        triangles_vertices = vertices[triangles]
+
+        # Edges of the triangles, edge k joining vertices k and k+1
+        origins = triangles.ravel()
+        targets = np.roll(triangles, -1, axis=1).ravel()
+        keys = np.minimum(origins, targets) * len(vertices) + np.maximum(origins, targets)
+        keys, triangles_edges = np.unique(keys, return_inverse=True)
+        edges = np.column_stack((keys // len(vertices), keys % len(vertices)))
+
+        quadrature_points, pressure_weights = _pressure_quadrature(triangles_vertices)
+
+        self.__internals__ = dict()
+        self.__internals__['triangles'] = triangles
+        self.__internals__['triangles_columns'] = np.ascontiguousarray(triangles.T)
+        self.__internals__['triangles_vertices'] = triangles_vertices
+        self.__internals__['triangles_faces_ids'] = np.concatenate((np.arange(source_mesh.nb_faces), quads))
+        self.__internals__['triangles_edges'] = triangles_edges.reshape((-1, 3))
+        self.__internals__['edges'] = edges
+        self.__internals__['triangles_areas'] = 3. * np.linalg.norm(pressure_weights[:, 0, :3], axis=1)
+        self.__internals__['quadrature_points'] = quadrature_points
+        self.__internals__['pressure_weights'] = pressure_weights
+
+        self._update()
+
+    @property
+    def verbose(self):
+        """Get the current verbosity"""
+
+        return self._verbose
+
+    def verbose_on(self):
+        """Switches ON the verbosity of the clipper."""
+
+        self._verbose = True
+
+    def verbose_off(self):
+        """Switches OFF the verbosity of the clipper."""
+
+        self._verbose = False
+
+    @property
+    def source_mesh(self):
+        """The mesh we work with"""
+
+        return self._source_mesh
+
+    @property
+    def eta(self):
+        """The free surface elevation function"""
+
+        return self._eta
+
+    @eta.setter
+    def eta(self, value):
+        """Changes the free surface elevation function."""
+
+        self._eta = value
+        self._update()
+
+    def _update(self):
+        """Updates the clipper"""
+
+        for key in ('wetted_mesh', 'wetted_triangles', 'wetted_faces_ids'):
+            if key in self.__internals__:
+                del self.__internals__[key]
+
+        vertices = self._source_mesh.vertices
+        vertices_elevations = self._get_vertices_elevations()
+        self.__internals__['vertices_elevations'] = vertices_elevations
+
+        below_ids, crossing_ids = self._classify_triangles(vertices_elevations)
+
+        # Only the edges of crossing triangles whose ends are on both sides of the free surface are intersected
+        triangles_edges = self.__internals__['triangles_edges'][crossing_ids]
+        edges_mask = np.zeros(len(self.__internals__['edges']), dtype=bool)
+        edges_mask[triangles_edges] = True
+        edges_ids = np.flatnonzero(edges_mask)
+        edges = self.__internals__['edges'][edges_ids]
+        d0, d1 = vertices_elevations[edges[:, 0]], vertices_elevations[edges[:, 1]]
+        crossing = (d0 < 0.) != (d1 < 0.)
+        edges_ids, edges, d0, d1 = edges_ids[crossing], edges[crossing], d0[crossing], d1[crossing]
+
+        edges_points = np.empty((len(self.__internals__['edges']), 3))
+        edges_points[edges_ids] = self._intersect_edges(vertices[edges[:, 0]], vertices[edges[:, 1]], d0, d1)
+
+        clipped_triangles, ids = clip_triangles(self.__internals__['triangles_vertices'][crossing_ids],
+                                                vertices_elevations[self.__internals__['triangles'][crossing_ids]],
+                                                triangles_edges=triangles_edges, edges_points=edges_points)
+
+        self.__internals__['below_ids'] = below_ids
+        self.__internals__['clipped_triangles'] = clipped_triangles
+        self.__internals__['clipped_ids'] = crossing_ids[ids]
+
+        if self._verbose:
+            print(("%u triangles under the free surface" % (len(below_ids) + len(clipped_triangles))))
+
+    def _get_vertices_elevations(self):
+        """Elevations z - eta(x, y) of the source mesh vertices"""
+
+        vertices = self._source_mesh.vertices
+        return vertices[:, 2] - self._eta(vertices[:, 0], vertices[:, 1])
+
+    def _classify_triangles(self, vertices_elevations):
+        """Ids of the triangles lying entirely under the free surface and of those crossing it"""
+
+        # Classification of the triangles from boolean gathers, cheaper than extrema of gathered elevations
+        t0, t1, t2 = self.__internals__['triangles_columns']
+        over = vertices_elevations > 0.
+        under = vertices_elevations < 0.
+        any_over = over[t0] | over[t1] | over[t2]
+        below_ids = np.where(np.logical_not(any_over))[0]
+        crossing_ids = np.where(any_over & (under[t0] | under[t1] | under[t2]))[0]
+        return below_ids, crossing_ids
+
+    def _intersect_edges(self, p0, p1, d0, d1):
+        """Finds the intersections of edges with the free surface by the Illinois variant of the regula falsi"""
+
+        # Iterations are performed on the abscissa s of the points p0 + s (p1 - p0) along the edges, starting from the
+        # end under the free surface
+        directions = p1 - p0
+        swap = d0 > 0.
+        s_lower = swap.astype(np.float)
+        s_upper = 1. - s_lower
+        f_lower = np.where(swap, d1, d0)
+        f_upper = np.where(swap, d0, d1)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = f_lower / (f_lower - f_upper)
+        t[np.logical_not(np.isfinite(t))] = 0.
+        abscissa = s_lower + t * (s_upper - s_lower)
+
+        # Only the edges whose intersection is not yet converged are updated
+        active = np.arange(len(abscissa))
+        side = np.zeros(len(abscissa), dtype=np.int8)
+        for _ in range(self._nb_iterations):
+            point = p0[active] + abscissa[active, None] * directions[active]
+            f_point = point[:, 2] - self._eta(point[:, 0], point[:, 1])
+            converged = np.fabs(f_point) <= self._atol
+            if np.all(converged):
+                break
+
+            not_converged = np.logical_not(converged)
+            active, f_point = active[not_converged], f_point[not_converged]
+            s_point = abscissa[active]
+            under = f_point < 0.
+
+            # The end point kept twice in a row has its value halved
+            lower_kept = np.logical_not(under)
+            f_lower[active] = np.where(under, f_point, np.where(side[active] == -1, 0.5, 1.) * f_lower[active])
+            f_upper[active] = np.where(lower_kept, f_point, np.where(side[active] == 1, 0.5, 1.) * f_upper[active])
+            s_lower[active] = np.where(under, s_point, s_lower[active])
+            s_upper[active] = np.where(lower_kept, s_point, s_upper[active])
+            side[active] = np.where(under, 1, -1)
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                t = f_lower[active] / (f_lower[active] - f_upper[active])
+            t[np.logical_not(np.isfinite(t))] = 0.
+            abscissa[active] = s_lower[active] + t * (s_upper[active] - s_lower[active])
+
+        return p0 + abscissa[:, None] * directions
+
+    @property
+    def vertices_elevations(self):
+        """The elevations z - eta(x, y) of the source mesh vertices with respect to the free surface
+
+        Returns
+        -------
+        ndarray
+        """
+
+        return self.__internals__['vertices_elevations']
+
+    @property
+    def wetted_triangles(self):
+        """The triangles of the wetted surface
+
+        Returns
+        -------
+        ndarray
+            (n x 3 x 3) array of the triangles vertices coordinates
+        """
+
+        if 'wetted_triangles' not in self.__internals__:
+            self.__internals__['wetted_triangles'] = np.concatenate((
+                self.__internals__['triangles_vertices'][self.__internals__['below_ids']],
+                self.__internals__['clipped_triangles']))
+        return self.__internals__['wetted_triangles']
+
+    @property
+    def wetted_faces_ids(self):
+        """The indices of the source mesh faces the wetted triangles come from
+
+        Returns
+        -------
+        ndarray
+        """
+
+        if 'wetted_faces_ids' not in self.__internals__:
+            self.__internals__['wetted_faces_ids'] = self.__internals__['triangles_faces_ids'][np.concatenate((
+                self.__internals__['below_ids'], self.__internals__['clipped_ids']))]
+        return self.__internals__['wetted_faces_ids']
+
+    @property
+    def wetted_area(self):
+        """The area of the wetted surface
+
+        Returns
+        -------
+        float
+        """
+
+        triangles = self.__internals__['clipped_triangles']
+        normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+        return (self.__internals__['triangles_areas'][self.__internals__['below_ids']].sum() +
+                0.5 * np.linalg.norm(normals, axis=1).sum())
+
+    @property
+    def wetted_mesh(self):
+        """The wetted part of the mesh, only made of triangles
+
+        Returns
+        -------
+        Mesh
+        """
+
+        if 'wetted_mesh' not in self.__internals__:
+            triangles = self.wetted_triangles
+            faces = np.arange(3 * len(triangles)).reshape((-1, 3))
+            wetted_mesh = Mesh(triangles.reshape((-1, 3)), np.column_stack((faces, faces[:, 0])),
+                               name='_'.join((self._source_mesh.name, 'wetted')))
+            wetted_mesh.merge_duplicates()
+            self.__internals__['wetted_mesh'] = wetted_mesh
+        return self.__internals__['wetted_mesh']
+
+    def get_pressure_force(self, pressure, reduction_point=(0., 0., 0.)):
+        """Integrates a pressure field over the wetted surface.
+
+        The pressure is evaluated at three points per triangle, the quadrature being exact for pressure fields that
+        are polynomials of degree 2. Quadrature points and weights of the triangles lying entirely under the free
+        surface are computed once by the clipper.
+
+        Parameters
+        ----------
+        pressure : callable
+            The pressure function, called as pressure(x, y, z) with arrays of coordinates. See
+            meshmagick.waves.AiryWave.get_pressure for instance.
+        reduction_point : array_like, optional
+            The point where the moment is expressed. Default is the origin.
+
+        Returns
+        -------
+        ndarray
+            The 6 components [Fx, Fy, Fz, Mx, My, Mz] of the pressure force -int(p n dS) and of its moment, n being the
+            outward normal of the mesh
+        """
+
+        # Triangles entirely under the free surface, moments being first expressed at the origin
+        below_ids = self.__internals__['below_ids']
+        points = self.__internals__['quadrature_points'][below_ids]
+        pressures = pressure(points[:, :, 0], points[:, :, 1], points[:, :, 2])
+        force = -np.dot(pressures.ravel(), self.__internals__['pressure_weights'][below_ids].reshape((-1, 6)))
+
+        # Clipped triangles
+        force += _integrate_pressure(self.__internals__['clipped_triangles'], pressure)
+
+        force[3:] -= np.cross(np.asarray(reduction_point, dtype=np.float), force[:3])
+        return force
+
+
+def _pressure_quadrature(triangles):
+    """Quadrature points and weights of the integration of pressure forces over triangles.
+
+    Quadrature points are at (2/3, 1/6, 1/6) barycentric coordinates, the rule being exact for polynomials of degree 2.
+
+    Parameters
+    ----------
+    triangles : ndarray
+        (n x 3 x 3) array of the triangles vertices coordinates
+
+    Returns
+    -------
+    points : ndarray
+        (n x 3 x 3) array of the quadrature points coordinates
+    weights : ndarray
+        (n x 3 x 6) array of the weights giving the force and its moment at the origin when multiplied by the pressure
+        at quadrature points
+    """
+    area_normals = 0.5 * np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    points = 0.5 * triangles + ((triangles[:, 0] + triangles[:, 1] + triangles[:, 2]) / 6.)[:, None, :]
+
+    # Cross products of the points with the area normals written by components, much faster than np.cross on
+    # broadcast arrays
+    nx, ny, nz = [area_normals[:, None, i] / 3. for i in range(3)]
+    x, y, z = points[:, :, 0], points[:, :, 1], points[:, :, 2]
+    weights = np.empty((len(triangles), 3, 6))
+    weights[:, :, 0] = nx
+    weights[:, :, 1] = ny
+    weights[:, :, 2] = nz
+    weights[:, :, 3] = y * nz - z * ny
+    weights[:, :, 4] = z * nx - x * nz
+    weights[:, :, 5] = x * ny - y * nx
+    return points, weights
+
+
+def _integrate_pressure(triangles, pressure):
+    """Integrates a pressure field over triangles with the quadrature of _pressure_quadrature.
+
+    Parameters
+    ----------
+    triangles : ndarray
+        (n x 3 x 3) array of the triangles vertices coordinates
+    pressure : callable
+        The pressure function, called as pressure(x, y, z) with arrays of coordinates
+
+    Returns
+    -------
+    ndarray
+        The 6 components [Fx, Fy, Fz, Mx, My, Mz] of the pressure force -int(p n dS) and of its moment at the origin
+    """
+    x0, x1, x2 = triangles[:, 0], triangles[:, 1], triangles[:, 2]
+    e1 = x1 - x0
+    e2 = x2 - x0
+    normals = np.empty((len(triangles), 3))
+    normals[:, 0] = e1[:, 1] * e2[:, 2] - e1[:, 2] * e2[:, 1]
+    normals[:, 1] = e1[:, 2] * e2[:, 0] - e1[:, 0] * e2[:, 2]
+    normals[:, 2] = e1[:, 0] * e2[:, 1] - e1[:, 1] * e2[:, 0]
+    points = 0.5 * triangles + ((x0 + x1 + x2) / 6.)[:, None, :]
+
+    # Pressures and pressure weighted points are summed over the quadrature points of every triangle before being
+    # multiplied by its area normal, the weights of the 3 points being a third of the area normal, i.e. normals / 6
+    pressures = pressure(points[:, :, 0], points[:, :, 1], points[:, :, 2])
+    pressures_sums = (pressures[:, 0] + pressures[:, 1] + pressures[:, 2]) / 6.
+    moments_arms = np.einsum('tq,tqj->tj', pressures, points) / 6.
+
+    force = np.empty(6)
+    force[:3] = -np.dot(pressures_sums, normals)
+    force[3] = np.dot(moments_arms[:, 2], normals[:, 1]) - np.dot(moments_arms[:, 1], normals[:, 2])
+    force[4] = np.dot(moments_arms[:, 0], normals[:, 2]) - np.dot(moments_arms[:, 2], normals[:, 0])
+    force[5] = np.dot(moments_arms[:, 1], normals[:, 0]) - np.dot(moments_arms[:, 0], normals[:, 1])
+    return force
+
+
+class AiryWaveClipper(WaveClipper):
+    """A WaveClipper whose free surface is that of an Airy wave field at a given time.
+
+    Wave fields are sums of regular components whose phases at a point are k.x + phi - omega t. The time independent
+    terms in k.x + phi are evaluated once at the source mesh vertices and at the quadrature points of its triangles so
+    that a new time only costs the cosines and sines of omega t, plus the evaluation of the wave at the points created
+    on the free surface. The pressure force over the triangles lying entirely under the free surface then reduces to a
+    sum of weights precomputed per triangle. These weights hold 6 * (2 * nb_components + 1) floats per triangle, which
+    is the memory cost of this clipper for wave fields with many components.
+
+    Parameters
+    ----------
+    source_mesh : Mesh
+        The mesh to be clipped.
+    wave : AiryWave
+        The wave field. See meshmagick.waves.AiryWave.
+    t : float, optional
+        Time (s). Default is 0.
+    nb_iterations : int, optional
+        The maximum number of regula falsi iterations used to find edges intersections with the free surface. Default
+        is 20.
+    atol : float, optional
+        Absolute tolerance on z - eta(x, y) at edges intersections. Default is 1e-9.
+    verbose : bool, optional
+        False by default. If True, some messages on operations that are handled are printed.
+    """
+    def __init__(self, source_mesh, wave, t=0., nb_iterations=20, atol=1e-9, verbose=False):
+        self._wave = wave
+        self._time = float(t)
+        super(AiryWaveClipper, self).__init__(source_mesh, wave.get_eta(self._time), nb_iterations=nb_iterations,
+                                              atol=atol, verbose=verbose)
+
+    @property
+    def wave(self):
+        """The wave field"""
+
+        return self._wave
+
+    @property
+    def eta(self):
+        """The free surface elevation function at the current time"""
+
+        return self._eta
+
+    @property
+    def time(self):
+        """Get the time (s)"""
+
+        return self._time
+
+    @time.setter
+    def time(self, value):
+        """Changes the time (s)"""
+
+        self._time = float(value)
+        self._eta = self._wave.get_eta(self._time)
+        self._update()
+
+    def _get_time_factors(self):
+        """Factors of the time independent terms of the wave field at the current time"""
+
+        omega_t = self._wave.omega * self._time
+        return np.concatenate((np.cos(omega_t), np.sin(omega_t)))
+
+    def _get_vertices_elevations(self):
+        """Elevations z - eta(x, y) of the source mesh vertices"""
+
+        vertices = self._source_mesh.vertices
+        if 'vertices_eta_terms' not in self.__internals__:
+            cos_terms, sin_terms = self._wave.get_eta_terms(vertices[:, 0], vertices[:, 1])
+            self.__internals__['vertices_eta_terms'] = np.concatenate((cos_terms, sin_terms), axis=1)
+        return vertices[:, 2] - np.dot(self.__internals__['vertices_eta_terms'], self._get_time_factors())
+
+    def _get_band(self):
+        """Splits the triangles into those that may cross the free surface, lying in the band swept by the free
+        surface, and those that always lie under it"""
+
+        if 'band_ids' not in self.__internals__:
+            # The free surface never goes beyond the sum of the amplitudes, slightly widened against round-off errors
+            bound = 1.000001 * np.sum(np.fabs(self._wave.amplitude))
+            z = self.__internals__['triangles_vertices'][:, :, 2]
+            always_below = z.max(axis=1) < -bound
+            band_ids = np.where(np.logical_not(always_below | (z.min(axis=1) > bound)))[0]
+            self.__internals__['band_ids'] = band_ids
+            self.__internals__['band_columns'] = np.ascontiguousarray(self.__internals__['triangles'][band_ids].T)
+            self.__internals__['always_below_ids'] = np.where(always_below)[0]
+        return self.__internals__['band_ids']
+
+    def _classify_triangles(self, vertices_elevations):
+        """Ids of the triangles lying entirely under the free surface and of those crossing it"""
+
+        # Only the triangles of the band are classified
+        band_ids = self._get_band()
+        t0, t1, t2 = self.__internals__['band_columns']
+        over = vertices_elevations > 0.
+        under = vertices_elevations < 0.
+        any_over = over[t0] | over[t1] | over[t2]
+        band_below_ids = np.where(np.logical_not(any_over))[0]
+        crossing_ids = band_ids[any_over & (under[t0] | under[t1] | under[t2])]
+
+        self.__internals__['band_below_ids'] = band_below_ids
+        return np.concatenate((self.__internals__['always_below_ids'], band_ids[band_below_ids])), crossing_ids
+
+    def _get_pressure_terms_weights(self):
+        """Weights giving the pressure force over the triangles from the time factors of the wave field, summed over
+        the triangles that always lie under the free surface and given for every triangle of the band"""
+
+        if 'band_pressure_terms_weights' not in self.__internals__:
+            points = self.__internals__['quadrature_points']
+            static_terms, cos_terms, sin_terms = self._wave.get_pressure_terms(points[:, :, 0], points[:, :, 1],
+                                                                               points[:, :, 2])
+            terms = np.concatenate((static_terms[:, :, None], cos_terms, sin_terms), axis=2)
+            weights = np.matmul(np.transpose(terms, (0, 2, 1)), self.__internals__['pressure_weights'])
+            weights = weights.reshape((len(points), -1))
+            self.__internals__['always_below_pressure_terms_weights'] = \
+                weights[self.__internals__['always_below_ids']].sum(axis=0)
+            self.__internals__['band_pressure_terms_weights'] = weights[self._get_band()]
+        return (self.__internals__['always_below_pressure_terms_weights'],
+                self.__internals__['band_pressure_terms_weights'])
+
+    def get_pressure_force(self, pressure=None, reduction_point=(0., 0., 0.)):
+        """Integrates a pressure field over the wetted surface.
+
+        Parameters
+        ----------
+        pressure : callable, optional
+            The pressure function, called as pressure(x, y, z) with arrays of coordinates. Default is the pressure of
+            the wave field at the current time, whose integral over the triangles lying entirely under the free surface
+            uses the weights precomputed by the clipper.
+        reduction_point : array_like, optional
+            The point where the moment is expressed. Default is the origin.
+
+        Returns
+        -------
+        ndarray
+            The 6 components [Fx, Fy, Fz, Mx, My, Mz] of the pressure force -int(p n dS) and of its moment, n being the
+            outward normal of the mesh
+        """
+
+        if pressure is not None:
+            return super(AiryWaveClipper, self).get_pressure_force(pressure, reduction_point=reduction_point)
+
+        # Triangles entirely under the free surface, moments being first expressed at the origin
+        always_below_weights, band_weights = self._get_pressure_terms_weights()
+        below = np.zeros(len(band_weights))
+        below[self.__internals__['band_below_ids']] = 1.
+        factors = np.concatenate(([1.], self._get_time_factors()))
+        force = -np.dot(factors, (always_below_weights + np.dot(below, band_weights)).reshape((-1, 6)))
+
+        # Clipped triangles
+        force += _integrate_pressure(self.__internals__['clipped_triangles'], self._wave.get_pressure(self._time))
+
+        force[3:] -= np.cross(np.asarray(reduction_point, dtype=np.float), force[:3])
+        return force
+
+
+class MeshSlicer(object):
+    """A class to slice a mesh by a set of parallel planes.
+
+    Faces are binned once by their extent along the planes normal and every face is only intersected with the planes
+    it spans. Intersection segments are then chained into polylines, giving the sections of the mesh along with their
+    areas and centroids.
+
+    Parameters
+    ----------
+    source_mesh : Mesh
+        The mesh to be sliced. It should be conformal (see Mesh.merge_duplicates) for sections to be closed.
+    scalars : array_like
+        The positions of the slicing planes along their normal. A plane is the set of points x such that
+        dot(normal, x) = scalar.
+    normal : array_like, optional
+        The normal of the slicing planes. Default is the x axis (1, 0, 0).
+
+    Note
+    ----
+    Vertices lying on a slicing plane are considered as being above it so that every intersection segment lies on a
+    face that actually crosses the plane.
+    """
+    def __init__(self, source_mesh, scalars, normal=(1., 0., 0.)):
+        self._source_mesh = source_mesh
+
+        normal = np.asarray(normal, dtype=np.float)
+        self._normal = normal / np.linalg.norm(normal)
+        self._scalars = np.asarray(scalars, dtype=np.float).ravel()
+
+        self.__internals__ = dict()
+
+        self._update()
+
+    @property
+    def source_mesh(self):
+        """The mesh we work with"""
+
+        return self._source_mesh
+
+    @property
+    def normal(self):
+        """The normal of the slicing planes"""
+
+        return self._normal
+
+    @property
+    def scalars(self):
+        """The positions of the slicing planes along their normal"""
+
+        return self._scalars
+
+    @property
+    def nb_stations(self):
+        """The number of slicing planes"""
+
+        return len(self._scalars)
+
+    def _update(self):
+        """Updates the slicer"""
+
+        self._intersect_faces()
+        self._chain_segments()
+        self._compute_sections_properties()
+
+    def _intersect_faces(self):
+        """Computes the intersection segments of every face with the planes it spans"""
+
+        vertices = self._source_mesh.vertices
+        faces = self._source_mesh.faces
+        nv = self._source_mesh.nb_vertices
+
+        quads = faces[:, 0] != faces[:, 3]
+        triangles = np.concatenate((faces[:, :3], faces[quads][:, (0, 2, 3)]))
+
+        positions = np.dot(vertices, self._normal)
+        triangles_positions = positions[triangles]
+
+        # Stations are sorted so that the planes spanned by a triangle are given by a range of indices
+        order = np.argsort(self._scalars)
+        scalars = self._scalars[order]
+        first = np.searchsorted(scalars, triangles_positions.min(axis=1), side='right')
+        last = np.searchsorted(scalars, triangles_positions.max(axis=1), side='right')
+        nb_stations = np.maximum(last - first, 0)
+
+        triangles_ids = np.repeat(np.arange(len(triangles)), nb_stations)
+        stations_ids = np.repeat(first - np.cumsum(nb_stations) + nb_stations, nb_stations) + \
+            np.arange(nb_stations.sum())
+
+        # Grouping segments by station
+        sort = np.argsort(stations_ids, kind='mergesort')
+        triangles_ids, stations_ids = triangles_ids[sort], stations_ids[sort]
+
+        triangles = triangles[triangles_ids]
+        distances = triangles_positions[triangles_ids] - scalars[stations_ids, None]
+        above = distances >= 0.
+        next_above = np.roll(above, -1, axis=1)
+
+        # Every crossing triangle has one edge going upward and one edge going downward with respect to the plane
+        rows = np.arange(len(triangles))
+        up_edges = np.argmax(np.logical_and(np.logical_not(above), next_above), axis=1)
+        down_edges = np.argmax(np.logical_and(above, np.logical_not(next_above)), axis=1)
+
+        def edges_intersections(edges):
+            # Edges are defined by their sorted vertices so that both faces sharing an edge give the same point
+            v0 = triangles[rows, edges]
+            v1 = triangles[rows, (edges + 1) % 3]
+            v0, v1 = np.minimum(v0, v1), np.maximum(v0, v1)
+            d0 = positions[v0] - scalars[stations_ids]
+            d1 = positions[v1] - scalars[stations_ids]
+            points = vertices[v0] + (vertices[v1] - vertices[v0]) * (d0 / (d0 - d1))[:, None]
+            keys = (stations_ids * nv + v0) * nv + v1
+            return points, keys
+
+        # Segments go from the downward edge to the upward one so that sections are counter-clockwise with respect to
+        # the planes normal
+        start_points, start_keys = edges_intersections(down_edges)
+        end_points, end_keys = edges_intersections(up_edges)
+
+        self.__internals__['sorted_stations'] = order
+        self.__internals__['segments_stations'] = stations_ids
+        self.__internals__['segments_points'] = (start_points, end_points)
+        self.__internals__['segments_keys'] = (start_keys, end_keys)
+
+    def _chain_segments(self):
+        """Chains the intersection segments into polylines"""
+
+        start_points, end_points = self.__internals__['segments_points']
+        start_keys, end_keys = self.__internals__['segments_keys']
+        stations_ids = self.__internals__['segments_stations']
+        nb_segments = len(start_keys)
+
+        # The segment following a segment starts on the edge where the latter ends
+        sorted_starts = np.argsort(start_keys)
+        next_ids = np.searchsorted(start_keys[sorted_starts], end_keys)
+        next_ids = np.minimum(next_ids, max(nb_segments - 1, 0))
+        successors = np.full(nb_segments, -1, dtype=np.int)
+        if nb_segments > 0:
+            found = start_keys[sorted_starts[next_ids]] == end_keys
+            successors[found] = sorted_starts[next_ids[found]]
+
+        has_predecessor = np.zeros(nb_segments, dtype=bool)
+        has_predecessor[successors[successors >= 0]] = True
+
+        # Open lines are walked from their first segment before closed polygons
+        starts = np.concatenate((np.where(np.logical_not(has_predecessor))[0], np.arange(nb_segments)))
+        successors = successors.tolist()
+        visited = np.zeros(nb_segments, dtype=bool)
+
+        polylines = []
+        closed = []
+        for start in starts.tolist():
+            if visited[start]:
+                continue
+            polyline = []
+            segment = start
+            while segment != -1 and not visited[segment]:
+                visited[segment] = True
+                polyline.append(segment)
+                segment = successors[segment]
+            polylines.append(polyline)
+            closed.append(segment == start)
+
+        # Polylines are sorted by station, each one being described by the starting points of its segments and by the
+        # end point of its last segment (the first point is then repeated for closed polylines)
+        polylines_stations = np.array([stations_ids[polyline[0]] for polyline in polylines], dtype=np.int)
+        order = np.argsort(polylines_stations, kind='mergesort')
+        polylines = [polylines[i] for i in order]
+
+        nb_points = np.array([len(polyline) + 1 for polyline in polylines], dtype=np.int)
+        offsets = np.zeros(len(polylines) + 1, dtype=np.int)
+        np.cumsum(nb_points, out=offsets[1:])
+
+        points = np.zeros((offsets[-1], 3), dtype=np.float)
+        if polylines:
+            segments = np.concatenate(polylines)
+            last_point = offsets[1:] - 1
+            points[np.delete(np.arange(offsets[-1]), last_point)] = start_points[segments]
+            points[last_point] = end_points[[polyline[-1] for polyline in polylines]]
+
+        # Back to the stations order given by the user
+        self.__internals__['polylines_vertices'] = points
+        self.__internals__['polylines_offsets'] = offsets
+        self.__internals__['polylines_stations'] = self.__internals__['sorted_stations'][polylines_stations[order]]
+        self.__internals__['polylines_closed'] = np.array(closed, dtype=bool)[order]
+
+    def _compute_sections_properties(self):
+        """Computes the areas and centroids of the sections delimited by the closed polylines"""
+
+        points = self.__internals__['polylines_vertices']
+        offsets = self.__internals__['polylines_offsets']
+        stations = np.repeat(self.__internals__['polylines_stations'], np.diff(offsets))
+        closed = np.repeat(self.__internals__['polylines_closed'], np.diff(offsets))
+
+        # Triangle fans from the origin of the planes, discarding open lines and the last point of polylines
+        valid = np.ones(len(points), dtype=bool)
+        valid[offsets[1:] - 1] = False
+        valid &= closed
+        ids = np.where(valid)[0]
+
+        origins = self._scalars[stations[ids], None] * self._normal
+        p0 = points[ids] - origins
+        p1 = points[ids + 1] - origins
+        areas = 0.5 * np.dot(np.cross(p0, p1), self._normal)
+        moments = areas[:, None] * (p0 + p1) / 3.
+
+        nb_stations = self.nb_stations
+        sections_areas = np.bincount(stations[ids], weights=areas, minlength=nb_stations).astype(np.float)
+        sections_centers = np.zeros((nb_stations, 3), dtype=np.float)
+        for i in range(3):
+            sections_centers[:, i] = np.bincount(stations[ids], weights=moments[:, i], minlength=nb_stations)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sections_centers /= sections_areas[:, None]
+        sections_centers += self._scalars[:, None] * self._normal
+
+        self.__internals__['sections_areas'] = sections_areas
+        self.__internals__['sections_centers'] = sections_centers
+
+    @property
+    def polylines_vertices(self):
+        """The vertices of the sections polylines, concatenated in a (n x 3) array.
+
+        Polylines are sorted by station. The first point of closed polylines is repeated at their end.
+
+        Returns
+        -------
+        ndarray
+        """
+
+        return self.__internals__['polylines_vertices']
+
+    @property
+    def polylines_offsets(self):
+        """The offsets of the polylines in polylines_vertices.
+
+        The vertices of polyline i are polylines_vertices[polylines_offsets[i]:polylines_offsets[i+1]].
+
+        Returns
+        -------
+        ndarray
+        """
+
+        return self.__internals__['polylines_offsets']
+
+    @property
+    def polylines_stations(self):
+        """The index of the slicing plane of every polyline
+
+        Returns
+        -------
+        ndarray
+        """
+
+        return self.__internals__['polylines_stations']
+
+    @property
+    def polylines_closed(self):
+        """Tells, for every polyline, whether it is closed or not.
+
+        Returns
+        -------
+        ndarray
+        """
+
+        return self.__internals__['polylines_closed']
+
+    @property
+    def nb_polylines(self):
+        """The number of polylines over every station"""
+
+        return len(self.__internals__['polylines_closed'])
+
+    def get_polylines(self, station):
+        """Get the polylines of the section at a given station.
+
+        Parameters
+        ----------
+        station : int
+            The index of the slicing plane
+
+        Returns
+        -------
+        list
+            List of (n x 3) arrays of polylines vertices coordinates
+        """
+        offsets = self.__internals__['polylines_offsets']
+        points = self.__internals__['polylines_vertices']
+        return [points[offsets[i]:offsets[i+1]] for i in np.where(self.polylines_stations == station)[0]]
+
+    @property
+    def sections_areas(self):
+        """The areas of the sections, that are enclosed by closed polylines.
+
+        Areas are signed with respect to the planes normal and are positive for a closed mesh whose normals are
+        pointing outward.
+
+        Returns
+        -------
+        ndarray
+        """
+
+        return self.__internals__['sections_areas']
+
+    @property
+    def sections_centers(self):
+        """The centroids of the sections.
+
+        Returns
+        -------
+        ndarray
+            (n x 3) array of the sections centroids. They are NaN for stations having no closed section.
+        """
+
+        return self.__internals__['sections_centers']
+
+
+def clip_triangles(triangles, distances, intersect=None, triangles_edges=None, edges_points=None):
+    """Clips triangles by a plane and keeps their parts that are below the plane.
+
+    Triangles crossing the plane are cut along the intersection segment. Depending on the number of their vertices
+    lying under the plane, their lower part is a triangle or a quadrangle that is split into two triangles. Every
+    operation is vectorized over the triangles so that it can be used on large sets of faces.
+
+    Parameters
+    ----------
+    triangles : ndarray
+        (n x 3 x 3) array of the triangles vertices coordinates
+    distances : ndarray
+        (n x 3) array of the signed distances of the triangles vertices with respect to the clipping plane. Negative
+        distances are those of the vertices lying under the plane.
+    intersect : callable, optional
+        Function computing the intersections of the clipping surface with the edges crossing it, called as
+        intersect(p0, p1, d0, d1) where p0 and p1 are (m x 3) arrays of the edges end points and d0 and d1 their
+        signed distances. It allows to clip by a surface that is not a plane. Default is the linear interpolation
+        that is exact for a plane.
+    triangles_edges : ndarray, optional
+        (n x 3) array of the ids of the triangles edges, edge k joining vertices k and k+1. Used with edges_points.
+    edges_points : ndarray, optional
+        Array of the intersections of the clipping surface with the edges crossing it, indexed by edges ids. When
+        given with triangles_edges, intersections are looked up instead of being computed so that an edge shared by
+        two triangles gives the same point for both of them.
+
+    Returns
+    -------
+    clipped_triangles : ndarray
+        (m x 3 x 3) array of the vertices coordinates of the triangles lying under the plane. Their orientation is
+        that of the triangles they come from.
+    ids : ndarray
+        (m,) array giving the index of the triangle each clipped triangle comes from.
+    """
+    triangles = np.asarray(triangles, dtype=np.float)
+    distances = np.asarray(distances, dtype=np.float)
+
+    # Element-wise extrema are much faster than reductions along the short axis
+    max_distances = np.maximum(np.maximum(distances[:, 0], distances[:, 1]), distances[:, 2])
+    min_distances = np.minimum(np.minimum(distances[:, 0], distances[:, 1]), distances[:, 2])
+    below = max_distances <= 0.
+    crossing = np.logical_and(min_distances < 0., max_distances > 0.)
+
+    crossing_ids = np.where(crossing)[0]
+    tri = triangles[crossing_ids]
+    dist = distances[crossing_ids]
+
+    # Rolling vertices so that the first one is alone on its side of the plane, written with element-wise operations
+    # on the columns that are much faster than reductions and fancy indexing along the short axis
+    u0, u1, u2 = dist[:, 0] < 0., dist[:, 1] < 0., dist[:, 2] < 0.
+    lone = np.where(u1 == u2, 0, np.where(u0 == u2, 1, 2))
+    one_under = np.where(lone == 0, u0, np.where(lone == 1, u1, u2))
+    first = 3 * np.arange(len(crossing_ids)) + lone
+    second = 3 * np.arange(len(crossing_ids)) + (lone + 1) % 3
+    third = 3 * np.arange(len(crossing_ids)) + (lone + 2) % 3
+    tri = tri.reshape((-1, 3))
+    p0, p1, p2 = tri[first], tri[second], tri[third]
+
+    # Intersections of the plane with the two edges starting from the lone vertex
+    if edges_points is not None:
+        edges = triangles_edges[crossing_ids].ravel()
+        p01 = edges_points[edges[first]]
+        p02 = edges_points[edges[third]]
+    else:
+        dist = dist.ravel()
+        d0, d1, d2 = dist[first], dist[second], dist[third]
+        if intersect is None:
+            p01 = p0 + (p1 - p0) * (d0 / (d0 - d1))[:, None]
+            p02 = p0 + (p2 - p0) * (d0 / (d0 - d2))[:, None]
+        else:
+            p01, p02 = np.split(intersect(np.concatenate((p0, p0)), np.concatenate((p1, p2)),
+                                          np.concatenate((d0, d0)), np.concatenate((d1, d2))), 2)
+
+    below_ids = np.where(below)[0]
+    one_ids = np.where(one_under)[0]
+    two_ids = np.where(np.logical_not(one_under))[0]
+    nb_below, nb_one, nb_two = len(below_ids), len(one_ids), len(two_ids)
+
+    clipped_triangles = np.empty((nb_below + nb_one + 2 * nb_two, 3, 3))
+    clipped_triangles[:nb_below] = triangles[below_ids]
+    lower_triangles = clipped_triangles[nb_below:nb_below + nb_one]
+    lower_triangles[:, 0], lower_triangles[:, 1], lower_triangles[:, 2] = p0[one_ids], p01[one_ids], p02[one_ids]
+    p01 = p01[two_ids]
+    lower_triangles = clipped_triangles[nb_below + nb_one:nb_below + nb_one + nb_two]
+    lower_triangles[:, 0], lower_triangles[:, 1], lower_triangles[:, 2] = p01, p1[two_ids], p2[two_ids]
+    lower_triangles = clipped_triangles[nb_below + nb_one + nb_two:]
+    lower_triangles[:, 0], lower_triangles[:, 1], lower_triangles[:, 2] = p01, p2[two_ids], p02[two_ids]
+
+    ids = np.concatenate((below_ids, crossing_ids[one_ids], crossing_ids[two_ids], crossing_ids[two_ids]))
+
+    return clipped_triangles, ids
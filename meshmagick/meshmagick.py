@@ -32,7 +32,7 @@ from time import strftime
 
 from .mesh import *
 from . import mmio
-from .mesh_clipper import MeshClipper
+from .mesh_clipper import MeshClipper, MultiPlaneClipper, MeshSlicer
 from . import hydrostatics as hs
 import argparse
 from . import densities
@@ -426,6 +426,18 @@ parser.add_argument('-ofmt', '--output-format',
                     the OUTPUT_FORMAT rather than using the extension
                     """)
 
+parser.add_argument('--use-symmetry', action='store_true',
+                    help="""Detect symmetries of the mesh with respect to Oxz and Oyz planes and write only the
+                    symmetric part of the mesh with the corresponding symmetry flags. Available for mar, gdf and hst
+                    output formats.
+                    """)
+
+parser.add_argument('--split', action='store_true',
+                    help="""Split the mesh into its connected components (e.g. the bodies of a multi-body mesh) and
+                    write each of them in a separate file whose name is that of the output file suffixed by the
+                    component number. If no output file is given, the input file name and format are used.
+                    """)
+
 parser.add_argument('-q', '--quiet',
                     help="""switch of verbosity of meshmagick""",
                     action='store_true')
@@ -438,6 +450,10 @@ parser.add_argument('--quality',
                     help="""prints mesh quality""",
                     action='store_true')
 
+parser.add_argument('--self-intersections',
+                    help="""checks if the mesh intersects itself and prints the intersecting faces""",
+                    action='store_true')
+
 parser.add_argument('-t', '--translate', metavar=('Tx', 'Ty', 'Tz'),
                     nargs=3, type=float,
                     help="""translates the mesh in 3D
@@ -546,6 +562,11 @@ parser.add_argument('-tq', '--triangulate-quadrangles', action='store_true',
                     aspect ratios is kept. This option may be used in conjunction with a
                     mesh export in a format that only deal with triangular cells like STL format.""")
 
+parser.add_argument('--decimate', type=int, metavar='NB_FACES',
+                    help="""Decimates the mesh down to NB_FACES triangles by edge collapses driven by quadric error
+                    metrics. Boundaries and the waterline (intersection with plane z=0) are preserved. Deviations of
+                    the volume and of the waterplane area with respect to the original mesh are reported.""")
+
 parser.add_argument('-sym', '--symmetrize', nargs='*', action='append', metavar='Arg',
                     help="""Symmetrize the mesh by a plane defined wether by 4 scalars, i.e.
                     the plane normal vector coordinates and a scalar c such as N.X=c is the
@@ -630,6 +651,16 @@ parser.add_argument('-g', '--grav', default=9.81, type=float, metavar='G',
                     Default is 9.81 m/s**2.
                     """)
 
+parser.add_argument('--hs-proxy', type=int, metavar='NB_FACES',
+                    help="""Searches the hydrostatic equilibrium on a decimated proxy of the mesh having NB_FACES faces
+                    before finishing computations on the full mesh. It speeds up equilibrium computations on fine
+                    meshes.""")
+
+parser.add_argument('--hs-cache', type=str, metavar='DIRECTORY',
+                    help="""Stores hydrostatic equilibrium computations in DIRECTORY and reuses them when the same
+                    mesh is equilibrated again with the same mass, gravity center and forces. When only these inputs
+                    changed, the last equilibrium position found for the mesh is used as initial condition.""")
+
 # parser.add_argument('--hs_solver_params', nargs='+')
 
 parser.add_argument('-af', '--absolute-force', nargs=6, action='append',
@@ -664,6 +695,37 @@ parser.add_argument('-rf', '--relative-force', nargs=6, action='append', type=fl
 parser.add_argument('--hs-report', type=str, metavar='filename',
                     help="""Write the hydrostatic report into the file given as an argument""")
 
+parser.add_argument('--curves-of-form', type=str, metavar='CSV',
+                    help="""Computes the hydrostatic curves of form (displacement, buoyancy and flotation centers,
+                    waterplane area, metacentric radii...) of the mesh in its current position for draughts measured
+                    from its lowest point, and writes them into the CSV file given as an argument. The water density
+                    is given by the --rho-water option.""")
+
+parser.add_argument('--nb-draughts', type=int, default=50, metavar='N',
+                    help="""The number of draughts, evenly distributed up to the mesh height, at which the curves of
+                    form are computed. Default is 50.""")
+
+parser.add_argument('--cross-curves', type=str, metavar='CSV',
+                    help="""Computes the cross curves of stability (KN) of the mesh in its current position, taken as
+                    the upright one, with free trim, and writes them into the CSV file given as an argument. There is
+                    one line per displacement and one column per heel angle.""")
+
+parser.add_argument('--cc-heels', nargs='+', type=float, metavar='HEEL',
+                    help="""The heel angles (deg) of the cross curves of stability. Default is every 10 degrees from 0
+                    to 90 degrees.""")
+
+parser.add_argument('--cc-displacements', nargs='+', type=float, metavar='DISP',
+                    help="""The displacements (tons) of the cross curves of stability. Default is 10 displacements
+                    evenly distributed up to 90 percents of the mesh maximal displacement.""")
+
+parser.add_argument('--sections', type=str, metavar='CSV',
+                    help="""Slices the mesh by planes orthogonal to the x axis and writes the areas and centroids of the
+                    sections into the CSV file given as an argument. Stations are evenly distributed between the mesh
+                    extremities along x.""")
+
+parser.add_argument('--nb-stations', type=int, default=50, metavar='N',
+                    help="""The number of stations used by the --sections option. Default is 50.""")
+
 # ARGUMENTS RELATED TO THE COMPUTATION OF INERTIA PARAMETERS
 # parser.add_argument('--rho-medium', default=7500., type=float,
 #                     help="""Specified the density of the medium used for the device. Default
@@ -1018,6 +1080,31 @@ def main():
     if args.triangulate_quadrangles:
         mesh.triangulate_quadrangles()
 
+    if args.decimate is not None:
+        if verbose:
+            print('\nOPERATION: Decimating the mesh')
+
+        def get_volume_and_waterplane_area(mesh_):
+            try:
+                waterplane_area = hs.Hydrostatics(mesh_).flotation_surface_area
+            except RuntimeError:
+                waterplane_area = np.nan
+            return mesh_.volume, waterplane_area
+
+        volume_init, waterplane_area_init = get_volume_and_waterplane_area(mesh)
+        mesh.decimate(target_faces=args.decimate)
+        volume, waterplane_area = get_volume_and_waterplane_area(mesh)
+
+        print(('\t-> Number of faces             : %u' % mesh.nb_faces))
+        print(('\t-> Volume deviation            : %.3E (%.3f%%)' % (
+            volume - volume_init, 100 * (volume - volume_init) / volume_init)))
+        if np.isnan(waterplane_area_init) or waterplane_area_init == 0.:
+            print('\t-> Waterplane area deviation   : not available (mesh not closed or not crossing z=0)')
+        else:
+            print(('\t-> Waterplane area deviation   : %.3E (%.3f%%)' % (
+                waterplane_area - waterplane_area_init,
+                100 * (waterplane_area - waterplane_area_init) / waterplane_area_init)))
+
     # Clipping the mesh
     if args.clip_by_plane is not None:
         nb_clip = len(args.clip_by_plane)
@@ -1032,6 +1119,7 @@ def main():
                 verb = 'planes'
             print(('\nMesh is being clipped by %u %s' % (nb_clip, verb)))
 
+        clipping_planes = []
         for plane in args.clip_by_plane:
             clipping_plane = Plane()
             if len(plane) == 1:
@@ -1063,13 +1151,30 @@ def main():
 
             if verbose:
                 print(('\t%s' % clipping_plane))
+            clipping_planes.append(clipping_plane)
 
-            clipper = MeshClipper(mesh, plane=clipping_plane)
-            mesh = clipper.clipped_mesh
+        # Several planes are handled in a single pass
+        if nb_clip == 1:
+            clipper = MeshClipper(mesh, plane=clipping_planes[0])
+        else:
+            clipper = MultiPlaneClipper(mesh, clipping_planes)
+        mesh = clipper.clipped_mesh
 
         if verbose:
             print('\t-> Done.')
 
+    # Checking self intersections
+    if args.self_intersections:
+        if verbose:
+            print('\nOPERATION: Checking self intersections')
+        intersecting_faces = mesh.get_self_intersections()
+        if len(intersecting_faces) == 0:
+            print('\t-> The mesh does not intersect itself')
+        else:
+            print(('\t-> %u pairs of faces intersect each other:' % len(intersecting_faces)))
+            for face_a, face_b in intersecting_faces:
+                print(('\t\t%u - %u' % (face_a, face_b)))
+
     # Listing available medium
     if args.list_medium:
         col_width = 22
@@ -1131,6 +1236,51 @@ def main():
             point = inertia.reduction_point
             print(("\tExpressed at point : \t\t%.3E\t%.3E\t%.3E" % (point[0], point[1], point[2])))
 
+    if args.curves_of_form is not None:
+        if verbose:
+            print(('\nComputing curves of form for %u draughts' % args.nb_draughts))
+        curves = hs.get_curves_of_form(mesh, nb_draughts=args.nb_draughts, rho_water=args.rho_water)
+        keys = list(curves.keys())
+        np.savetxt(args.curves_of_form, np.column_stack([curves[key] for key in keys]), fmt='%.6e', delimiter=',',
+                   header=','.join(keys), comments='')
+        if verbose:
+            print(('\t-> Curves of form written in %s' % args.curves_of_form))
+
+    if args.cross_curves is not None:
+        if args.cc_heels is not None:
+            heels = np.asarray(args.cc_heels, dtype=np.float)
+        else:
+            heels = np.arange(0., 91., 10.)
+
+        if args.cc_displacements is not None:
+            displacements = np.asarray(args.cc_displacements, dtype=np.float)
+        else:
+            max_displacement = args.rho_water * mesh.volume / 1000.
+            displacements = np.linspace(0., 0.9 * max_displacement, 11)[1:]
+
+        if verbose:
+            print(('\nComputing cross curves of stability for %u heel angles and %u displacements'
+                   % (len(heels), len(displacements))))
+        cross_curves = hs.get_cross_curves(mesh, displacements, np.radians(heels), rho_water=args.rho_water)
+        header = ','.join(['displacement'] + ['kn_%g' % heel for heel in heels])
+        np.savetxt(args.cross_curves, np.column_stack((displacements, cross_curves['kn'].T)), fmt='%.6e',
+                   delimiter=',', header=header, comments='')
+        if verbose:
+            print(('\t-> Cross curves written in %s' % args.cross_curves))
+
+    if args.sections is not None:
+        if verbose:
+            print(('\nSlicing the mesh at %u stations along x' % args.nb_stations))
+        xmin, xmax = mesh.axis_aligned_bbox[:2]
+        stations = np.linspace(xmin, xmax, args.nb_stations + 2)[1:-1]
+        slicer = MeshSlicer(mesh, stations, normal=(1., 0., 0.))
+        np.savetxt(args.sections, np.column_stack((stations, slicer.sections_areas, slicer.sections_centers)),
+                   fmt='%.6e', delimiter=',', header='x,area,xc,yc,zc', comments='')
+        if verbose:
+            if not np.all(slicer.polylines_closed):
+                print('\t-> WARNING: some sections are not closed, the mesh may not be watertight')
+            print(('\t-> Sections written in %s' % args.sections))
+
     additional_forces = []
     if args.relative_force is not None:
         for item in args.relative_force:
@@ -1146,7 +1296,12 @@ def main():
         grav = args.grav
         rho_water = args.rho_water
 
-        hs_solver = hs.Hydrostatics(mesh, rho_water=rho_water, grav=grav, verbose=verbose)
+        if args.hs_cache is not None:
+            cache = hs.EquilibriumCache(args.hs_cache)
+        else:
+            cache = None
+
+        hs_solver = hs.Hydrostatics(mesh, rho_water=rho_water, grav=grav, verbose=verbose, cache=cache)
 
         for force in additional_forces:
             hs_solver.add_force(force)
@@ -1199,7 +1354,7 @@ def main():
 
             hs_solver.gravity_center = cog
             hs_solver.mass = disp
-            hs_solver.equilibrate(init_disp=False)
+            hs_solver.equilibrate(init_disp=False, proxy_faces=args.hs_proxy)
             warn(msg)
 
         if case == (False, False, True) or case == (False, False, False):
@@ -1215,7 +1370,7 @@ def main():
                       % (disp, cog[0], cog[1], cog[2])))
             hs_solver.gravity_center = cog
             hs_solver.mass = disp
-            hs_solver.equilibrate(init_disp=True)
+            hs_solver.equilibrate(init_disp=True, proxy_faces=args.hs_proxy)
             warn(msg)
 
         # TODO: voir pour une option pour sortir plutot le maillage coupe pour Nemoh
@@ -1253,6 +1408,9 @@ def main():
         if args.output_format is not None:
             write_file = True
             args.outfilename = '%s.%s' % (base, args.output_format)
+        elif args.split:
+            write_file = True
+            args.outfilename = args.infilename
     else:
         write_file = True
 
@@ -1273,9 +1431,20 @@ def main():
             else:
                 format = os.path.splitext(args.outfilename)[1][1:].lower()
 
-        if verbose:
-            print(('Writing %s' % args.outfilename))
-        mmio.write_mesh(args.outfilename, mesh.vertices, mesh.faces, format)
+        if args.split:
+            base, ext = os.path.splitext(args.outfilename)
+            bodies = mesh.split()
+            if verbose:
+                print(('Mesh split into %u components' % len(bodies)))
+            for (ibody, body) in enumerate(bodies):
+                outfilename = '%s_%u%s' % (base, ibody+1, ext)
+                if verbose:
+                    print(('Writing %s' % outfilename))
+                mmio.write_mesh(outfilename, body.vertices, body.faces, format, use_symmetry=args.use_symmetry)
+        else:
+            if verbose:
+                print(('Writing %s' % args.outfilename))
+            mmio.write_mesh(args.outfilename, mesh.vertices, mesh.faces, format, use_symmetry=args.use_symmetry)
         if verbose:
             print('\t-> Done.')
 
@@ -1039,7 +1039,7 @@ def load_NEM(filename):
 #=======================================================================
 # Contains here all functions to write meshes in different file formats
 
-def write_mesh(filename, vertices, faces, file_format):
+def write_mesh(filename, vertices, faces, file_format, use_symmetry=False):
     """Driver function that writes every mesh file file_format known by meshmagick
 
     Parameters
@@ -1052,6 +1052,9 @@ def write_mesh(filename, vertices, faces, file_format):
         numpy array of the faces' nodes connectivities
     file_format: str
         file_format of the mesh defined in the extension_dict dictionary
+    use_symmetry: bool, optional
+        If True, symmetries of the mesh are detected and only the symmetric half of the mesh is written with the
+        corresponding symmetry flags. Only available for formats listed in symmetric_formats. Default is False.
 
     """
 
@@ -1060,7 +1063,35 @@ def write_mesh(filename, vertices, faces, file_format):
 
     writer = extension_dict[file_format][1]
 
-    writer(filename, vertices, faces)
+    if use_symmetry:
+        if file_format not in symmetric_formats:
+            raise IOError('Format "%s" does not handle symmetries' % file_format)
+        writer(filename, vertices, faces, use_symmetry=True)
+    else:
+        writer(filename, vertices, faces)
+
+
+def _symmetric_half(vertices, faces, axes=(1, 0)):
+    """Reduces a mesh by its symmetries with respect to Oxz (axis 1) and Oyz (axis 0) planes.
+
+    Returns
+    -------
+    vertices: ndarray
+        numpy array of the coordinates of the reduced mesh's nodes
+    faces: ndarray
+        numpy array of the reduced mesh faces' nodes connectivities
+    symmetries: dict
+        Dictionary telling for every axis if the mesh has been reduced by the corresponding symmetry
+    """
+    from .tools import get_symmetric_half
+
+    symmetries = dict()
+    for axis in axes:
+        half = get_symmetric_half(vertices, faces, axis=axis)
+        symmetries[axis] = half is not None
+        if half is not None:
+            vertices, faces = half
+    return vertices, faces, symmetries
 
 
 def write_DAT(filename, vertices, faces):
@@ -1154,7 +1185,7 @@ def write_DAT(filename, vertices, faces):
     ofile.close()
 
 
-def write_HST(filename, vertices, faces):
+def write_HST(filename, vertices, faces, use_symmetry=False):
     """Writes .HST file format for the HYDROSTAR (Bureau Veritas (c)) software.
 
     Parameters
@@ -1165,9 +1196,22 @@ def write_HST(filename, vertices, faces):
         numpy array of the coordinates of the mesh's nodes
     faces: ndarray
         numpy array of the faces' nodes connectivities
+    use_symmetry: bool, optional
+        If True, only the half (y >= 0) or the quarter (x >= 0, y >= 0) of the mesh is written when it is symmetric with
+        respect to Oxz or to both Oxz and Oyz planes. Default is False.
     """
     # TODO: allow many bodies
 
+    symmetry = 0
+    if use_symmetry:
+        # Hydrostar symmetry with respect to Oyz is only available together with that with respect to Oxz
+        vertices, faces, symmetries = _symmetric_half(vertices, faces, axes=(1,))
+        if symmetries[1]:
+            symmetry = 1
+            vertices, faces, symmetries = _symmetric_half(vertices, faces, axes=(0,))
+            if symmetries[0]:
+                symmetry = 2
+
     ofile = open(filename, 'w')
 
     ofile.write(''.join((
@@ -1178,6 +1222,9 @@ def write_HST(filename, vertices, faces):
         'GRAVITY   9.81\n\n'
     )))
 
+    if symmetry > 0:
+        ofile.write('SYMMETRY   %u\n\n' % symmetry)
+
     coordinates_block = ''.join((  # block
             'COORDINATES\n',
             '\n'.join(  # line
@@ -1523,7 +1570,7 @@ def write_NEM(filename, vertices, faces):
     ofile.close()
     
     
-def write_GDF(filename, vertices, faces):
+def write_GDF(filename, vertices, faces, use_symmetry=False):
     """Writes .gdf file format for the WAMIT (Wamit INC. (c)) BEM software.
 
     Parameters
@@ -1534,8 +1581,16 @@ def write_GDF(filename, vertices, faces):
         numpy array of the coordinates of the mesh's nodes
     faces: ndarray
         numpy array of the faces' nodes connectivities
+    use_symmetry: bool, optional
+        If True, only the part of the mesh lying in x >= 0 and/or y >= 0 is written when it is symmetric with respect to
+        Oyz and/or Oxz planes, ISX and ISY flags being set accordingly. Default is False.
     """
 
+    isx, isy = 0, 0
+    if use_symmetry:
+        vertices, faces, symmetries = _symmetric_half(vertices, faces)
+        isx, isy = int(symmetries[0]), int(symmetries[1])
+
     nf = max(np.shape(faces))
 
     ofile = open(filename, 'w')
@@ -1543,7 +1598,7 @@ def write_GDF(filename, vertices, faces):
     ofile.write('GDF file generated by meshmagick on %s\n' % time.strftime('%c'))
 
     ofile.write('%16.6f%16.6f\n' % (100.0, 9.81))
-    ofile.write('%12u%12u\n' % (0, 1))  # TODO : mettre les symetries en argument
+    ofile.write('%12u%12u\n' % (isx, isy))
     ofile.write('%12u\n' % nf)
 
     for cell in faces:
@@ -1554,7 +1609,7 @@ def write_GDF(filename, vertices, faces):
     ofile.close()
 
 
-def write_MAR(filename, vertices, faces):
+def write_MAR(filename, vertices, faces, use_symmetry=False):
     """Writes mesh files to be used with Nemoh BEM software (Ecole Centrale de Nantes)
 
     Parameters
@@ -1565,13 +1620,19 @@ def write_MAR(filename, vertices, faces):
         numpy array of the coordinates of the mesh's nodes
     faces: ndarray
         numpy array of the faces' nodes connectivities
+    use_symmetry: bool, optional
+        If True, only the half of the mesh lying in y >= 0 is written when it is symmetric with respect to Oxz plane,
+        and the symmetry flag is set accordingly. Default is False.
     """
 
-    # TODO: detect symmetry in Oxz plane
+    isym = 0
+    if use_symmetry:
+        vertices, faces, symmetries = _symmetric_half(vertices, faces, axes=(1,))
+        isym = int(symmetries[1])
 
     ofile = open(filename, 'w')
 
-    ofile.write('{0:6d}{1:6d}\n'.format(2, 0))  # TODO : mettre les symetries en argument
+    ofile.write('{0:6d}{1:6d}\n'.format(2, isym))
 
     for (idx, vertex) in enumerate(vertices):
         ofile.write('{0:6d}{1:16.6f}{2:16.6f}{3:16.6f}\n'.format(idx+1, vertex[0], vertex[1], vertex[2]))
@@ -1587,8 +1648,9 @@ def write_MAR(filename, vertices, faces):
 
     ofile.close()
 
-    print('WARNING: if you described only one part of the mesh using symmetry for Nemoh, you may manually modify the ' \
-          'file header accordingly')
+    if not use_symmetry:
+        print('WARNING: if you described only one part of the mesh using symmetry for Nemoh, you may manually modify '
+              'the file header accordingly')
 
 
 def write_RAD(filename, vertices, faces):
@@ -1706,3 +1768,6 @@ extension_dict = {  # keyword,  reader,   writer
     'nemoh_mesh': (load_NEM, write_NEM),
     'obj': (load_OBJ, write_OBJ)
 }
+
+# Formats whose writers can reduce the mesh by its symmetries
+symmetric_formats = ('mar', 'nemoh', 'wamit', 'gdf', 'hydrostar', 'hst')
@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+#  -*- coding: utf-8 -*-
+"""This module computes quality measures of the faces of a mesh.
+
+Every measure is evaluated for all the faces at once with NumPy operations and returned as a per-face array so that it
+can be used programmatically (e.g. to select badly shaped faces) or summarized by Mesh.print_quality. Definitions
+follow the verdict library manual (http://www.vtk.org/Wiki/images/6/6b/VerdictManual-revA.pdf) where they exist.
+"""
+
+import numpy as np
+
+from .tools import get_faces_neighbors
+
+__author__ = "Francois Rongere"
+__copyright__ = "Copyright 2014-2015, Ecole Centrale de Nantes"
+__credits__ = "Francois Rongere"
+__licence__ = "CeCILL"
+__maintainer__ = "Francois Rongere"
+__email__ = "Francois.Rongere@ec-nantes.fr"
+__status__ = "Development"
+
+
+# Quality measures with their description
+QUALITY_MEASURES = (
+    ('area', 'Area'),
+    ('area_ratio', 'Area Ratio with neighbors'),
+    ('edge_ratio', 'Edge Ratio'),
+    ('aspect_ratio', 'Aspect Ratio'),
+    ('min_angle', 'Minimal Angle (deg)'),
+    ('max_angle', 'Maximal Angle (deg)'),
+    ('skewness', 'Equiangle Skewness'),
+    ('warpage', 'Warpage'),
+    ('planarity', 'Planarity'),
+)
+
+
+def _norm(vectors):
+    return np.sqrt(np.einsum('...i, ...i -> ...', vectors, vectors))
+
+
+def _polygons_quality(points):
+    """Computes the quality measures of polygons having the same number of vertices.
+
+    Parameters
+    ----------
+    points : ndarray
+        (n x k x 3) array of the polygons vertices, k being 3 or 4
+
+    Returns
+    -------
+    dict
+        The per-polygon measures, except area_ratio
+    """
+    nb_vertices = points.shape[1]
+    edges = np.roll(points, -1, axis=1) - points
+    lengths = _norm(edges)
+
+    if nb_vertices == 3:
+        vector_area = np.cross(edges[:, 0], -edges[:, 2])
+    else:
+        vector_area = np.cross(points[:, 2] - points[:, 0], points[:, 3] - points[:, 1])
+    area = 0.5 * _norm(vector_area)
+
+    # Angles between the two edges at every vertex
+    previous_edges = -np.roll(edges, 1, axis=1)
+    cosines = np.einsum('ijk, ijk -> ij', edges, previous_edges) / (lengths * np.roll(lengths, 1, axis=1))
+    angles = np.degrees(np.arccos(np.clip(cosines, -1., 1.)))
+    min_angle = angles.min(axis=1)
+    max_angle = angles.max(axis=1)
+    equiangle = 180. * (nb_vertices - 2) / nb_vertices
+
+    quality = dict()
+    quality['area'] = area
+    quality['edge_ratio'] = lengths.max(axis=1) / lengths.min(axis=1)
+    quality['min_angle'] = min_angle
+    quality['max_angle'] = max_angle
+    quality['skewness'] = np.maximum((max_angle - equiangle) / (180. - equiangle), (equiangle - min_angle) / equiangle)
+
+    if nb_vertices == 3:
+        quality['aspect_ratio'] = lengths.max(axis=1) * lengths.sum(axis=1) / (4. * np.sqrt(3.) * area)
+        quality['warpage'] = np.zeros(len(points))
+        quality['planarity'] = np.zeros(len(points))
+    else:
+        quality['aspect_ratio'] = lengths.max(axis=1) * lengths.sum(axis=1) / (4. * area)
+
+        # Normals at corners, opposite corners normals being compared
+        corners_normals = np.cross(edges, previous_edges)
+        corners_normals /= _norm(corners_normals)[:, :, None]
+        cos_min = np.minimum(np.einsum('ij, ij -> i', corners_normals[:, 0], corners_normals[:, 2]),
+                             np.einsum('ij, ij -> i', corners_normals[:, 1], corners_normals[:, 3]))
+        quality['warpage'] = 1. - np.clip(cos_min, -1., 1.)**3
+
+        # Distance of the vertices to the mean plane relative to the mean edge length
+        normals = vector_area / (2. * area)[:, None]
+        distances = np.einsum('ijk, ik -> ij', points - points.mean(axis=1)[:, None], normals)
+        quality['planarity'] = np.fabs(distances).max(axis=1) / lengths.mean(axis=1)
+
+    return quality
+
+
+def _neighbors_area_ratios(faces, areas):
+    """Computes the maximal ratio between the area of each face and those of its neighbors sharing an edge"""
+    face_1, face_2 = get_faces_neighbors(faces)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = np.maximum(areas[face_1], areas[face_2]) / np.minimum(areas[face_1], areas[face_2])
+
+    area_ratio = np.ones(len(faces))
+    np.maximum.at(area_ratio, face_1, ratios)
+    np.maximum.at(area_ratio, face_2, ratios)
+    return area_ratio
+
+
+def get_faces_quality(vertices, faces):
+    """Computes the quality measures of every face of a mesh.
+
+    Parameters
+    ----------
+    vertices : array_like
+        (nv x 3) array of the vertices coordinates
+    faces : array_like
+        (nf x 4) array of the faces vertices ids, triangles repeating their first vertex
+
+    Returns
+    -------
+    dict
+        Dictionary giving a (nf,) array for every measure listed in QUALITY_MEASURES:
+
+        * area : the face area
+        * area_ratio : the maximal ratio between the face area and those of its neighbors sharing an edge
+        * edge_ratio : the ratio between the longest and the shortest edge
+        * aspect_ratio : the verdict aspect ratio, 1 for equilateral triangles and squares
+        * min_angle, max_angle : the extreme angles between consecutive edges (deg)
+        * skewness : the equiangle skewness, 0 for equilateral triangles and rectangles and 1 for degenerated faces
+        * warpage : one minus the cube of the minimal cosine between the normals at opposite corners of quadrangles,
+          0 for planar quadrangles and triangles
+        * planarity : the maximal distance of quadrangles vertices to their mean plane relative to the mean edge
+          length, 0 for planar quadrangles and triangles
+
+    Note
+    ----
+    Degenerated faces give infinite or nan values.
+    """
+    vertices = np.asarray(vertices, dtype=np.float)
+    faces = np.asarray(faces, dtype=np.int)
+    nb_faces = len(faces)
+
+    quality = dict([(name, np.zeros(nb_faces, dtype=np.float)) for name, _ in QUALITY_MEASURES])
+
+    triangles_mask = faces[:, 0] == faces[:, -1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for mask, nb_vertices in ((triangles_mask, 3), (~triangles_mask, 4)):
+            if np.any(mask):
+                polygons_quality = _polygons_quality(vertices[faces[mask, :nb_vertices]])
+                for name, values in polygons_quality.items():
+                    quality[name][mask] = values
+
+    quality['area_ratio'] = _neighbors_area_ratios(faces, quality['area'])
+
+    return quality
+
+
+def get_quality_histograms(quality, bins=10):
+    """Computes histograms of quality measures.
+
+    Parameters
+    ----------
+    quality : dict
+        Per-face measures as returned by get_faces_quality
+    bins : int or array_like, optional
+        The bins given to numpy.histogram. Default is 10.
+
+    Returns
+    -------
+    dict
+        Dictionary giving the tuple (counts, bin_edges) for every measure, non finite values being discarded
+    """
+    histograms = dict()
+    for name, values in quality.items():
+        values = values[np.isfinite(values)]
+        histograms[name] = np.histogram(values, bins=bins)
+    return histograms
+
+
+def format_quality_report(quality, triangles_mask, bins=10):
+    """Formats a summary of the quality measures of triangles and quadrangles.
+
+    Parameters
+    ----------
+    quality : dict
+        Per-face measures as returned by get_faces_quality
+    triangles_mask : ndarray
+        (nf,) boolean array telling which faces are triangles
+    bins : int, optional
+        Number of bins of the histograms. Default is 10.
+
+    Returns
+    -------
+    str
+    """
+    report = ''
+    for mask, face_type in ((triangles_mask, 'Triangle'), (~triangles_mask, 'Quadrilateral')):
+        nb_faces = np.count_nonzero(mask)
+        if nb_faces == 0:
+            continue
+        report += '\n%s quality of the mesh (%u elements):\n' % (face_type, nb_faces)
+
+        histograms = get_quality_histograms(dict([(name, values[mask]) for name, values in quality.items()]),
+                                            bins=bins)
+        for name, label in QUALITY_MEASURES:
+            if face_type == 'Triangle' and name in ('warpage', 'planarity'):
+                continue
+            values = quality[name][mask]
+            values = values[np.isfinite(values)]
+            if len(values) == 0:
+                continue
+            counts, bin_edges = histograms[name]
+            report += '\n %s:\n' % label
+            report += '    range: %g  -  %g\n' % (values.min(), values.max())
+            report += '    average: %g  , standard deviation: %g\n' % (values.mean(), values.std())
+            report += '    histogram: %s\n' % ' '.join(['%u' % count for count in counts])
+
+    return report
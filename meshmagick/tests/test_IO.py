@@ -3,6 +3,8 @@
 
 from meshmagick.mmio import *
 import os
+import numpy as np
+from math import fabs
 
 
 def test_all_io():
@@ -22,3 +24,39 @@ def test_all_io():
                 pass
     
     os.remove('meshfile')
+
+
+def test_symmetric_writers(tmpdir):
+    from meshmagick.mesh import Mesh
+
+    vertices, faces = load_VTP('meshmagick/tests/data/Cylinder.vtp')
+    cylinder = Mesh(vertices, faces)
+    cylinder.merge_duplicates()
+
+    # The cylinder is symmetric with respect to both Oxz and Oyz planes
+    half = cylinder.get_symmetric_half(axis=1)
+    assert half.nb_faces == cylinder.nb_faces // 2
+    assert half.vertices[:, 1].min() > -1e-6
+    assert fabs(2 * half.volume - cylinder.volume) < 1e-8 * cylinder.volume
+
+    # A translated cylinder is not symmetric anymore
+    assert Mesh(cylinder.vertices + [0., 0.1, 0.], cylinder.faces).get_symmetric_half(axis=1) is None
+
+    # Two triangles that are mirrors of each other but cross the plane
+    vertices = np.array([[0., -1., 0.], [1., 2., 0.], [0., 1., 0.], [1., -2., 0.]])
+    crossing = Mesh(vertices, [[0, 1, 2, 0], [2, 3, 0, 2]])
+    assert crossing.get_symmetric_half(axis=1) is None
+
+    filename = str(tmpdir.join('cylinder.gdf'))
+    write_mesh(filename, cylinder.vertices, cylinder.faces, 'gdf', use_symmetry=True)
+    with open(filename) as gdf_file:
+        gdf_file.readline()
+        gdf_file.readline()
+        assert gdf_file.readline().split() == ['1', '1']
+    assert load_GDF(filename)[1].shape[0] == cylinder.nb_faces // 4
+
+    filename = str(tmpdir.join('cylinder.mar'))
+    write_mesh(filename, cylinder.vertices, cylinder.faces, 'mar', use_symmetry=True)
+    with open(filename) as mar_file:
+        assert mar_file.readline().split() == ['2', '1']
+    assert load_MAR(filename)[1].shape[0] == cylinder.nb_faces // 2
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+#  -*- coding: utf-8 -*-
+"""Performance benchmarks of meshmagick.
+
+They are slow and depend on the machine, so they only run when the MESHMAGICK_BENCHMARKS environment variable is set:
+
+    MESHMAGICK_BENCHMARKS=1 python -m pytest -s meshmagick/tests/test_benchmarks.py
+"""
+
+import os
+import time
+
+import numpy as np
+import pytest
+
+from meshmagick.mmio import load_VTP
+from meshmagick.mesh import Mesh
+
+benchmark = pytest.mark.skipif(not os.environ.get('MESHMAGICK_BENCHMARKS'),
+                               reason='benchmarks run only when MESHMAGICK_BENCHMARKS is set')
+
+
+def best_time(func, nb_runs=5):
+    times = list()
+    for _ in range(nb_runs):
+        tstart = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - tstart)
+    return min(times)
+
+
+def shuffled_copies(mesh, nb_copies, seed=0):
+    """Builds a large mesh from translated copies of a mesh whose vertices and faces are randomly shuffled"""
+    nv = mesh.nb_vertices
+    nb_columns = int(np.ceil(np.sqrt(nb_copies)))
+    span = mesh.vertices.max(axis=0) - mesh.vertices.min(axis=0)
+    vertices = np.concatenate([mesh.vertices + [1.5 * span[0] * (icopy % nb_columns),
+                                                1.5 * span[1] * (icopy // nb_columns), 0.]
+                               for icopy in range(nb_copies)])
+    faces = np.concatenate([mesh.faces + icopy * nv for icopy in range(nb_copies)])
+
+    random_state = np.random.RandomState(seed)
+    vertices_order = random_state.permutation(len(vertices))
+    new_id = np.empty_like(vertices_order)
+    new_id[vertices_order] = np.arange(len(vertices))
+    return Mesh(vertices[vertices_order], new_id[faces][random_state.permutation(len(faces))])
+
+
+@benchmark
+def test_reorder_speedup():
+    vertices, faces = load_VTP('meshmagick/tests/data/SEAREV.vtp')
+    searev = Mesh(vertices, faces)
+    searev.merge_duplicates()
+    shuffled = shuffled_copies(searev, 100)
+
+    def kernels_times(mesh):
+        properties_time = best_time(lambda: Mesh(mesh.vertices, mesh.faces)._faces_properties())
+        integrals_time = best_time(lambda: Mesh(mesh.vertices, mesh.faces).get_surface_integrals())
+        return properties_time, integrals_time
+
+    reference_times = kernels_times(shuffled)
+    print('\n%u faces, shuffled: faces properties %.3f s, surface integrals %.3f s'
+          % ((shuffled.nb_faces,) + reference_times))
+
+    for method in ('morton', 'rcm'):
+        mesh = shuffled.copy()
+        reorder_time = best_time(lambda: mesh.copy().reorder(method), nb_runs=1)
+        mesh.reorder(method)
+        properties_time, integrals_time = kernels_times(mesh)
+        print('%s (reordering in %.3f s): faces properties %.3f s, surface integrals %.3f s'
+              % (method, reorder_time, properties_time, integrals_time))
+
+        # The gain is mainly on the faces properties, surface integrals being dominated by arithmetic
+        assert properties_time < 0.9 * reference_times[0]
+
+
+@benchmark
+def test_wave_clipper_throughput():
+    import meshmagick.mesh_clipper as mc
+    from meshmagick.waves import AiryWave
+
+    vertices, faces = load_VTP('meshmagick/tests/data/SEAREV.vtp')
+    searev = Mesh(vertices, faces)
+    searev.merge_duplicates()
+    three_hulls = Mesh.concatenate([Mesh(searev.vertices + [40. * icopy, 0., 0.], searev.faces)
+                                    for icopy in range(3)], merge=False)
+
+    wave = AiryWave(1., 8., direction=0.3)
+    times = np.linspace(0., 8., 100)
+
+    throughputs = list()
+    for mesh in (searev, three_hulls):
+        clipper = mc.AiryWaveClipper(mesh, wave)
+
+        def phases():
+            for t in times:
+                clipper.time = t
+                clipper.get_pressure_force()
+
+        throughputs.append(len(times) / best_time(phases, nb_runs=3))
+        print('\n%u faces: %.0f wave phases per second' % (mesh.nb_faces, throughputs[-1]))
+
+    # Hundreds of phases per second on a hull of about 50k panels
+    assert three_hulls.nb_faces > 45000
+    assert throughputs[-1] > 200.
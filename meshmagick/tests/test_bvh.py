@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+#  -*- coding: utf-8 -*-
+
+import numpy as np
+
+import meshmagick.mmio as mmio
+from meshmagick.mesh import Mesh, Plane
+from meshmagick.bvh import FacesBVH, _closest_points_on_triangles
+import meshmagick.mesh_clipper as mc
+
+vertices, faces = mmio.load_VTP('meshmagick/tests/data/SEAREV.vtp')
+searev = Mesh(vertices, faces)
+searev.merge_duplicates()
+
+
+def _brute_force_closest_points(mesh, points):
+    faces = mesh.faces
+    quads = np.where(faces[:, 0] != faces[:, 3])[0]
+    triangles = np.concatenate((faces[:, (0, 1, 2)], faces[quads][:, (0, 2, 3)]))
+    p0, p1, p2 = np.rollaxis(mesh.vertices[triangles], 1, 0)
+
+    distances = np.zeros(len(points))
+    for i, point in enumerate(points):
+        closest = _closest_points_on_triangles(np.tile(point, (len(triangles), 1)), p0, p1, p2)
+        distances[i] = np.linalg.norm(closest - point, axis=1).min()
+    return distances
+
+
+def test_plane_query():
+    bvh = FacesBVH(searev.vertices, searev.faces, leaf_size=4)
+    rng = np.random.RandomState(0)
+    for normal in rng.randn(10, 3):
+        normal /= np.linalg.norm(normal)
+        scalar = rng.rand() * 5. - 2.5
+        distances = np.dot(searev.vertices[searev.faces], normal) - scalar
+        expected = np.where((distances.min(axis=1) <= 1e-3) & (distances.max(axis=1) >= -1e-3))[0]
+        assert np.array_equal(bvh.get_faces_near_plane(normal, scalar, tol=1e-3), expected)
+
+
+def test_closest_points():
+    rng = np.random.RandomState(1)
+    points = rng.rand(20, 3) * 30. - 15.
+    distances, closest, faces_ids = searev.bvh.get_closest_points(points)
+    assert np.allclose(distances, _brute_force_closest_points(searev, points))
+    assert np.allclose(np.linalg.norm(closest - points, axis=1), distances)
+    assert np.all(faces_ids >= 0)
+
+
+def test_rays_and_inside():
+    # Rays cast from far away toward the origin must hit the mesh
+    rng = np.random.RandomState(2)
+    directions = rng.randn(20, 3)
+    origins = -50. * directions / np.linalg.norm(directions, axis=1)[:, None]
+    params, points, faces_ids = searev.bvh.get_ray_intersections(origins, directions)
+    assert np.all(np.isfinite(params))
+    assert np.all(faces_ids >= 0)
+    assert np.allclose(searev.bvh.get_closest_points(points)[0], 0., atol=1e-8)
+
+    # Rays going away do not hit it
+    params, _, faces_ids = searev.bvh.get_ray_intersections(origins, -directions)
+    assert np.all(np.isinf(params))
+    assert np.all(faces_ids == -1)
+
+    points = np.array([[0., 0., 0.], [100., 0., 0.], [0., 0., -100.]])
+    assert np.array_equal(searev.bvh.are_points_inside(points), [True, False, False])
+    signed_distances = searev.bvh.get_signed_distances(points)
+    assert signed_distances[0] < 0. < signed_distances[1]
+
+
+def test_bvh_cache_and_clipper():
+    mesh = searev.copy()
+    reference = mc.MeshClipper(mesh, Plane(), assert_closed_boundaries=True)
+
+    bvh = mesh.bvh
+    assert mesh.bvh is bvh
+    clipper = mc.MeshClipper(mesh, Plane(), assert_closed_boundaries=True)
+    assert np.array_equal(clipper.__internals__['crown_faces_ids'], reference.__internals__['crown_faces_ids'])
+    assert np.array_equal(clipper.__internals__['below_faces_ids'], reference.__internals__['below_faces_ids'])
+    assert np.array_equal(clipper.__internals__['above_faces_ids'], reference.__internals__['above_faces_ids'])
+    assert np.isclose(clipper.clipped_mesh.volume, reference.clipped_mesh.volume)
+
+    mesh.translate_z(1.)
+    assert mesh.bvh is not bvh
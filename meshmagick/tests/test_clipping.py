@@ -3,10 +3,12 @@
 
 import numpy as np
 import math
+import pytest
 
 import meshmagick.mmio as mmio
 from meshmagick.mesh import Mesh, Plane
 import meshmagick.mesh_clipper as mc
+from meshmagick.waves import AiryWave, solve_dispersion_relation
 
 
 def test_clipper():
@@ -20,3 +22,161 @@ def test_clipper():
         thetax, thetay = np.random.rand(2)*2*math.pi
         plane.rotate_normal(thetax, thetay)
         clipper.plane = plane
+
+
+def test_slicer():
+    vertices, faces = mmio.load_VTP('meshmagick/tests/data/SEAREV.vtp')
+    searev = Mesh(vertices, faces)
+    searev.merge_duplicates()
+
+    stations = np.linspace(-4.5, 4.5, 10)
+    slicer = mc.MeshSlicer(searev, stations, normal=(1., 0., 0.))
+    assert np.all(slicer.polylines_closed)
+    assert np.all(slicer.sections_areas > 0.)
+    assert np.allclose(slicer.sections_centers[:, 0], stations)
+
+    # Same sections with opposite planes normals
+    flipped = mc.MeshSlicer(searev, -stations, normal=(-1., 0., 0.))
+    assert np.allclose(flipped.sections_areas, slicer.sections_areas)
+
+    # Comparison with the intersection polygons of the clipper
+    clipper = mc.MeshClipper(searev, Plane(normal=[1., 0., 0.], scalar=stations[3]))
+    area = 0.
+    for polygon in clipper.closed_polygons_vertices:
+        y, z = polygon[:, 1], polygon[:, 2]
+        area += 0.5 * np.sum(y[:-1] * z[1:] - y[1:] * z[:-1])
+    assert math.fabs(math.fabs(area) - slicer.sections_areas[3]) < 1e-6 * slicer.sections_areas[3]
+
+    polylines = slicer.get_polylines(3)
+    assert len(polylines) == len(clipper.closed_polygons)
+    assert np.allclose(polylines[0][0], polylines[0][-1])
+
+
+def test_clipper_integrals_only():
+    vertices, faces = mmio.load_VTP('meshmagick/tests/data/SEAREV.vtp')
+    searev = Mesh(vertices, faces)
+    searev.rotate([0.1, 0.2, 0.])
+
+    clipper = mc.MeshClipper(searev, integrals_only=True)
+    assert 'clipped_mesh' not in clipper.__internals__
+
+    # The clipped mesh is built on demand
+    clipped_mesh = clipper.clipped_mesh
+    assert math.fabs(clipper.clipped_area - clipped_mesh.faces_areas.sum()) < 1e-8 * clipper.clipped_area
+    used_vertices = clipped_mesh.vertices[np.unique(clipped_mesh.faces)]
+    assert np.allclose(clipper.clipped_axis_aligned_bbox[::2], used_vertices.min(axis=0))
+    assert np.allclose(clipper.clipped_axis_aligned_bbox[1::2], used_vertices.max(axis=0))
+
+    inertia = clipper.eval_clipped_plain_inertias()
+    reference = clipped_mesh.eval_plain_mesh_inertias()
+    assert math.fabs(inertia.mass - reference.mass) < 1e-8 * reference.mass
+    assert np.allclose(inertia.gravity_center, reference.gravity_center)
+    assert np.allclose(inertia.inertia_matrix, reference.inertia_matrix)
+
+
+def test_clipper_two_sided():
+    vertices, faces = mmio.load_VTP('meshmagick/tests/data/SEAREV.vtp')
+    searev = Mesh(vertices, faces)
+    searev.merge_duplicates()
+
+    plane = Plane()
+    for scalar in (0., 0.3, -1.):
+        plane.rotate_normal(0.2, 0.1)
+        plane.c = scalar
+        clipper = mc.MeshClipper(searev, plane)
+        lower_mesh = clipper.clipped_mesh
+        upper_mesh = clipper.clipped_upper_mesh
+
+        # Both sides share the same intersection polygons whose contributions cancel out
+        area = lower_mesh.faces_areas.sum() + upper_mesh.faces_areas.sum()
+        assert math.fabs(area - searev.faces_areas.sum()) < 1e-8 * area
+        assert math.fabs(lower_mesh.volume + upper_mesh.volume - searev.volume) < 1e-8 * searev.volume
+        assert np.array_equal(clipper.clipped_upper_crown_mesh.vertices, clipper.clipped_crown_mesh.vertices)
+
+
+def test_multi_plane_clipper():
+    vertices, faces = mmio.load_VTP('meshmagick/tests/data/SEAREV.vtp')
+    searev = Mesh(vertices, faces)
+    searev.merge_duplicates()
+
+    planes = [Plane(), Plane(normal=[1., 0., 0.], scalar=2.), Plane(normal=[0.3, -1., 0.2], scalar=4.)]
+    clipper = mc.MultiPlaneClipper(searev, planes)
+    assert clipper.vertices_distances.shape == (searev.nb_vertices, 3)
+
+    # Same result as clipping sequentially
+    mesh = searev
+    for plane in planes:
+        mesh = mc.MeshClipper(mesh, plane).clipped_mesh
+
+    clipped_mesh = clipper.clipped_mesh
+    assert math.fabs(clipped_mesh.faces_areas.sum() - mesh.faces_areas.sum()) < 1e-8 * mesh.faces_areas.sum()
+    assert math.fabs(clipped_mesh.volume - mesh.volume) < 1e-8 * mesh.volume
+    assert clipped_mesh.nb_boundaries == 1
+    assert np.all(np.dot(clipped_mesh.vertices, planes[2].normal) < planes[2].c + 1e-8)
+
+
+def test_wave_clipper():
+    vertices, faces = mmio.load_VTP('meshmagick/tests/data/SEAREV.vtp')
+    searev = Mesh(vertices, faces)
+    searev.merge_duplicates()
+
+    # A flat free surface gives the same wetted surface as the plane clipper and the Archimedes buoyancy
+    clipper = mc.WaveClipper(searev, lambda x, y: np.zeros_like(x))
+    reference = mc.MeshClipper(searev)
+    assert math.fabs(clipper.wetted_area - reference.clipped_area) < 1e-8 * reference.clipped_area
+
+    rho_g = 1023. * 9.81
+    force = clipper.get_pressure_force(lambda x, y, z: -rho_g * z)
+    volume = reference.clipped_mesh.volume
+    assert math.fabs(force[2] - rho_g * volume) < 1e-6 * rho_g * volume
+
+    # New vertices lie on the wave free surface
+    wave = AiryWave(1., 8., direction=0.3)
+    assert np.allclose(solve_dispersion_relation(wave.omega, depth=1e4), wave.wave_number)
+
+    clipper.eta = wave.get_eta(t=1.)
+    wetted_mesh = clipper.wetted_mesh
+    elevations = wetted_mesh.vertices[:, 2] - wave.eta(wetted_mesh.vertices[:, 0], wetted_mesh.vertices[:, 1], t=1.)
+    assert np.all(elevations < 1e-8)
+    assert wetted_mesh.nb_boundaries == 1
+
+    # Cached quadratures of the triangles under the free surface give the same force as a direct integration
+    pressure = wave.get_pressure(t=1.)
+    points, weights = mc._pressure_quadrature(clipper.wetted_triangles)
+    force = -np.dot(pressure(points[:, :, 0], points[:, :, 1], points[:, :, 2]).ravel(), weights.reshape((-1, 6)))
+    assert np.allclose(clipper.get_pressure_force(pressure), force)
+
+    point = np.array([1., 2., -3.])
+    force[3:] -= np.cross(point, force[:3])
+    assert np.allclose(clipper.get_pressure_force(pressure, reduction_point=point), force)
+
+
+def test_airy_wave_clipper():
+    vertices, faces = mmio.load_VTP('meshmagick/tests/data/SEAREV.vtp')
+    searev = Mesh(vertices, faces)
+    searev.merge_duplicates()
+
+    # Time independent terms give the wave field at any time, in finite depth too
+    wave = AiryWave([1., 0.5], [8., 5.], direction=[0.3, -0.5], phase=[0., 1.], depth=30.)
+    x, y, z = searev.vertices.T
+    omega_t = wave.omega * 3.
+    cos_terms, sin_terms = wave.get_eta_terms(x, y)
+    assert np.allclose(np.dot(cos_terms, np.cos(omega_t)) + np.dot(sin_terms, np.sin(omega_t)), wave.eta(x, y, t=3.))
+    static_terms, cos_terms, sin_terms = wave.get_pressure_terms(x, y, z)
+    assert np.allclose(static_terms + np.dot(cos_terms, np.cos(omega_t)) + np.dot(sin_terms, np.sin(omega_t)),
+                       wave.pressure(x, y, z, t=3.))
+
+    # The Airy wave clipper gives the same wetted surface and forces as the generic wave clipper
+    clipper = mc.AiryWaveClipper(searev, wave)
+    for t in (0., 1.5, 4.):
+        clipper.time = t
+        reference = mc.WaveClipper(searev, wave.get_eta(t))
+        assert np.allclose(clipper.vertices_elevations, reference.vertices_elevations)
+        assert math.fabs(clipper.wetted_area - reference.wetted_area) < 1e-10 * reference.wetted_area
+
+        force = reference.get_pressure_force(wave.get_pressure(t))
+        assert np.allclose(clipper.get_pressure_force(), force, rtol=1e-10, atol=1e-10 * np.fabs(force).max())
+        assert np.allclose(clipper.get_pressure_force(wave.get_pressure(t)), force)
+
+    with pytest.raises(AttributeError):
+        clipper.eta = wave.get_eta(0.)
@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+#  -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+from meshmagick.mmio import load_VTP
+from meshmagick.mesh import Mesh
+from meshmagick.hydrostatics import Hydrostatics
+
+vertices, faces = load_VTP('meshmagick/tests/data/Cylinder.vtp')
+cylinder = Mesh(vertices, faces)
+cylinder.merge_duplicates()
+cylinder.heal_triangles()
+
+
+def test_decimate_target_faces():
+    mesh = cylinder.copy()
+    mesh.decimate(target_faces=800)
+
+    assert mesh.nb_faces <= 800
+    assert mesh.nb_quadrangles == 0
+    assert mesh.nb_boundaries == cylinder.nb_boundaries
+
+    assert mesh.volume == pytest.approx(cylinder.volume, rel=1e-6)
+    waterplane_area = Hydrostatics(cylinder).flotation_surface_area
+    assert Hydrostatics(mesh).flotation_surface_area == pytest.approx(waterplane_area, rel=1e-10)
+
+    # The waterline vertices are kept
+    waterline = np.fabs(cylinder.vertices[:, 2]) < 1e-6
+    assert np.sum(np.fabs(mesh.vertices[:, 2]) < 1e-6) == np.sum(waterline)
+
+
+def test_decimate_max_error():
+    mesh = cylinder.copy()
+    mesh.decimate(max_error=0.)
+    assert mesh.nb_faces < cylinder.nb_triangles + 2 * cylinder.nb_quadrangles
+    assert mesh.volume == pytest.approx(cylinder.volume, rel=1e-6)
+
+    with pytest.raises(ValueError):
+        mesh.decimate()
@@ -3,8 +3,11 @@
 
 import meshmagick.mmio as mmio
 import meshmagick.hydrostatics as hs
-from meshmagick.mesh import Mesh
+from meshmagick.tools import polygons_moments
+from meshmagick.mesh import Mesh, _rodrigues
 from math import pi, fabs
+import math
+import numpy as np
 
 
 # Importing cylinder mesh
@@ -77,6 +80,181 @@ def test_equilibrate():
     hs_cylinder.reset()
     return
 
+def test_equilibrate_with_proxy():
+    # Starting heeled so that the full mesh solver needs several iterations
+    mesh = cylinder.copy()
+    mesh.rotate([0.6, 0.2, 0.])
+    hydrostatics = hs.Hydrostatics(mesh)
+    hydrostatics.gravity_center = [0.2, 0.1, -8]
+    assert hydrostatics.equilibrate() == 1
+    # The cylinder is axisymmetric, only the vertical direction of the body axes is defined at equilibrium
+    vertical = hydrostatics.rotation[2].copy()
+    buoyancy_center = hydrostatics.buoyancy_center.copy()
+    nb_full_evaluations = len(hydrostatics.solver_history)
+
+    hydrostatics.reset()
+    hydrostatics.gravity_center = [0.2, 0.1, -8]
+    assert hydrostatics.equilibrate(proxy_faces=600) == 1
+    assert hydrostatics.is_at_equilibrium()
+    reltol = hydrostatics.reltol
+    assert np.allclose(hydrostatics.rotation[2], vertical, rtol=0., atol=reltol)
+    assert np.allclose(hydrostatics.buoyancy_center, buoyancy_center, rtol=0., atol=reltol)
+
+    # The history only records the evaluations on the full mesh, the proxy doing most of the work
+    assert len(hydrostatics.solver_history) < nb_full_evaluations
+
+    # The transformation gives the current mesh from the initial one
+    vertices = np.dot(mesh.vertices, hydrostatics.rotation.T) + hydrostatics.translation
+    assert np.allclose(vertices, hydrostatics.mesh.vertices)
+
+
+def test_residual_jacobian():
+    mesh = searev.copy()
+    mesh.merge_duplicates()
+    mesh.rotate([0.1, 0.05, 0.])
+    hydrostatics = hs.Hydrostatics(mesh, cog=[0.3, -0.2, -1.5])
+    hydrostatics.mass = 1000.
+    hydrostatics.add_force(hs.Force(point=[1., 2., 3.], value=[100., 2000., -3e4], mode='relative'))
+    hydrostatics.add_force(hs.Force(point=[-1., 0.5, 0.], value=[0., 1000., -1e4], mode='absolute'))
+
+    # Comparison with centered finite differences
+    jacobian = hydrostatics.get_residual_jacobian()
+    state = hydrostatics._save_state()
+    eps = 1e-2
+    for i in range(3):
+        residuals = []
+        for sign in (1., -1.):
+            dz, thetax, thetay = sign * eps * np.eye(3)[i]
+            hydrostatics._transform(_rodrigues(thetax, thetay), [0., 0., dz])
+            residuals.append(hydrostatics.residual)
+            hydrostatics._restore_state(state)
+        derivative = (residuals[0] - residuals[1]) / (2. * eps)
+        assert np.allclose(derivative, jacobian[:, i], rtol=1e-2, atol=1e-2 * np.fabs(jacobian[i, i]))
+
+    # Newton iterations converge in a few evaluations
+    assert hydrostatics.equilibrate() == 1
+    history = hydrostatics.solver_history
+    assert len(history) < 10
+    assert history[0]['residual_norm'] > history[-1]['residual_norm']
+
+
+def test_equilibrium_cache(tmpdir):
+    cache = hs.EquilibriumCache(str(tmpdir))
+    mesh = searev.copy()
+    mesh.merge_duplicates()
+
+    hydrostatics = hs.Hydrostatics(mesh, cog=[0., 0., -2.], cache=cache)
+    hydrostatics.mass = 1000.
+    assert hydrostatics.equilibrate() == 1
+
+    # Same computation retrieved without solving
+    cached = hs.Hydrostatics(mesh, cog=[0., 0., -2.], cache=cache)
+    cached.mass = 1000.
+    assert cached.equilibrate() == 1
+    assert cached.solver_history == []
+    assert np.allclose(cached.mesh.vertices, hydrostatics.mesh.vertices)
+    assert np.allclose(cached.hydrostatic_stiffness_matrix, hydrostatics.hydrostatic_stiffness_matrix)
+    assert cached.is_at_equilibrium()
+
+    # Slightly different loading case starting from the cached position
+    warm = hs.Hydrostatics(mesh, cog=[0.05, 0., -2.], cache=cache)
+    warm.mass = 1000.
+    assert warm.equilibrate() == 1
+    assert warm.is_at_equilibrium()
+    assert len(warm.solver_history) < 5
+
+    # The history of the previous computation is not reported after a cache hit
+    assert len(warm.solver_history) > 0
+    warm.reset()
+    assert warm.equilibrate() == 1
+    assert warm.solver_history == []
+
+
+def test_set_pose():
+    mesh = searev.copy()
+    mesh.merge_duplicates()
+    hydrostatics = hs.Hydrostatics(mesh)
+
+    hydrostatics.set_pose(4., heel=0.1, trim=0.02, zg=-0.5)
+    assert fabs(hydrostatics.hs_data['draught'] - 4.) < 1e-8
+    assert fabs(hydrostatics.backup['gravity_center'][2] + 0.5) < 1e-8
+    assert hydrostatics.is_at_equilibrium()
+
+    # Forward computation from a perturbed position with the obtained loading case
+    forward = hs.Hydrostatics(mesh, cog=hydrostatics.backup['gravity_center'])
+    forward.mass = hydrostatics.mass
+    forward._transform(hydrostatics.rotation, hydrostatics.translation + [0., 0., 0.2])
+    assert forward.equilibrate(init_disp=False) == 1
+    assert fabs(forward.hs_data['draught'] - 4.) < 1e-3
+
+    hydrostatics.set_pose(5., heel=-0.05, gm=1.5)
+    assert fabs(hydrostatics.transversal_metacentric_height - 1.5) < 1e-8
+    assert hydrostatics.is_at_equilibrium()
+
+
+def test_curves_of_form():
+    mesh = cylinder.copy()
+    mesh.merge_duplicates()
+
+    draughts = [8., 1.5, 4.7]
+    curves = hs.get_curves_of_form(mesh, draughts=draughts)
+    assert np.all(curves['draught'] == draughts)
+
+    for i, draught in enumerate(draughts):
+        # Reference values are given by clipping the mesh at the draught
+        mesh_at_draught = mesh.copy()
+        mesh_at_draught.translate_z(10. - draught)
+        hydrostatics = hs.Hydrostatics(mesh_at_draught)
+
+        assert fabs(curves['disp_volume'][i] - hydrostatics.displacement_volume) < 1e-6
+        assert fabs(curves['kb'][i] - draught - hydrostatics.buoyancy_center[2]) < 1e-6
+        assert fabs(curves['waterplane_area'][i] - hydrostatics.flotation_surface_area) < 1e-6
+        assert fabs(curves['wet_surface_area'][i] - hydrostatics.wet_surface_area) < 1e-6
+        assert fabs(curves['bmt'][i] - hydrostatics.transversal_metacentric_radius) < 1e-6
+        assert fabs(curves['bml'][i] - hydrostatics.longitudinal_metacentric_radius) < 1e-6
+
+    curves = hs_cylinder.get_curves_of_form(nb_draughts=20)
+    assert len(curves['draught']) == 20
+    assert fabs(curves['disp_volume'][-1] - mesh.volume) < 1e-6 * mesh.volume
+
+
+def test_polygons_moments():
+    # The same rectangle [1, 3] x [0, 2] with and without its first vertex repeated, then clockwise oriented
+    rectangle = np.array([[1., 0.], [3., 0.], [3., 2.], [1., 2.]])
+    vertices = np.concatenate((rectangle, rectangle[:1], rectangle, rectangle[::-1]))
+    moments = polygons_moments(vertices, [0, 5, 9])
+
+    expected = np.array([4., 8., 4., 8., 52. / 3., 16. / 3.])
+    assert np.allclose(moments[0], expected)
+    assert np.allclose(moments[1], expected)
+    assert np.allclose(moments[2], -expected)
+
+
+def test_cross_curves():
+    mesh = searev.copy()
+    mesh.merge_duplicates()
+
+    displacements = np.array([600., 1200.])
+    heels = np.radians([-2., 0., 2., 30.])
+    cross_curves = hs.get_cross_curves(mesh, displacements, heels)
+    kn = cross_curves['kn']
+
+    # The mesh is symmetric up to its discretization
+    assert np.allclose(kn[1], 0., atol=1e-3)
+    assert np.allclose(cross_curves['trim'][1], 0., atol=1e-6)
+    assert np.allclose(kn[0], -kn[2], atol=1e-3)
+
+    # At small heel angles, KN = KMt sin(heel)
+    curves = hs.get_curves_of_form(mesh, draughts=np.linspace(0.1, 10., 100))
+    kmt = np.interp(displacements, curves['displacement'], curves['kmt'])
+    assert np.allclose(kn[2], kmt * math.sin(heels[2]), rtol=1e-2)
+
+    # Free trim only changes the levers at large heel angles
+    fixed_trim = hs.get_cross_curves(mesh, displacements, heels, free_trim=False)
+    assert np.allclose(fixed_trim['kn'][:3], kn[:3], rtol=1e-2, atol=1e-3)
+    assert np.all(fixed_trim['trim'] == 0.)
+
+
 def test_hydrostatic_report():
     hs_cylinder.get_hydrostatic_report()
     return
@@ -1,8 +1,11 @@
 #!/usr/bin/env python
 #  -*- coding: utf-8 -*-
 
+import numpy as np
+
 import meshmagick.mmio as mmio
-from meshmagick.mesh import Mesh
+from meshmagick.mesh import Mesh, _rodrigues
+from meshmagick.inertia import InertiaSet, RigidBodyInertia
 from math import pi, fabs
 
 vertices, faces = mmio.load_VTP('meshmagick/tests/data/Cylinder.vtp')
@@ -22,4 +25,67 @@ def test_cylinder_inertia():
     
     assert fabs(inertia.xx - Ixx) < 1000
     assert fabs(inertia.zz - Izz) < 1000
-    
+
+
+def test_inertia_set():
+    rng = np.random.RandomState(0)
+    table = np.column_stack((rng.rand(50) * 100, rng.randn(50, 3), rng.rand(50, 3), rng.randn(50, 3) * 0.1))
+    inertias = InertiaSet.from_table(table)
+    assert len(inertias) == 50
+
+    # The sum matches the sequential transport of the rigid body inertias
+    point = np.array([1., 2., 3.])
+    reference = np.zeros((3, 3))
+    for line in table:
+        inertia = RigidBodyInertia(line[0], line[1:4], *line[4:])
+        inertia.reduction_point = point
+        reference += inertia.inertia_matrix
+    total = inertias.sum(point=point)
+    assert fabs(total.mass - table[:, 0].sum()) < 1e-10 * total.mass
+    assert np.allclose(total.inertia_matrix, reference)
+    assert np.allclose(inertias.get_matrices_at(point).sum(axis=0), reference)
+
+    # Aggregation of mesh inertias expressed at the origin
+    mesh_inertias = InertiaSet.from_inertias([cylinder.eval_plain_mesh_inertias(rho_medium=1.),
+                                              cylinder.eval_shell_mesh_inertias(rho_medium=1., thickness=0.01)])
+    assert np.allclose(mesh_inertias.sum(point=[0., 0., 0.]).inertia_matrix,
+                       mesh_inertias.inertia_matrices.sum(axis=0))
+
+    moments, axes = inertias.get_principal_axes()
+    assert np.allclose(np.einsum('nij, nj -> ni', inertias.inertia_matrices, axes[:, :, 0]),
+                       moments[:, :1] * axes[:, :, 0])
+
+
+def test_shell_inertia_zones():
+    # Two plating zones with different thicknesses give the sum of the inertias of the extracted sub-meshes
+    zones = (cylinder.faces_centers[:, 2] > cylinder.faces_centers[:, 2].mean()).astype(int)
+    inertia = cylinder.eval_shell_mesh_inertias(rho_medium=7850., thickness=[0.02, 0.01], zones=zones)
+
+    lower = cylinder.extract_faces(np.where(zones == 0)[0]).eval_shell_mesh_inertias(rho_medium=7850., thickness=0.02)
+    upper = cylinder.extract_faces(np.where(zones == 1)[0]).eval_shell_mesh_inertias(rho_medium=7850., thickness=0.01)
+    assert fabs(inertia.mass - lower.mass - upper.mass) < 1e-10 * inertia.mass
+    assert np.allclose(inertia.inertia_matrix, lower.inertia_matrix + upper.inertia_matrix)
+
+    # Per face fields
+    thickness = np.where(zones == 0, 0.02, 0.01)
+    assert np.allclose(cylinder.eval_shell_mesh_inertias(rho_medium=7850., thickness=thickness).inertia_matrix,
+                       inertia.inertia_matrix)
+
+
+def test_inertia_transport():
+    rotation = _rodrigues(0.3, -0.2)
+    point = np.array([1., -2., 0.5])
+    inertia = cylinder.eval_plain_mesh_inertias(rho_medium=1., point=point, rotation=rotation)
+
+    # Same as the inertia of the mesh whose vertices are expressed in the rotated frame
+    reference = Mesh(np.dot(cylinder.vertices, rotation), cylinder.faces).eval_plain_mesh_inertias(rho_medium=1.)
+    reference.reduction_point = np.dot(point, rotation)
+    assert np.allclose(inertia.gravity_center, reference.gravity_center)
+    assert np.allclose(inertia.inertia_matrix, reference.inertia_matrix)
+
+    # Batched transports
+    points = np.random.rand(10, 3)
+    rotations = np.array([_rodrigues(thetax, thetay) for thetax, thetay in np.random.rand(10, 2)])
+    matrices = reference.get_matrices_at(points, rotations)
+    assert matrices.shape == (10, 3, 3)
+    assert np.allclose(matrices[3], reference.get_inertia_at(points[3], rotations[3]).inertia_matrix)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+#  -*- coding: utf-8 -*-
+
+import numpy as np
+
+import meshmagick.mmio as mmio
+from meshmagick.mesh import Mesh
+from meshmagick.intersection import triangles_intersect
+
+vertices, faces = mmio.load_VTP('meshmagick/tests/data/Cylinder.vtp')
+cylinder = Mesh(vertices, faces)
+cylinder.merge_duplicates()
+
+
+def test_triangles_intersect():
+    tri = np.array([[0., 0., 0.], [1., 0., 0.], [0., 1., 0.]])
+    crossing = np.array([[0.2, 0.2, -1.], [0.2, 0.2, 1.], [1.2, 1.2, 0.]])
+    above = tri + [0., 0., 1.]
+    coplanar_overlapping = tri + [0.2, 0.2, 0.]
+    coplanar_apart = tri + [2., 0., 0.]
+    touching = np.array([[1., 0., 0.], [2., 0., 0.], [1., 1., 0.]])
+
+    others = np.array([crossing, above, coplanar_overlapping, coplanar_apart, touching])
+    result = triangles_intersect(np.tile(tri, (len(others), 1, 1)), others)
+    assert np.array_equal(result, [True, False, True, False, True])
+
+
+def test_self_intersections():
+    assert len(cylinder.get_self_intersections()) == 0
+
+    # Two overlapping copies assembled without merging
+    shifted = cylinder.copy()
+    shifted.translate([0.5, 0.3, 0.1])
+    assembly = Mesh(np.concatenate((cylinder.vertices, shifted.vertices)),
+                    np.concatenate((cylinder.faces, shifted.faces + cylinder.nb_vertices)))
+    pairs = assembly.get_self_intersections()
+    assert len(pairs) > 0
+    assert np.all(pairs[:, 0] < cylinder.nb_faces)
+    assert np.all(pairs[:, 1] >= cylinder.nb_faces)
+
+
+def test_mesh_mesh_intersections():
+    shifted = cylinder.copy()
+    shifted.translate([0.5, 0.3, 0.1])
+    pairs = cylinder.get_intersections_with(shifted)
+
+    # Brute force checking
+    fa, fb = np.meshgrid(np.arange(0, cylinder.nb_faces, 10), np.arange(shifted.nb_faces), indexing='ij')
+    fa, fb = fa.ravel(), fb.ravel()
+    quads_a = cylinder.faces[fa, 0] != cylinder.faces[fa, 3]
+    quads_b = shifted.faces[fb, 0] != shifted.faces[fb, 3]
+    expected = np.zeros(len(fa), dtype=bool)
+    for (tri_a_ids, mask_a) in (((0, 1, 2), True), ((0, 2, 3), quads_a)):
+        for (tri_b_ids, mask_b) in (((0, 1, 2), True), ((0, 2, 3), quads_b)):
+            tri_a = cylinder.vertices[cylinder.faces[fa][:, tri_a_ids]]
+            tri_b = shifted.vertices[shifted.faces[fb][:, tri_b_ids]]
+            expected |= mask_a & mask_b & triangles_intersect(tri_a, tri_b)
+    expected = np.column_stack((fa[expected], fb[expected]))
+
+    assert np.array_equal(pairs[pairs[:, 0] % 10 == 0], expected)
+
+    shifted.translate([100., 0., 0.])
+    assert len(cylinder.get_intersections_with(shifted)) == 0
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+#  -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+import meshmagick.mmio as mmio
+import meshmagick.kernels as kernels
+from meshmagick.mesh import Mesh, Plane
+from meshmagick.mesh_clipper import MeshClipper
+from meshmagick.tools import get_faces_neighbors, get_vertices_neighbors
+
+vertices, faces = mmio.load_VTP('meshmagick/tests/data/SEAREV.vtp')
+searev = Mesh(vertices, faces)
+searev.merge_duplicates()
+
+backends = [backend for backend in kernels.BACKENDS if backend != 'numba' or kernels.HAS_NUMBA]
+
+# Comparisons between backends are meaningless without the compiled kernels, install the 'test' extra to run them
+requires_numba = pytest.mark.skipif(not kernels.HAS_NUMBA, reason='numba is not installed, backends are not compared')
+
+
+def run_backends(func):
+    results = list()
+    previous_backend = kernels.get_backend()
+    try:
+        for backend in backends:
+            kernels.set_backend(backend)
+            results.append(func())
+    finally:
+        kernels.set_backend(previous_backend)
+    return results
+
+
+def test_merge_rows():
+    new_ids = run_backends(lambda: kernels.merge_rows(vertices, atol=1e-8)[1])
+    for ids in new_ids[1:]:
+        assert np.array_equal(ids, new_ids[0])
+
+    # Every cluster holds the vertices that are duplicates of its first one
+    representatives, ids = kernels.merge_rows(vertices)
+    assert len(representatives) == searev.nb_vertices
+    assert np.allclose(vertices, vertices[representatives][ids])
+
+    assert np.array_equal(kernels.merge_rows(np.eye(3))[1], np.arange(3))
+
+
+def test_chain_edges():
+    # A closed loop 2 -> 3 -> 4 -> 2 and an open line 5 -> 0 -> 1
+    chains = run_backends(lambda: kernels.chain_edges([3, 0, 4, 2, 5], [4, 1, 2, 3, 0], 6))
+    for chain in chains:
+        chained_vertices, offsets, closed = chain
+        assert np.array_equal(chained_vertices, [2, 3, 4, 2, 5, 0, 1])
+        assert np.array_equal(offsets, [0, 4, 7])
+        assert np.array_equal(closed, [True, False])
+
+    # A line ending into a loop does not prevent the loop from being closed
+    chained_vertices, offsets, closed = kernels.chain_edges([0, 1, 2, 3], [1, 2, 3, 1], 4)
+    assert np.array_equal(chained_vertices, [1, 2, 3, 1, 0, 1])
+    assert np.array_equal(closed, [True, False])
+
+
+def test_flood_orientation():
+    flipped_faces = searev.faces.copy()
+    flip = np.random.RandomState(0).rand(searev.nb_faces) < 0.3
+    flipped_faces[flip] = flipped_faces[flip][:, ::-1]
+
+    def heal():
+        mesh = Mesh(searev.vertices, flipped_faces)
+        mesh.heal_normals()
+        return mesh.faces
+
+    for healed_faces in run_backends(heal):
+        assert np.array_equal(healed_faces, searev.faces)
+
+
+@requires_numba
+def test_clipper_backends():
+    plane = Plane(normal=[0.1, 0.2, 1.], scalar=0.3)
+    polygons = run_backends(lambda: MeshClipper(searev, plane).closed_polygons)
+    for polygon in polygons[1:]:
+        assert polygon == polygons[0]
+    assert len(polygons[0]) == 1 and polygons[0][0][0] == polygons[0][0][-1]
+
+
+def test_reverse_cuthill_mckee():
+    # A path 0 - 2 - 1 - 3 and an isolated vertex 4
+    offsets = [0, 1, 3, 5, 6, 6]
+    neighbors = [2, 2, 3, 0, 1, 1]
+    orders = run_backends(lambda: kernels.reverse_cuthill_mckee(offsets, neighbors))
+    for order in orders:
+        assert np.array_equal(order, [3, 1, 2, 0, 4])
+
+
+def test_clip_crown():
+    # Vertices 0 and 3 are above the plane, 1 and 2 below, 4 and 5 on the plane, 6 is not classified
+    distances = np.array([1., -1., -1., 1., 0., 0., 2.])
+    above, on, below = distances > 0.5, np.fabs(distances) < 0.5, distances < -0.5
+    above[6] = False
+    faces = [[0, 1, 2, 3],  # '202'
+             [0, 4, 1, 5],  # '121'
+             [4, 5, 1, 4],  # '021'
+             [4, 0, 1, 4]]  # '111'
+    for crown_faces, upper_faces, edges, boundary_edges in run_backends(lambda: kernels.clip_crown(faces, above, on,
+                                                                                                   below, distances)):
+        assert np.array_equal(crown_faces, [[7, 1, 2, 8], [4, 1, 5, 4], [1, 4, 5, 1], [9, 1, 4, 9]])
+        assert np.array_equal(upper_faces, [[0, 7, 8, 3], [5, 0, 4, 5], [4, 0, 9, 4]])
+        assert np.array_equal(edges, [[0, 1], [2, 3], [0, 1]])
+        assert np.array_equal(boundary_edges, [[7, 8], [4, 5], [5, 4], [9, 4]])
+
+    with pytest.raises(ValueError):
+        kernels.clip_crown([[0, 3, 6, 0]], above, on, below, distances)
+
+
+@requires_numba
+def test_backends_agree():
+    assert backends == list(kernels.BACKENDS)
+
+    merged = run_backends(lambda: kernels.merge_rows(vertices, atol=1e-8))
+    assert all([np.array_equal(merged[0][i], merged[1][i]) for i in range(2)])
+
+    # Edges of the faces under the waterline, vertices having several outgoing edges
+    lower_faces = searev.faces[searev.faces_centers[:, 2] < 0.]
+    origins, targets = lower_faces.ravel(), np.roll(lower_faces, -1, axis=1).ravel()
+    valid = origins != targets
+    chains = run_backends(lambda: kernels.chain_edges(origins[valid], targets[valid], searev.nb_vertices))
+    assert all([np.array_equal(chains[0][i], chains[1][i]) for i in range(3)])
+
+    flipped_faces = searev.faces.copy()
+    flipped_faces[::3] = flipped_faces[::3, ::-1]
+    face_1, face_2 = get_faces_neighbors(flipped_faces)
+    ff_keys = np.unique(np.concatenate((face_1 * searev.nb_faces + face_2, face_2 * searev.nb_faces + face_1)))
+    ff_offsets = np.zeros(searev.nb_faces + 1, dtype=int)
+    ff_offsets[1:] = np.cumsum(np.bincount(ff_keys // searev.nb_faces, minlength=searev.nb_faces))
+    floods = run_backends(lambda: kernels.flood_orientation(flipped_faces, ff_offsets, ff_keys % searev.nb_faces))
+    assert np.array_equal(floods[0][0], floods[1][0]) and floods[0][1:] == floods[1][1:]
+
+    offsets, neighbors = get_vertices_neighbors(searev.nb_vertices, searev.faces)
+    orders = run_backends(lambda: kernels.reverse_cuthill_mckee(offsets, neighbors))
+    assert np.array_equal(orders[0], orders[1])
+
+    clipper = MeshClipper(searev, Plane(normal=[0.1, 0.2, 1.], scalar=0.3))
+    internals = clipper.__internals__
+    crown_mesh = clipper.crown_mesh
+    crowns = run_backends(lambda: kernels.clip_crown(crown_mesh.faces,
+                                                     internals['crown_mesh_above_vertices_mask'],
+                                                     internals['crown_mesh_on_vertices_mask'],
+                                                     internals['crown_mesh_below_vertices_mask'],
+                                                     internals['crown_mesh_vertices_distances']))
+    assert all([np.array_equal(crowns[0][i], crowns[1][i]) for i in range(4)])
@@ -129,3 +129,130 @@ def test_quick_save():
     cylinder.quick_save()
     os.remove('quick_save.vtp')
     
+
+
+def test_surface_integrals_chunks():
+    mesh = Mesh(cylinder.vertices, cylinder.faces)
+    integrals = mesh.get_surface_integrals()
+
+    triangles = cylinder.vertices[cylinder.faces[:, :3]]
+    reference = Mesh._compute_triangles_integrals(triangles)
+    assert np.allclose(Mesh._compute_triangles_integrals(triangles, chunk_size=100, nb_threads=3), reference)
+    assert np.allclose(Mesh._compute_triangles_integrals(triangles, sum_faces_contrib=True, chunk_size=100),
+                       reference.sum(axis=1))
+
+    # Summation without storing the faces integrals
+    mesh = Mesh(cylinder.vertices, cylinder.faces)
+    weighted_integrals = mesh.get_surface_integrals(sum_faces_contrib=True, weights=mesh.faces_normals)
+    assert not mesh.has_surface_integrals()
+    assert np.allclose(weighted_integrals, np.dot(integrals, mesh.faces_normals))
+
+
+def test_faces_quality():
+    # A right triangle and a neighbor square, one vertex of which is raised
+    vertices = np.array([[0., 0., 0.], [1., 0., 0.], [0., 1., 0.], [1., 1., 0.], [2., 0., 0.], [2., 1., 0.5]])
+    mesh = Mesh(vertices, [[2, 1, 3, 2], [1, 4, 5, 3]])
+    quality = mesh.get_quality()
+
+    assert np.allclose(quality['area'][0], 0.5)
+    assert np.allclose(quality['min_angle'][0], 45.) and np.allclose(quality['max_angle'][0], 90.)
+    assert np.allclose(quality['edge_ratio'][0], np.sqrt(2.))
+    assert np.allclose(quality['aspect_ratio'][0], np.sqrt(2.) * (2. + np.sqrt(2.)) / (2. * np.sqrt(3.)))
+    assert np.allclose(quality['skewness'][0], 0.25)
+    assert quality['warpage'][0] == 0. and quality['planarity'][0] == 0.
+    assert quality['warpage'][1] > 0. and quality['planarity'][1] > 0.
+    assert np.allclose(quality['area_ratio'], quality['area'].max() / quality['area'].min())
+
+    # Planar quadrangles of the cylinder
+    quality = cylinder.get_quality()
+    quadrangles = cylinder.quadrangles_ids
+    assert np.all(quality['warpage'][quadrangles] < 1e-6)
+    assert np.allclose(quality['area'], cylinder.faces_areas)
+
+
+def test_components():
+    vertices, faces = load_VTP('meshmagick/tests/data/SEAREV.vtp')
+    searev = Mesh(vertices, faces)
+    searev.merge_duplicates()
+    assert searev.nb_components == 1
+
+    # Two copies of the mesh far from each other
+    nv = searev.nb_vertices
+    mesh = Mesh(np.concatenate((searev.vertices, searev.vertices + [100., 0., 0.])),
+                np.concatenate((searev.faces, searev.faces + nv)))
+    labels = mesh.components()
+    assert mesh.nb_components == 2
+    assert np.all(labels[:searev.nb_faces] == 0) and np.all(labels[searev.nb_faces:] == 1)
+
+    bodies = mesh.split()
+    assert len(bodies) == 2
+    for body in bodies:
+        assert body.nb_faces == searev.nb_faces
+        assert np.allclose(body.volume, searev.volume)
+
+
+def test_reorder():
+    from meshmagick.tools import get_vertices_neighbors
+
+    vertices, faces = load_VTP('meshmagick/tests/data/SEAREV.vtp')
+    searev = Mesh(vertices, faces)
+    searev.merge_duplicates()
+
+    def bandwidth(mesh):
+        offsets, neighbors = get_vertices_neighbors(mesh.nb_vertices, mesh.faces)
+        return np.abs(np.repeat(np.arange(mesh.nb_vertices), np.diff(offsets)) - neighbors).max()
+
+    for method in ('morton', 'rcm'):
+        mesh = searev.copy()
+        vertices_order, faces_order = mesh.reorder(method)
+        assert np.array_equal(np.sort(vertices_order), np.arange(searev.nb_vertices))
+        assert np.array_equal(mesh.vertices, searev.vertices[vertices_order])
+        assert np.array_equal(vertices_order[mesh.faces], searev.faces[faces_order])
+        assert np.allclose(mesh.volume, searev.volume)
+        assert np.allclose(mesh.faces_areas, searev.faces_areas[faces_order])
+
+    mesh = searev.copy()
+    mesh.reorder('rcm')
+    assert bandwidth(mesh) <= bandwidth(searev)
+
+
+def test_concatenate():
+    vertices, faces = load_VTP('meshmagick/tests/data/SEAREV.vtp')
+    searev = Mesh(vertices, faces)
+    searev.merge_duplicates()
+
+    # Upper and lower halves share the vertices of their seam
+    upper = searev.extract_faces(np.where(searev.faces_centers[:, 2] > 0.)[0])
+    lower = searev.extract_faces(np.where(searev.faces_centers[:, 2] <= 0.)[0])
+    far = Mesh(searev.vertices + [100., 0., 0.], searev.faces)
+
+    mesh, faces_offsets = Mesh.concatenate((upper, lower, far), return_offsets=True)
+    assert np.array_equal(faces_offsets, [0, upper.nb_faces, searev.nb_faces, 2 * searev.nb_faces])
+    assert mesh.nb_vertices == 2 * searev.nb_vertices
+    assert mesh.nb_components == 2
+    assert np.allclose(mesh.volume, 2 * searev.volume)
+    assert np.allclose(mesh.faces_centers[faces_offsets[2]:], far.faces_centers)
+
+    assert Mesh.concatenate((upper, lower), merge=False).nb_vertices == upper.nb_vertices + lower.nb_vertices
+    assert (upper + lower).nb_vertices == searev.nb_vertices
+
+    # Adding meshes that still have duplicate vertices merges them all
+    vertices, faces = load_VTP('meshmagick/tests/data/Cylinder.vtp')
+    merged = Mesh(vertices, faces)
+    merged.merge_duplicates()
+    soup = Mesh(merged.vertices[merged.faces.ravel()], np.arange(4 * merged.nb_faces).reshape((-1, 4)))
+    shifted = Mesh(soup.vertices + [100., 0., 0.], soup.faces)
+    assert (soup + shifted).nb_vertices == 2 * merged.nb_vertices
+
+
+def test_symmetrize_unmerged():
+    vertices, faces = load_VTP('meshmagick/tests/data/SEAREV.vtp')
+    searev = Mesh(vertices, faces)
+    searev.merge_duplicates()
+    half = searev.get_symmetric_half(axis=1)
+
+    # Triangle soup of the half mesh, every face having its own vertices
+    soup = Mesh(half.vertices[half.faces.ravel()], np.arange(4 * half.nb_faces).reshape((-1, 4)))
+    soup.symmetrize(Plane([0., 1., 0.], 0.))
+    assert soup.nb_vertices == searev.nb_vertices
+    assert soup.nb_faces == searev.nb_faces
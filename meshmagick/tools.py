@@ -3,6 +3,8 @@
 
 import numpy as np
 
+from .kernels import merge_rows
+
 def merge_duplicate_rows(arr, atol=1e-8, return_index=False):
     """Returns a new node array where close nodes have been merged into one node (following atol).
 
@@ -24,101 +26,315 @@ def merge_duplicate_rows(arr, atol=1e-8, return_index=False):
     newID : ndarray, optional
         array of the new new vertices IDs
     """
-    # TODO: Refaire la documentation --> les entrees sorties ont change !!
-
-    # TODO : Set a tolerance option in command line arguments
-
-    # This function is a bottleneck in the clipping routines
-    # TODO: use np.unique to cluster groups --> acceleration !!
-
-    # atol = pow(10, -decimals)
-    
     arr = np.asarray(arr)
-    
-    nv, nbdim = arr.shape
-
-    levels = [0, nv]
-    iperm = np.arange(nv)
-
-    for dim in range(nbdim):
-        # Sorting the first dimension
-        values = arr[:, dim].copy()
-        if dim > 0:
-            values = values[iperm]
-        levels_tmp = []
-        for (ilevel, istart) in enumerate(levels[:-1]):
-            istop = levels[ilevel+1]
-
-            if istop-istart > 1:
-                level_values = values[istart:istop]
-                iperm_view = iperm[istart:istop]
-
-                iperm_tmp = level_values.argsort()
-
-                level_values[:] = level_values[iperm_tmp]
-                iperm_view[:] = iperm_view[iperm_tmp]
-
-                levels_tmp.append(istart)
-                vref = values[istart]
-
-                for idx in range(istart, istop):
-                    cur_val = values[idx]
-                    if np.abs(cur_val - vref) > atol:
-                        levels_tmp.append(idx)
-                        vref = cur_val
-
-            else:
-                levels_tmp.append(levels[ilevel])
-        if len(levels_tmp) == nv:
-            # No duplicate rows
-            # if verbose:
-            # print "\t -> No duplicate _vertices detected :)"
-            if return_index:
-                newID = np.arange(nv)
-            break
 
-        levels_tmp.append(nv)
-        levels = levels_tmp
+    # The level splitting loop is performed by a loop kernel, compiled if numba is available
+    representatives, newID = merge_rows(arr, atol=atol)
+    if len(representatives) < arr.shape[0]:
+        arr = np.array(arr[representatives], dtype=float)
 
-    else:
-        # Building the new merged node list
-        arr_tmp = []
-        newID = np.arange(nv)
-        for (ilevel, istart) in enumerate(levels[:-1]):
-            istop = levels[ilevel+1]
-
-            arr_tmp.append(arr[iperm[istart]])
-            newID[iperm[list(range(istart, istop))]] = ilevel
-        arr = np.array(arr_tmp, dtype=float)
-        # Applying renumbering to cells
-        # if F is not None:
-        #     for cell in F:
-        #         cell[:] = newID[cell]
-
-        # if verbose:
-        # nv_new = arr.shape[0]
-        # print "\t -> Initial number of nodes : {:d}".format(nv)
-        # print "\t -> New number of nodes     : {:d}".format(nv_new)
-        # print "\t -> {:d} nodes have been merged".format(nv-nv_new)
-
-    # if F is not None:
-    #     if return_index:
-    #         return arr, F, newID
-    #     else:
-    #         return arr, F
-    # else:
     if return_index:
         return arr, newID
     else:
         return arr
 
 
+def get_mirror_vertices(vertices, axis=1, atol=1e-6):
+    """Matches the vertices of a mesh with their mirror images with respect to a coordinate plane.
+
+    Mirrored vertices are clustered together with the vertices by the tolerance based sorting used by
+    merge_duplicate_rows so that each vertex is matched with at most one other vertex.
+
+    Parameters
+    ----------
+    vertices : array_like
+        (nv x 3) array of vertices coordinates, without duplicates
+    axis : int, optional
+        The axis normal to the symmetry plane: 0 for Oyz, 1 for Oxz. Default is 1.
+    atol : float, optional
+        Absolute tolerance on coordinates. Default is 1e-6.
+
+    Returns
+    -------
+    ndarray or None
+        (nv,) array giving the id of the mirror vertex of every vertex, or None if the vertices are not symmetric
+    """
+    vertices = np.asarray(vertices, dtype=float)
+    nv = vertices.shape[0]
+
+    mirrored = vertices.copy()
+    mirrored[:, axis] *= -1.
+
+    representatives, new_ids = merge_rows(np.concatenate((vertices, mirrored)), atol=atol)
+    vertices_clusters, mirrored_clusters = new_ids[:nv], new_ids[nv:]
+    if len(np.unique(vertices_clusters)) < nv:
+        # Vertices are themselves duplicates and cannot be matched one to one
+        return None
+
+    clusters_vertex = np.full(len(representatives), -1, dtype=int)
+    clusters_vertex[vertices_clusters] = np.arange(nv)
+    mirror_ids = clusters_vertex[mirrored_clusters]
+    if np.any(mirror_ids < 0):
+        return None
+    return mirror_ids
+
+
+def get_symmetric_half(vertices, faces, axis=1, atol=1e-6):
+    """Extracts the half of a mesh that is symmetric with respect to a coordinate plane.
+
+    The half lying on the positive side of the plane is kept. Meshes having faces that cross the plane cannot be split
+    and are considered as non symmetric.
+
+    Parameters
+    ----------
+    vertices : array_like
+        (nv x 3) array of vertices coordinates, without duplicates
+    faces : array_like
+        (nf x 4) array of faces vertices ids
+    axis : int, optional
+        The axis normal to the symmetry plane: 0 for Oyz, 1 for Oxz. Default is 1.
+    atol : float, optional
+        Absolute tolerance on coordinates. Default is 1e-6.
+
+    Returns
+    -------
+    tuple or None
+        The vertices and faces arrays of the half mesh, or None if the mesh is not symmetric
+    """
+    vertices = np.asarray(vertices, dtype=float)
+    faces = np.asarray(faces, dtype=int)
+
+    # Faces having vertices strictly on both sides of the plane cannot be split
+    faces_coordinates = vertices[faces, axis]
+    if np.any(np.logical_and(faces_coordinates.max(axis=1) > atol, faces_coordinates.min(axis=1) < -atol)):
+        return None
+
+    mirror_ids = get_mirror_vertices(vertices, axis=axis, atol=atol)
+    if mirror_ids is None:
+        return None
+
+    # Mirrored faces must be faces of the mesh, other than themselves
+    faces_keys = np.sort(faces, axis=1)
+    mirrored_keys = np.sort(mirror_ids[faces], axis=1)
+    if np.any(np.all(faces_keys == mirrored_keys, axis=1)):
+        return None
+    faces_keys = faces_keys[np.lexsort(faces_keys.T[::-1])]
+    mirrored_keys = mirrored_keys[np.lexsort(mirrored_keys.T[::-1])]
+    if not np.array_equal(faces_keys, mirrored_keys):
+        return None
+
+    half_faces = faces[vertices[faces, axis].sum(axis=1) > 0.]
+    used_vertices, half_faces = np.unique(half_faces, return_inverse=True)
+    return vertices[used_vertices], half_faces.reshape((-1, 4))
+
+
+def get_faces_neighbors(faces):
+    """Get the pairs of faces sharing an edge.
+
+    Parameters
+    ----------
+    faces : array_like
+        (nf x 4) array of faces vertices ids, triangles repeating their first vertex
+
+    Returns
+    -------
+    face_1 : ndarray
+        Ids of the first faces of the pairs
+    face_2 : ndarray
+        Ids of the second faces of the pairs
+    """
+    faces = np.asarray(faces, dtype=int)
+    nb_faces = faces.shape[0]
+    if nb_faces == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+
+    # Edges of every face, the last edge of triangles being a degenerated one that is discarded
+    origins = faces.ravel()
+    targets = np.roll(faces, -1, axis=1).ravel()
+    faces_ids = np.repeat(np.arange(nb_faces), 4)
+    valid = origins != targets
+    valid[np.where(faces[:, 0] == faces[:, -1])[0] * 4 + 3] = False
+
+    # Edges are identified by a single integer key built from their sorted vertices ids
+    origins, targets = origins[valid], targets[valid]
+    keys = np.minimum(origins, targets) * (faces.max() + 1) + np.maximum(origins, targets)
+    faces_ids = faces_ids[valid]
+
+    order = np.argsort(keys)
+    keys = keys[order]
+    faces_ids = faces_ids[order]
+    shared = np.where(keys[1:] == keys[:-1])[0]
+
+    return faces_ids[shared], faces_ids[shared + 1]
+
+
+def get_vertices_neighbors(nb_vertices, faces):
+    """Get the vertices / vertices connectivity of a mesh in compressed sparse row format.
+
+    Parameters
+    ----------
+    nb_vertices : int
+        The number of vertices
+    faces : array_like
+        (nf x 4) array of faces vertices ids, triangles repeating their first vertex
+
+    Returns
+    -------
+    offsets : ndarray
+        (nv+1,) array of the offsets of the vertices neighbors into neighbors
+    neighbors : ndarray
+        Concatenation of the sorted ids of the vertices linked to every vertex by an edge
+    """
+    faces = np.asarray(faces, dtype=int)
+
+    # Edges in both directions, degenerated edges of triangles being discarded
+    origins = faces.ravel()
+    targets = np.roll(faces, -1, axis=1).ravel()
+    valid = origins != targets
+    origins, targets = np.concatenate((origins[valid], targets[valid])), np.concatenate((targets[valid], origins[valid]))
+
+    keys = np.unique(origins * nb_vertices + targets)
+    neighbors = keys % nb_vertices
+
+    offsets = np.zeros(nb_vertices + 1, dtype=int)
+    offsets[1:] = np.cumsum(np.bincount(keys // nb_vertices, minlength=nb_vertices))
+
+    return offsets, neighbors
+
+
+def get_connected_components(nb_items, pairs_1, pairs_2):
+    """Labels the connected components of a graph.
+
+    It is a vectorized union-find: for every pair of items that are not yet joined, the root of highest label is
+    hooked onto the other root and labels are then compressed by pointer jumping, until every pair is joined.
+
+    Parameters
+    ----------
+    nb_items : int
+        The number of items (graph nodes)
+    pairs_1 : array_like
+        Ids of the first items of the connected pairs (graph edges)
+    pairs_2 : array_like
+        Ids of the second items of the connected pairs
+
+    Returns
+    -------
+    ndarray
+        (nb_items,) array of components labels, numbered from 0 in the order of their lowest item id
+    """
+    pairs_1 = np.asarray(pairs_1, dtype=int)
+    pairs_2 = np.asarray(pairs_2, dtype=int)
+
+    labels = np.arange(nb_items)
+    while True:
+        labels_1, labels_2 = labels[pairs_1], labels[pairs_2]
+        not_joined = labels_1 != labels_2
+        if not np.any(not_joined):
+            break
+
+        # Hooking the highest root of every pair onto the lowest one and forgetting pairs already joined
+        pairs_1, pairs_2 = pairs_1[not_joined], pairs_2[not_joined]
+        labels_1, labels_2 = labels_1[not_joined], labels_2[not_joined]
+        labels[np.maximum(labels_1, labels_2)] = np.minimum(labels_1, labels_2)
+
+        # Pointer jumping
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
 
+    return np.unique(labels, return_inverse=True)[1]
 
 
+def morton_codes(points, nbits=10):
+    """Returns the Morton (Z-order) codes of a set of 3D points.
+
+    Coordinates are quantized on a regular grid of 2**nbits cells per axis spanning the points bounding box and bits
+    of the three quantized coordinates are interleaved. Sorting points by their codes gives a space filling curve
+    ordering where points close in the sequence are close in space.
+
+    Parameters
+    ----------
+    points : array_like
+        (n x 3) array of points coordinates
+    nbits : int, optional
+        Number of bits used to quantize each coordinate. Default is 10 (30 bits codes).
+
+    Returns
+    -------
+    ndarray
+        (n,) array of integer codes
+    """
+    points = np.asarray(points, dtype=float)
+    assert 0 < nbits <= 21
+
+    codes = np.zeros(points.shape[0], dtype=np.int64)
+    if points.shape[0] == 0:
+        return codes
+
+    lower = points.min(axis=0)
+    span = points.max(axis=0) - lower
+    span[span == 0.] = 1.
+
+    quantized = ((points - lower) / span * (2**nbits - 1)).astype(np.int64)
+
+    for bit in range(nbits):
+        for axis in range(3):
+            codes |= ((quantized[:, axis] >> bit) & 1) << (3*bit + axis)
+
+    return codes
+
+
+def polygons_moments(vertices, offsets):
+    """Returns the area moments up to order 2 of a set of planar polygons lying in the Oxy plane.
+
+    Moments are computed from the polygons contours by the Green theorem. Polygons are given as one array of
+    concatenated vertices so that every operation is vectorized over the whole set of edges, contributions of edges
+    being reduced by polygon.
+
+    Parameters
+    ----------
+    vertices : array_like
+        (n x 2) or (n x 3) array of the concatenated polygons vertices coordinates, only x and y being used. Polygons
+        are implicitly closed so that their first vertex may or may not be repeated at their end.
+    offsets : array_like
+        (npoly,) array of the indices of the polygons first vertex in vertices
+
+    Returns
+    -------
+    ndarray
+        (npoly x 6) array whose columns are the integrals of 1, x, y, xy, x**2 and y**2 over the polygons. They are
+        signed, polygons being counterclockwise oriented when their area is positive.
+    """
+    vertices = np.asarray(vertices, dtype=np.float)
+    offsets = np.asarray(offsets, dtype=np.int)
 
+    if len(offsets) == 0:
+        return np.zeros((0, 6), dtype=np.float)
 
+    # Index of the next vertex along the polygons contours, the last vertex of a polygon being followed by its first
+    ends = np.append(offsets[1:], len(vertices))
+    next_ids = np.arange(1, len(vertices) + 1)
+    next_ids[ends - 1] = offsets
 
+    xi, yi = vertices[:, 0], vertices[:, 1]
+    xii, yii = xi[next_ids], yi[next_ids]
 
+    dx = xii - xi
+    dy = yii - yi
+    px = xi + xii
+    py = yi + yii
+    xi2 = xi * xi
+    xii2 = xii * xii
 
+    edges_moments = np.column_stack((
+        dy * px / 2.,
+        dy * (px * px - xi * xii) / 6.,
+        -dx * (py * py - yi * yii) / 6.,
+        dy * (py * px * px + 2. * (yi * xi2 + yii * xii2)) / 24.,
+        dy * (xi2 + xii2) * px / 12.,
+        -dx * (yi * yi + yii * yii) * py / 12.
+    ))
 
+    return np.add.reduceat(edges_moments, offsets, axis=0)
@@ -0,0 +1,269 @@
+#!/usr/bin/env python
+#  -*- coding: utf-8 -*-
+"""This module defines linear wave fields that may be used to clip meshes by a wavy free surface.
+
+Wave fields are described by their free surface elevation eta(x, y, t) and their pressure p(x, y, z, t), both being
+vectorized over the points coordinates so that they can be directly given to meshmagick.mesh_clipper.WaveClipper.
+Their time independent terms can also be evaluated once at fixed points, which meshmagick.mesh_clipper.AiryWaveClipper
+uses to clip a mesh at many times.
+"""
+
+import numpy as np
+
+__author__ = "Francois Rongere"
+__copyright__ = "Copyright 2014-2015, Ecole Centrale de Nantes"
+__credits__ = "Francois Rongere"
+__licence__ = "CeCILL"
+__maintainer__ = "Francois Rongere"
+__email__ = "Francois.Rongere@ec-nantes.fr"
+__status__ = "Development"
+
+
+def solve_dispersion_relation(omega, depth=np.inf, grav=9.81):
+    """Computes the wave numbers of linear waves from their circular frequencies.
+
+    Parameters
+    ----------
+    omega : array_like
+        Circular frequencies (rad/s)
+    depth : float, optional
+        Water depth (m). Default is infinite depth.
+    grav : float, optional
+        The acceleration of gravity. Default is 9.81 m/s**2.
+
+    Returns
+    -------
+    ndarray
+        The wave numbers (rad/m), solutions of omega**2 = g k tanh(k h)
+    """
+    omega = np.asarray(omega, dtype=np.float)
+    k_inf = omega**2 / grav
+
+    if np.isinf(depth):
+        return k_inf
+
+    # Newton iterations starting from a guess above the solution, which ensures monotonic convergence
+    k = np.maximum(k_inf, omega / np.sqrt(grav * depth))
+    for _ in range(100):
+        tanh_kh = np.tanh(k * depth)
+        residual = k * tanh_kh - k_inf
+        derivative = tanh_kh + k * depth * (1. - tanh_kh**2)
+        k = k - residual / derivative
+        if np.all(np.fabs(residual) <= 1e-12 * k_inf):
+            break
+    return k
+
+
+class AiryWave(object):
+    """Linear (Airy) wave field made of one or several regular components.
+
+    The elevation of the free surface is the sum over the components of
+
+        eta = a cos(k (x cos(beta) + y sin(beta)) - omega t + phi)
+
+    Parameters
+    ----------
+    amplitude : float or array_like
+        Amplitudes of the components (m)
+    period : float or array_like
+        Periods of the components (s)
+    direction : float or array_like, optional
+        Propagation directions of the components with respect to the x axis (rad). Default is 0.
+    phase : float or array_like, optional
+        Phases of the components (rad). Default is 0.
+    depth : float, optional
+        Water depth (m). Default is infinite depth.
+    rho_water : float, optional
+        The density of water (in kg/m**3). Default is that of salt water (1023 kg/m**3)
+    grav : float, optional
+        The acceleration of gravity. Default is 9.81 m/s**2.
+    """
+    def __init__(self, amplitude, period, direction=0., phase=0., depth=np.inf, rho_water=1023., grav=9.81):
+
+        amplitude, period, direction, phase = np.broadcast_arrays(*[np.atleast_1d(np.asarray(value, dtype=np.float))
+                                                                     for value in (amplitude, period, direction,
+                                                                                   phase)])
+        self._amplitude = amplitude.copy()
+        self._omega = 2. * np.pi / period
+        self._direction = direction.copy()
+        self._phase = phase.copy()
+
+        self._depth = float(depth)
+        self._rho_water = float(rho_water)
+        self._gravity = float(grav)
+
+        self._wave_number = solve_dispersion_relation(self._omega, depth=self._depth, grav=self._gravity)
+
+    @property
+    def nb_components(self):
+        """The number of regular components of the wave field"""
+        return len(self._amplitude)
+
+    @property
+    def amplitude(self):
+        """Get the amplitudes of the components (m)"""
+        return self._amplitude
+
+    @property
+    def omega(self):
+        """Get the circular frequencies of the components (rad/s)"""
+        return self._omega
+
+    @property
+    def wave_number(self):
+        """Get the wave numbers of the components (rad/m)"""
+        return self._wave_number
+
+    @property
+    def wave_length(self):
+        """Get the wave lengths of the components (m)"""
+        return 2. * np.pi / self._wave_number
+
+    @property
+    def depth(self):
+        """Get the water depth (m)"""
+        return self._depth
+
+    def _phases(self, x, y, t):
+        """Phases of the components at points, the components being along a last added axis"""
+        x = np.asarray(x, dtype=np.float)[..., None]
+        y = np.asarray(y, dtype=np.float)[..., None]
+        k = self._wave_number
+        return k * (x * np.cos(self._direction) + y * np.sin(self._direction)) - self._omega * t + self._phase
+
+    def _spatial_phases(self, x, y):
+        """Phases of the components at points at time 0, the components being along a last added axis"""
+        x = np.asarray(x, dtype=np.float)[..., None]
+        y = np.asarray(y, dtype=np.float)[..., None]
+        k = self._wave_number
+        return k * (x * np.cos(self._direction) + y * np.sin(self._direction)) + self._phase
+
+    def _decay(self, z):
+        """Vertical decay of the dynamic pressure of the components, the components being along a last added axis"""
+        k = self._wave_number
+        kz = k * z[..., None]
+
+        if np.isinf(self._depth):
+            return np.exp(kz)
+
+        # cosh(k(z+h)) / cosh(kh) written so that it does not overflow
+        kh = k * self._depth
+        return np.exp(kz) * (1. + np.exp(-2. * (kz + kh))) / (1. + np.exp(-2. * kh))
+
+    def eta(self, x, y, t=0.):
+        """Get the free surface elevation.
+
+        Parameters
+        ----------
+        x : array_like
+            x coordinates of the points
+        y : array_like
+            y coordinates of the points, with the same shape as x
+        t : float, optional
+            Time (s). Default is 0.
+
+        Returns
+        -------
+        ndarray
+            The elevations, with the shape of x
+        """
+        return np.dot(np.cos(self._phases(x, y, t)), self._amplitude)
+
+    def get_eta_terms(self, x, y):
+        """Get the time independent terms of the free surface elevation.
+
+        The elevation at time t is then dot(cos_terms, cos(omega t)) + dot(sin_terms, sin(omega t)), which avoids
+        evaluating trigonometric functions at every point when the elevation is needed at many times.
+
+        Parameters
+        ----------
+        x : array_like
+            x coordinates of the points
+        y : array_like
+            y coordinates of the points, with the same shape as x
+
+        Returns
+        -------
+        cos_terms : ndarray
+            The terms multiplying cos(omega t), with the shape of x and the components along a last axis
+        sin_terms : ndarray
+            The terms multiplying sin(omega t), with the same shape as cos_terms
+        """
+        phases = self._spatial_phases(x, y)
+        return self._amplitude * np.cos(phases), self._amplitude * np.sin(phases)
+
+    def get_eta(self, t=0.):
+        """Get the free surface elevation function at a given time.
+
+        Parameters
+        ----------
+        t : float, optional
+            Time (s). Default is 0.
+
+        Returns
+        -------
+        callable
+            The function eta(x, y) as expected by WaveClipper
+        """
+        return lambda x, y: self.eta(x, y, t)
+
+    def pressure(self, x, y, z, t=0.):
+        """Get the pressure, that is the sum of the hydrostatic pressure and of the incident wave dynamic pressure.
+
+        The vertical decay of the dynamic pressure is extrapolated above the mean free surface.
+
+        Parameters
+        ----------
+        x, y, z : array_like
+            Coordinates of the points, with the same shape
+        t : float, optional
+            Time (s). Default is 0.
+
+        Returns
+        -------
+        ndarray
+            The pressure (Pa), with the shape of x
+        """
+        z = np.asarray(z, dtype=np.float)
+        dynamic = np.sum(self._amplitude * self._decay(z) * np.cos(self._phases(x, y, t)), axis=-1)
+        return self._rho_water * self._gravity * (dynamic - z)
+
+    def get_pressure_terms(self, x, y, z):
+        """Get the time independent terms of the pressure.
+
+        The pressure at time t is then static_terms + dot(cos_terms, cos(omega t)) + dot(sin_terms, sin(omega t)).
+
+        Parameters
+        ----------
+        x, y, z : array_like
+            Coordinates of the points, with the same shape
+
+        Returns
+        -------
+        static_terms : ndarray
+            The hydrostatic pressure (Pa), with the shape of x
+        cos_terms : ndarray
+            The terms multiplying cos(omega t), with the shape of x and the components along a last axis
+        sin_terms : ndarray
+            The terms multiplying sin(omega t), with the same shape as cos_terms
+        """
+        z = np.asarray(z, dtype=np.float)
+        rho_g = self._rho_water * self._gravity
+        cos_terms, sin_terms = self.get_eta_terms(x, y)
+        decay = rho_g * self._decay(z)
+        return -rho_g * z, cos_terms * decay, sin_terms * decay
+
+    def get_pressure(self, t=0.):
+        """Get the pressure function at a given time.
+
+        Parameters
+        ----------
+        t : float, optional
+            Time (s). Default is 0.
+
+        Returns
+        -------
+        callable
+            The function p(x, y, z) as expected by WaveClipper.get_pressure_force
+        """
+        return lambda x, y, z: self.pressure(x, y, z, t)
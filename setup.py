@@ -29,6 +29,7 @@ setup(
     # setup_requires=['pytest-runner'],
     # tests_require=['pytest', 'pytest-cov'],
     install_requires=['numpy', 'argcomplete', 'vtk'],
+    extras_require={'numba': ['numba'], 'test': ['pytest', 'numba']},
     entry_points={
         'console_scripts': [
             'meshmagick=meshmagick:main',